@@ -4,78 +4,244 @@ Analyze geometric differences between STL files to understand
 why wire generation works for some but not others.
 """
 
+import os
 import numpy as np
 import open3d as o3d
 import sys
 
-def analyze_stl(file_path):
-    """Analyze STL file properties."""
-    print(f"\n{'='*60}")
-    print(f"Analyzing: {file_path}")
-    print(f"{'='*60}")
+from core._jit_kernels import NUMBA_AVAILABLE, njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _stats_pass(z, nz):
+    """Sum, sum of squares, min and max of both arrays plus normal sign counts in one sweep."""
+    z_sum = 0.0
+    z_sq = 0.0
+    z_min = np.inf
+    z_max = -np.inf
+    for i in prange(z.shape[0]):
+        v = z[i]
+        z_sum += v
+        z_sq += v * v
+        z_min = min(z_min, v)
+        z_max = max(z_max, v)
+
+    nz_sum = 0.0
+    nz_sq = 0.0
+    nz_min = np.inf
+    nz_max = -np.inf
+    downward = 0
+    upward = 0
+    for i in prange(nz.shape[0]):
+        v = nz[i]
+        nz_sum += v
+        nz_sq += v * v
+        nz_min = min(nz_min, v)
+        nz_max = max(nz_max, v)
+        if v < 0:
+            downward += 1
+        elif v > 0:
+            upward += 1
 
-    mesh = o3d.io.read_triangle_mesh(file_path)
+    return (z_sum, z_sq, z_min, z_max,
+            nz_sum, nz_sq, nz_min, nz_max, downward, upward)
 
-    if not mesh.has_vertices():
-        print("ERROR: No vertices found!")
+
+def _mean_std(total, total_sq, count):
+    """Mean and standard deviation from running sums."""
+    mean = total / count
+    return mean, np.sqrt(max(total_sq / count - mean * mean, 0.0))
+
+
+def compute_stats(z_values, normal_z):
+    """Z and normal-Z statistics, fused into one pass when Numba is available."""
+    if NUMBA_AVAILABLE:
+        (z_sum, z_sq, z_min, z_max,
+         nz_sum, nz_sq, nz_min, nz_max, downward, upward) = _stats_pass(
+            np.ascontiguousarray(z_values), np.ascontiguousarray(normal_z))
+        z_mean, z_std = _mean_std(z_sum, z_sq, len(z_values))
+        nz_mean, nz_std = _mean_std(nz_sum, nz_sq, len(normal_z))
+    else:
+        # Same running-sum moments as the kernel: sum and a dot product per
+        # array instead of np.mean/np.std, which build full-size temporaries
+        z_values = np.asarray(z_values, dtype=np.float64)
+        normal_z = np.asarray(normal_z, dtype=np.float64)
+        z_min, z_max = z_values.min(), z_values.max()
+        z_mean, z_std = _mean_std(z_values.sum(), z_values @ z_values, len(z_values))
+        nz_min, nz_max = normal_z.min(), normal_z.max()
+        nz_mean, nz_std = _mean_std(normal_z.sum(), normal_z @ normal_z, len(normal_z))
+        downward = np.count_nonzero(normal_z < 0)
+        upward = np.count_nonzero(normal_z > 0)
+
+    return {
+        'z_min': z_min, 'z_max': z_max, 'z_mean': z_mean, 'z_std': z_std,
+        'nz_min': nz_min, 'nz_max': nz_max, 'nz_mean': nz_mean, 'nz_std': nz_std,
+        'downward': int(downward), 'upward': int(upward)
+    }
+
+
+# Binary STL facet record: normal, three vertices, attribute byte count
+STL_FACET_DTYPE = np.dtype([('normal', '<f4', 3), ('vertices', '<f4', (3, 3)), ('attribute', '<u2')])
+
+
+def read_binary_stl(file_path):
+    """
+    Memory-map a binary STL and return its facet records (normal, vertices, attribute).
+
+    Returns None for ASCII (or malformed) files, whose size does not match
+    the 80-byte header + 4-byte count + 50-byte records layout.
+    """
+    size = os.path.getsize(file_path)
+    if size < 84:
+        return None
+    data = np.memmap(file_path, dtype=np.uint8, mode='r')
+    count = int(data[80:84].view('<u4')[0])
+    if size != 84 + STL_FACET_DTYPE.itemsize * count:
         return None
+    return np.frombuffer(data, dtype=STL_FACET_DTYPE, count=count, offset=84)
+
+
+def merge_facet_corners(facets):
+    """
+    Vertices and triangles of binary STL facets, merged as Open3D's reader does.
 
-    vertices = np.asarray(mesh.vertices)
+    Corners sharing both a position and their facet's stored normal become one
+    vertex, so vertex counts and statistics match a mesh loaded by Open3D.
+    Normals are compared to 6 decimals, as round-off leaves near-zero
+    components (e.g. 1e-16 vs 0) that Open3D treats as equal.
+    """
+    positions = facets['vertices'].reshape(-1, 3)
+    normals = np.repeat(np.round(facets['normal'], 6), 3, axis=0)
+    keys, corner_ids = np.unique(np.hstack([positions, normals]), axis=0, return_inverse=True)
+    return np.ascontiguousarray(keys[:, :3]), corner_ids.reshape(-1, 3)
+
+
+def triangle_normal_z(vertices, triangles):
+    """Z component of the (unnormalized) triangle normals: the 2D cross product of the edges."""
+    v0 = vertices[triangles[:, 0]]
+    e1 = vertices[triangles[:, 1]] - v0
+    e2 = vertices[triangles[:, 2]] - v0
+    return e1[:, 0] * e2[:, 1] - e1[:, 1] * e2[:, 0]
+
+
+def analyze_stl(file_path, normal_stats=True):
+    """
+    Analyze STL file properties.
+
+    With normal_stats=False the vertex-normal pass is skipped and the
+    orientation check counts triangles by the sign of their normal's Z
+    component, which only needs the Z term of one cross product each. Binary
+    STLs are then read straight from a memory map without Open3D parsing;
+    facet corners are merged as Open3D merges them (see
+    merge_facet_corners), so the vertex statistics match a normal run.
+    """
+    # Lines are collected and written to stdout once at the end
+    report = []
+    report.append(f"\n{'='*60}")
+    report.append(f"Analyzing: {file_path}")
+    report.append(f"{'='*60}")
+
+    facets = None
+    if not normal_stats and os.path.isfile(file_path):
+        facets = read_binary_stl(file_path)
+
+    if facets is not None:
+        if len(facets) == 0:
+            report.append("ERROR: No vertices found!")
+            sys.stdout.write('\n'.join(report) + '\n')
+            return None
+        # Facets list each shared vertex once per triangle; merge them so the
+        # counts and Z statistics do not depend on normal_stats
+        vertices, triangles = merge_facet_corners(facets)
+        bbox_min = vertices.min(axis=0)
+        bbox_max = vertices.max(axis=0)
+    else:
+        # Tensor-based mesh: normals are computed by Open3D's parallel kernels and
+        # the attribute tensors are exposed to NumPy without copying (CPU device)
+        try:
+            mesh = o3d.t.io.read_triangle_mesh(file_path)
+            empty = mesh.is_empty()
+        except IndexError:
+            # The tensor reader raises instead of returning an empty mesh
+            # when the file cannot be loaded
+            empty = True
+
+        if empty:
+            report.append("ERROR: No vertices found!")
+            sys.stdout.write('\n'.join(report) + '\n')
+            return None
+
+        vertices = mesh.vertex.positions.numpy()
+        triangles = mesh.triangle.indices.numpy()
+        bbox = mesh.get_axis_aligned_bounding_box()
+        bbox_min = bbox.min_bound.numpy()
+        bbox_max = bbox.max_bound.numpy()
+
+    triangle_count = len(triangles)
+    bbox_extent = bbox_max - bbox_min
 
     # Basic stats
-    print(f"\nBasic Properties:")
-    print(f"  Vertices: {len(vertices):,}")
-    print(f"  Triangles: {len(mesh.triangles):,}")
+    report.append(f"\nBasic Properties:")
+    report.append(f"  Vertices: {len(vertices):,}")
+    report.append(f"  Triangles: {triangle_count:,}")
 
     # Bounding box
-    bbox = mesh.get_axis_aligned_bounding_box()
-    bbox_extent = bbox.get_extent()
-    print(f"\nBounding Box:")
-    print(f"  Min: [{bbox.min_bound[0]:.2f}, {bbox.min_bound[1]:.2f}, {bbox.min_bound[2]:.2f}]")
-    print(f"  Max: [{bbox.max_bound[0]:.2f}, {bbox.max_bound[1]:.2f}, {bbox.max_bound[2]:.2f}]")
-    print(f"  Extent: [{bbox_extent[0]:.2f}, {bbox_extent[1]:.2f}, {bbox_extent[2]:.2f}]")
+    report.append(f"\nBounding Box:")
+    report.append(f"  Min: [{bbox_min[0]:.2f}, {bbox_min[1]:.2f}, {bbox_min[2]:.2f}]")
+    report.append(f"  Max: [{bbox_max[0]:.2f}, {bbox_max[1]:.2f}, {bbox_max[2]:.2f}]")
+    report.append(f"  Extent: [{bbox_extent[0]:.2f}, {bbox_extent[1]:.2f}, {bbox_extent[2]:.2f}]")
 
-    # Z-axis statistics (critical for upper/lower surface detection)
+    # Check for mesh quality
+    if normal_stats:
+        mesh.compute_vertex_normals()
+        normal_z = mesh.vertex.normals.numpy()[:, 2]
+        orientation_unit = "normals"
+    else:
+        normal_z = triangle_normal_z(vertices, triangles)
+        orientation_unit = "triangles"
+
+    # Z and normal-Z statistics in a single sweep over both arrays
     z_values = vertices[:, 2]
-    print(f"\nZ-axis Statistics (critical for gum-side detection):")
-    print(f"  Min Z: {np.min(z_values):.2f}")
-    print(f"  Max Z: {np.max(z_values):.2f}")
-    print(f"  Mean Z: {np.mean(z_values):.2f}")
-    print(f"  Std Z: {np.std(z_values):.2f}")
-    print(f"  Range: {np.max(z_values) - np.min(z_values):.2f}")
+    stats = compute_stats(z_values, normal_z)
 
-    # Center of mass
-    center = np.mean(vertices, axis=0)
-    print(f"\nCenter of Mass:")
-    print(f"  [{center[0]:.2f}, {center[1]:.2f}, {center[2]:.2f}]")
+    # Z-axis statistics (critical for upper/lower surface detection)
+    report.append(f"\nZ-axis Statistics (critical for gum-side detection):")
+    report.append(f"  Min Z: {stats['z_min']:.2f}")
+    report.append(f"  Max Z: {stats['z_max']:.2f}")
+    report.append(f"  Mean Z: {stats['z_mean']:.2f}")
+    report.append(f"  Std Z: {stats['z_std']:.2f}")
+    report.append(f"  Range: {stats['z_max'] - stats['z_min']:.2f}")
 
-    # Check for mesh quality
-    mesh.compute_vertex_normals()
-    normals = np.asarray(mesh.vertex_normals)
+    # Center of mass
+    center = np.mean(vertices, axis=0, dtype=np.float64)
+    report.append(f"\nCenter of Mass:")
+    report.append(f"  [{center[0]:.2f}, {center[1]:.2f}, {center[2]:.2f}]")
 
     # Check if Z component of normals varies (indicating curved surface)
-    normal_z = normals[:, 2]
-    print(f"\nNormal Z-component Statistics:")
-    print(f"  Min: {np.min(normal_z):.3f}")
-    print(f"  Max: {np.max(normal_z):.3f}")
-    print(f"  Mean: {np.mean(normal_z):.3f}")
-    print(f"  Std: {np.std(normal_z):.3f}")
+    if normal_stats:
+        report.append(f"\nNormal Z-component Statistics:")
+        report.append(f"  Min: {stats['nz_min']:.3f}")
+        report.append(f"  Max: {stats['nz_max']:.3f}")
+        report.append(f"  Mean: {stats['nz_mean']:.3f}")
+        report.append(f"  Std: {stats['nz_std']:.3f}")
 
     # Check orientation: for lower jaw, expect normals pointing generally downward
-    print(f"\nOrientation Check (for lower jaw):")
-    downward_normals = np.sum(normals[:, 2] < 0)
-    upward_normals = np.sum(normals[:, 2] > 0)
-    print(f"  Downward-pointing normals: {downward_normals:,} ({100*downward_normals/len(normals):.1f}%)")
-    print(f"  Upward-pointing normals: {upward_normals:,} ({100*upward_normals/len(normals):.1f}%)")
+    report.append(f"\nOrientation Check (for lower jaw):")
+    downward_normals = stats['downward']
+    upward_normals = stats['upward']
+    report.append(f"  Downward-pointing {orientation_unit}: {downward_normals:,} ({100*downward_normals/len(normal_z):.1f}%)")
+    report.append(f"  Upward-pointing {orientation_unit}: {upward_normals:,} ({100*upward_normals/len(normal_z):.1f}%)")
+
+    sys.stdout.write('\n'.join(report) + '\n')
 
     return {
         'vertices': len(vertices),
-        'triangles': len(mesh.triangles),
-        'bbox_min': bbox.min_bound,
-        'bbox_max': bbox.max_bound,
-        'z_range': np.max(z_values) - np.min(z_values),
+        'triangles': triangle_count,
+        'bbox_min': bbox_min,
+        'bbox_max': bbox_max,
+        'z_range': stats['z_max'] - stats['z_min'],
         'center': center,
-        'normal_z_std': np.std(normal_z)
+        'normal_z_std': stats['nz_std'] if normal_stats else None
     }
 
 if __name__ == "__main__":
@@ -83,10 +249,13 @@ if __name__ == "__main__":
     working_file = "STLfiles/assets/AyaKhairy_LowerJaw.stl"
     failing_file = "STLfiles/assets/Amina Imam scan for retainers LowerJawScan.stl"
 
+    # --orientation-only skips the vertex-normal pass (see analyze_stl)
+    normal_stats = '--orientation-only' not in sys.argv[1:]
+
     print("COMPARISON: Working vs Failing STL Files")
 
-    working_stats = analyze_stl(working_file)
-    failing_stats = analyze_stl(failing_file)
+    working_stats = analyze_stl(working_file, normal_stats)
+    failing_stats = analyze_stl(failing_file, normal_stats)
 
     print(f"\n{'='*60}")
     print("KEY DIFFERENCES:")
@@ -17,10 +17,13 @@ Usage:
     optimize_wire_generator(generator)
 
     generator.launch_interactive_mode()  # Now smooth and responsive!
+
+Set ORTHO_AUTO_OPTIMIZE=0 to import this module without patching
+WireGenerator.launch_interactive_mode.
 """
 
-from wire.wire_generator_optimized import add_optimized_adjustment_methods
-from visualization.visualizer_optimized import add_optimized_visualization_methods
+import functools
+import os
 
 
 def optimize_wire_generator(wire_generator_instance):
@@ -40,6 +43,11 @@ def optimize_wire_generator(wire_generator_instance):
     Returns:
         The same instance with optimizations applied
     """
+    # Deferred so importing this module does not pull in Open3D and the
+    # wire/visualization stacks until optimizations are actually applied
+    from wire.wire_generator_optimized import add_optimized_adjustment_methods
+    from visualization.visualizer_optimized import add_optimized_visualization_methods
+
     print("🚀 Applying performance optimizations...")
 
     # Optimize wire adjustment methods
@@ -65,15 +73,20 @@ def auto_optimize_on_interactive_launch():
     Monkey-patch WireGenerator.launch_interactive_mode to auto-apply optimizations.
 
     This makes optimization automatic - users don't need to call optimize_wire_generator manually.
+    Calling it again (e.g. when the module is re-imported or reloaded) is a no-op.
     """
     from wire.wire_generator import WireGenerator
 
     original_launch = WireGenerator.launch_interactive_mode
+    if getattr(original_launch, '_ortho_wrapped', False):
+        return
 
+    @functools.wraps(original_launch)
     def launch_interactive_mode_optimized(self):
         """Launch interactive mode with automatic optimizations."""
-        # Apply optimizations if not already applied
-        if not hasattr(self, '_adjustment_optimizer'):
+        # Apply optimizations if not already applied (instance dict lookup;
+        # optimize_wire_generator stores the optimizer on the instance)
+        if '_adjustment_optimizer' not in self.__dict__:
             print("\n" + "="*60)
             print("AUTO-APPLYING PERFORMANCE OPTIMIZATIONS")
             print("="*60)
@@ -83,11 +96,13 @@ def auto_optimize_on_interactive_launch():
         # Call original launch method
         original_launch(self)
 
+    launch_interactive_mode_optimized._ortho_wrapped = True
     WireGenerator.launch_interactive_mode = launch_interactive_mode_optimized
 
 
 # Automatically enable optimizations when this module is imported
-auto_optimize_on_interactive_launch()
+if os.environ.get('ORTHO_AUTO_OPTIMIZE', '1') == '1':
+    auto_optimize_on_interactive_launch()
 
-print("✅ Performance optimizations module loaded")
-print("   Wire adjustment will be automatically optimized")
+    print("✅ Performance optimizations module loaded")
+    print("   Wire adjustment will be automatically optimized")
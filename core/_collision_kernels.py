@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+# ================================================================
+# core/_collision_kernels.py
+"""
+Numba-compiled geometry kernels for the collision detection system.
+
+Uses the optional-Numba shim from core._jit_kernels: without Numba these are
+plain Python functions and CollisionDetector takes its NumPy/KD-tree paths.
+"""
+
+import numpy as np
+
+from core._jit_kernels import NUMBA_AVAILABLE, njit, prange
+
+# Spatial hash grid: number of buckets (power of two) cells are hashed into
+GRID_HASH_SIZE = 2 ** 20
+
+
+@njit(cache=True)
+def grid_cell_hash(ix, iy, iz):
+    """Bucket of grid cell (ix, iy, iz) using the spatial-hash primes."""
+    return ((ix * 73856093) ^ (iy * 19349663) ^ (iz * 83492791)) & (GRID_HASH_SIZE - 1)
+
+
+@njit(cache=True, fastmath=True)
+def closest_point_on_segment(px, py, pz, ax, ay, az, bx, by, bz):
+    """Closest point to p on the segment a-b."""
+    lx = bx - ax
+    ly = by - ay
+    lz = bz - az
+    length_sq = lx * lx + ly * ly + lz * lz
+    if length_sq < 1e-10:
+        return ax, ay, az
+
+    t = ((px - ax) * lx + (py - ay) * ly + (pz - az) * lz) / length_sq
+    t = min(max(t, 0.0), 1.0)
+    return ax + t * lx, ay + t * ly, az + t * lz
+
+
+@njit(cache=True, fastmath=True)
+def project_point_to_triangle_edges(px, py, pz, v0x, v0y, v0z, e1x, e1y, e1z, e2x, e2y, e2z,
+                                    nx, ny, nz):
+    """Closest point on the triangle (v0, v0 + e1, v0 + e2) to p and its squared distance.
+
+    n is the triangle's unit normal, or zero for a degenerate triangle.
+    Callers compare squared distances and take the root only when needed.
+    """
+    if nx == 0.0 and ny == 0.0 and nz == 0.0:
+        # Degenerate triangle
+        dx = px - v0x
+        dy = py - v0y
+        dz = pz - v0z
+        return v0x, v0y, v0z, dx * dx + dy * dy + dz * dz
+
+    # Project point onto triangle plane
+    d_plane = (px - v0x) * nx + (py - v0y) * ny + (pz - v0z) * nz
+    qx = px - d_plane * nx
+    qy = py - d_plane * ny
+    qz = pz - d_plane * nz
+
+    # Barycentric coordinates of the projection
+    wx = qx - v0x
+    wy = qy - v0y
+    wz = qz - v0z
+    dot00 = e2x * e2x + e2y * e2y + e2z * e2z
+    dot01 = e2x * e1x + e2y * e1y + e2z * e1z
+    dot02 = e2x * wx + e2y * wy + e2z * wz
+    dot11 = e1x * e1x + e1y * e1y + e1z * e1z
+    dot12 = e1x * wx + e1y * wy + e1z * wz
+    inv_denom = 1.0 / (dot00 * dot11 - dot01 * dot01)
+    u = (dot11 * dot02 - dot01 * dot12) * inv_denom
+    v = (dot00 * dot12 - dot01 * dot02) * inv_denom
+
+    if u >= 0.0 and v >= 0.0 and u + v <= 1.0:
+        return qx, qy, qz, d_plane * d_plane
+
+    # Outside triangle - closest point on the nearest edge
+    v1x = v0x + e1x
+    v1y = v0y + e1y
+    v1z = v0z + e1z
+    v2x = v0x + e2x
+    v2y = v0y + e2y
+    v2z = v0z + e2z
+    best_x, best_y, best_z = closest_point_on_segment(px, py, pz, v0x, v0y, v0z, v1x, v1y, v1z)
+    dx = px - best_x
+    dy = py - best_y
+    dz = pz - best_z
+    best_sq = dx * dx + dy * dy + dz * dz
+
+    cx, cy, cz = closest_point_on_segment(px, py, pz, v1x, v1y, v1z, v2x, v2y, v2z)
+    dx = px - cx
+    dy = py - cy
+    dz = pz - cz
+    d_sq = dx * dx + dy * dy + dz * dz
+    if d_sq < best_sq:
+        best_x, best_y, best_z, best_sq = cx, cy, cz, d_sq
+
+    cx, cy, cz = closest_point_on_segment(px, py, pz, v2x, v2y, v2z, v0x, v0y, v0z)
+    dx = px - cx
+    dy = py - cy
+    dz = pz - cz
+    d_sq = dx * dx + dy * dy + dz * dz
+    if d_sq < best_sq:
+        best_x, best_y, best_z, best_sq = cx, cy, cz, d_sq
+
+    return best_x, best_y, best_z, best_sq
+
+
+@njit(cache=True, fastmath=True)
+def project_point_to_triangle(px, py, pz, v0x, v0y, v0z, v1x, v1y, v1z, v2x, v2y, v2z):
+    """Closest point on triangle v0-v1-v2 to p and its squared distance."""
+    e1x = v1x - v0x
+    e1y = v1y - v0y
+    e1z = v1z - v0z
+    e2x = v2x - v0x
+    e2y = v2y - v0y
+    e2z = v2z - v0z
+
+    # Triangle normal
+    nx = e1y * e2z - e1z * e2y
+    ny = e1z * e2x - e1x * e2z
+    nz = e1x * e2y - e1y * e2x
+    n_len = np.sqrt(nx * nx + ny * ny + nz * nz)
+    if n_len > 1e-10:
+        nx /= n_len
+        ny /= n_len
+        nz /= n_len
+    else:
+        nx = 0.0
+        ny = 0.0
+        nz = 0.0
+
+    return project_point_to_triangle_edges(px, py, pz, v0x, v0y, v0z, e1x, e1y, e1z,
+                                           e2x, e2y, e2z, nx, ny, nz)
+
+
+@njit(cache=True)
+def bvh_closest_point(point, node_min, node_max, node_left, node_right_or_prim,
+                      node_count, leaf_p0, leaf_e1, leaf_e2, leaf_n, leaf_id, stack_size):
+    """Closest surface point to `point` via distance-pruned BVH traversal.
+
+    Returns (closest_point, distance, triangle_index). Internal nodes have
+    node_count == 0 and children node_left / node_right_or_prim; leaves hold
+    node_count triangles in lanes of the packed leaf block node_right_or_prim.
+    """
+    px = point[0]
+    py = point[1]
+    pz = point[2]
+
+    best = np.empty(3, dtype=np.float32)
+    best[0] = px
+    best[1] = py
+    best[2] = pz
+    best_sq = np.inf
+    best_tri = -1
+
+    stack = np.empty(stack_size, dtype=np.int32)
+    stack[0] = 0
+    top = 1
+    while top > 0:
+        top -= 1
+        node = stack[top]
+
+        # Squared distance from the point to the node box
+        box_sq = 0.0
+        for a in range(3):
+            c = point[a]
+            if c < node_min[node, a]:
+                box_sq += (node_min[node, a] - c) ** 2
+            elif c > node_max[node, a]:
+                box_sq += (c - node_max[node, a]) ** 2
+        if box_sq >= best_sq:
+            continue
+
+        count = node_count[node]
+        if count > 0:
+            block = node_right_or_prim[node]
+            p0 = leaf_p0[block]
+            e1 = leaf_e1[block]
+            e2 = leaf_e2[block]
+            n = leaf_n[block]
+            for lane in range(count):
+                qx, qy, qz, dist_sq = project_point_to_triangle_edges(
+                    px, py, pz,
+                    p0[lane, 0], p0[lane, 1], p0[lane, 2],
+                    e1[lane, 0], e1[lane, 1], e1[lane, 2],
+                    e2[lane, 0], e2[lane, 1], e2[lane, 2],
+                    n[lane, 0], n[lane, 1], n[lane, 2]
+                )
+                if dist_sq < best_sq:
+                    best_sq = dist_sq
+                    best[0] = qx
+                    best[1] = qy
+                    best[2] = qz
+                    best_tri = leaf_id[block, lane]
+        else:
+            stack[top] = node_left[node]
+            stack[top + 1] = node_right_or_prim[node]
+            top += 2
+
+    return best, np.sqrt(best_sq), best_tri
+
+
+@njit(cache=True, parallel=True)
+def find_closest_surface_point_batch(points, node_min, node_max, node_left, node_right_or_prim,
+                                     node_count, leaf_p0, leaf_e1, leaf_e2, leaf_n, leaf_id,
+                                     triangle_normals, stack_size):
+    """Closest surface points, normals and triangle indices for a batch of points.
+
+    Points are independent BVH queries and are processed in parallel.
+    """
+    n = points.shape[0]
+    closest_points = np.empty((n, 3), dtype=np.float32)
+    normals = np.empty((n, 3), dtype=np.float32)
+    triangle_ids = np.empty(n, dtype=np.int64)
+    for i in prange(n):
+        closest, _, tri = bvh_closest_point(
+            points[i], node_min, node_max, node_left, node_right_or_prim,
+            node_count, leaf_p0, leaf_e1, leaf_e2, leaf_n, leaf_id, stack_size
+        )
+        closest_points[i] = closest
+        for a in range(3):
+            normals[i, a] = triangle_normals[tri, a]
+        triangle_ids[i] = tri
+    return closest_points, normals, triangle_ids
+
+
+@njit(cache=True, parallel=True)
+def grid_closest_points(points, cell_size, cell_offsets, cell_tri_ids, tri_v0, tri_edge1,
+                        tri_edge2, triangle_normals):
+    """Closest surface points using the triangles bucketed in each point's 3x3x3 cells.
+
+    Exact for points closer to the surface than cell_size. Points without
+    any candidate triangle get triangle index -1.
+    """
+    n = points.shape[0]
+    closest_points = np.empty((n, 3), dtype=np.float32)
+    normals = np.zeros((n, 3), dtype=np.float32)
+    triangle_ids = np.full(n, -1, dtype=np.int64)
+    for i in prange(n):
+        px = points[i, 0]
+        py = points[i, 1]
+        pz = points[i, 2]
+        closest_points[i, 0] = px
+        closest_points[i, 1] = py
+        closest_points[i, 2] = pz
+        cx = np.int64(np.floor(px / cell_size))
+        cy = np.int64(np.floor(py / cell_size))
+        cz = np.int64(np.floor(pz / cell_size))
+
+        best_sq = np.inf
+        for dx in range(-1, 2):
+            for dy in range(-1, 2):
+                for dz in range(-1, 2):
+                    bucket = grid_cell_hash(cx + dx, cy + dy, cz + dz)
+                    for k in range(cell_offsets[bucket], cell_offsets[bucket + 1]):
+                        tri = cell_tri_ids[k]
+                        qx, qy, qz, dist_sq = project_point_to_triangle_edges(
+                            px, py, pz,
+                            tri_v0[tri, 0], tri_v0[tri, 1], tri_v0[tri, 2],
+                            tri_edge1[tri, 0], tri_edge1[tri, 1], tri_edge1[tri, 2],
+                            tri_edge2[tri, 0], tri_edge2[tri, 1], tri_edge2[tri, 2],
+                            triangle_normals[tri, 0], triangle_normals[tri, 1],
+                            triangle_normals[tri, 2]
+                        )
+                        if dist_sq < best_sq:
+                            best_sq = dist_sq
+                            closest_points[i, 0] = qx
+                            closest_points[i, 1] = qy
+                            closest_points[i, 2] = qz
+                            triangle_ids[i] = tri
+
+        if triangle_ids[i] >= 0:
+            for a in range(3):
+                normals[i, a] = triangle_normals[triangle_ids[i], a]
+    return closest_points, normals, triangle_ids
+
+
+@njit(cache=True)
+def moller_trumbore_edges(ox, oy, oz, dx, dy, dz, v0x, v0y, v0z, e1x, e1y, e1z, e2x, e2y, e2z):
+    """Ray parameter t of the hit with triangle (v0, v0 + e1, v0 + e2), or inf on a miss."""
+    # h = direction x edge2
+    hx = dy * e2z - dz * e2y
+    hy = dz * e2x - dx * e2z
+    hz = dx * e2y - dy * e2x
+    a = e1x * hx + e1y * hy + e1z * hz
+    if abs(a) < 1e-10:
+        return np.inf  # Ray parallel to (or degenerate) triangle
+
+    f = 1.0 / a
+    sx = ox - v0x
+    sy = oy - v0y
+    sz = oz - v0z
+    u = f * (sx * hx + sy * hy + sz * hz)
+    if u < 0.0 or u > 1.0:
+        return np.inf
+
+    # q = s x edge1
+    qx = sy * e1z - sz * e1y
+    qy = sz * e1x - sx * e1z
+    qz = sx * e1y - sy * e1x
+    v = f * (dx * qx + dy * qy + dz * qz)
+    if v < 0.0 or u + v > 1.0:
+        return np.inf
+
+    t = f * (e2x * qx + e2y * qy + e2z * qz)
+    if t > 1e-10:
+        return t
+    return np.inf
+
+
+@njit(cache=True, parallel=True)
+def intersect_rays_tris(origins, directions, tri_v0, tri_edge1, tri_edge2, candidates):
+    """Nearest hit t and triangle index per ray over the candidate triangles.
+
+    Rays are independent and processed in parallel; misses get t = inf and
+    index -1.
+    """
+    n_rays = origins.shape[0]
+    hit_t = np.full(n_rays, np.inf)
+    hit_idx = np.full(n_rays, -1, dtype=np.int64)
+    for r in prange(n_rays):
+        best_t = np.inf
+        best_tri = -1
+        for c in range(candidates.shape[0]):
+            tri = candidates[c]
+            t = moller_trumbore_edges(
+                origins[r, 0], origins[r, 1], origins[r, 2],
+                directions[r, 0], directions[r, 1], directions[r, 2],
+                tri_v0[tri, 0], tri_v0[tri, 1], tri_v0[tri, 2],
+                tri_edge1[tri, 0], tri_edge1[tri, 1], tri_edge1[tri, 2],
+                tri_edge2[tri, 0], tri_edge2[tri, 1], tri_edge2[tri, 2]
+            )
+            if t < best_t:
+                best_t = t
+                best_tri = tri
+        hit_t[r] = best_t
+        hit_idx[r] = best_tri
+    return hit_t, hit_idx
+
+
+@njit(cache=True)
+def _ray_box_entry(origin, direction, box_min, box_max, t_max):
+    """Entry parameter of a ray into a box (slab test), or inf if it misses before t_max."""
+    t_near = 0.0
+    t_far = t_max
+    for a in range(3):
+        if abs(direction[a]) < 1e-30:
+            if origin[a] < box_min[a] or origin[a] > box_max[a]:
+                return np.inf
+            continue
+        inv = 1.0 / direction[a]
+        t0 = (box_min[a] - origin[a]) * inv
+        t1 = (box_max[a] - origin[a]) * inv
+        if t0 > t1:
+            t0, t1 = t1, t0
+        t_near = max(t_near, t0)
+        t_far = min(t_far, t1)
+        if t_near > t_far:
+            return np.inf
+    return t_near
+
+
+@njit(cache=True, parallel=True)
+def intersect_rays_bvh(origins, directions, node_min, node_max, node_left, node_right_or_prim,
+                       node_count, leaf_p0, leaf_e1, leaf_e2, leaf_id, stack_size):
+    """Nearest hit per ray, visiting only the BVH nodes whose boxes the ray enters.
+
+    Every lane of a packed leaf block is tested; padding lanes are zero-area
+    triangles that the parallel test rejects.
+    """
+    n_rays = origins.shape[0]
+    lanes = leaf_id.shape[1]
+    hit_t = np.full(n_rays, np.inf)
+    hit_idx = np.full(n_rays, -1, dtype=np.int64)
+    for r in prange(n_rays):
+        origin = origins[r]
+        direction = directions[r]
+        best_t = np.inf
+        best_tri = -1
+
+        stack = np.empty(stack_size, dtype=np.int32)
+        stack[0] = 0
+        top = 1
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            if _ray_box_entry(origin, direction, node_min[node], node_max[node], best_t) == np.inf:
+                continue
+
+            if node_count[node] > 0:
+                block = node_right_or_prim[node]
+                p0 = leaf_p0[block]
+                e1 = leaf_e1[block]
+                e2 = leaf_e2[block]
+                for lane in range(lanes):
+                    t = moller_trumbore_edges(
+                        origin[0], origin[1], origin[2],
+                        direction[0], direction[1], direction[2],
+                        p0[lane, 0], p0[lane, 1], p0[lane, 2],
+                        e1[lane, 0], e1[lane, 1], e1[lane, 2],
+                        e2[lane, 0], e2[lane, 1], e2[lane, 2]
+                    )
+                    tri = leaf_id[block, lane]
+                    if t < best_t or (t == best_t and tri < best_tri):
+                        best_t = t
+                        best_tri = tri
+            else:
+                stack[top] = node_left[node]
+                stack[top + 1] = node_right_or_prim[node]
+                top += 2
+
+        hit_t[r] = best_t
+        hit_idx[r] = best_tri
+    return hit_t, hit_idx
+
+
+# Argument types the kernels are called with by CollisionDetector: float64
+# query points and rays against its C-contiguous float32 / int32 mesh arrays
+_BVH_NODES = 'float32[:, ::1], float32[:, ::1], int32[::1], int32[::1], int32[::1]'
+_LEAF_BLOCKS = 'float32[:, :, ::1], float32[:, :, ::1], float32[:, :, ::1]'
+_TRI_ROWS = 'float32[:, ::1], float32[:, ::1], float32[:, ::1]'
+KERNEL_SIGNATURES = (
+    (bvh_closest_point,
+     f'(float64[::1], {_BVH_NODES}, {_LEAF_BLOCKS}, float32[:, :, ::1], int32[:, ::1], int64)'),
+    (find_closest_surface_point_batch,
+     f'(float64[:, ::1], {_BVH_NODES}, {_LEAF_BLOCKS}, float32[:, :, ::1], int32[:, ::1], '
+     f'float32[:, ::1], int64)'),
+    (intersect_rays_bvh,
+     f'(float64[:, ::1], float64[:, ::1], {_BVH_NODES}, {_LEAF_BLOCKS}, int32[:, ::1], int64)'),
+    (intersect_rays_tris, f'(float64[:, ::1], float64[:, ::1], {_TRI_ROWS}, int64[::1])'),
+    (grid_closest_points,
+     f'(float64[:, ::1], float64, int32[::1], int32[::1], {_TRI_ROWS}, float32[:, ::1])'),
+    (project_point_to_triangle, '(' + ', '.join(['float64'] * 12) + ')'),
+    (closest_point_on_segment, '(' + ', '.join(['float64'] * 9) + ')'),
+)
+
+
+def _warm_up():
+    """Compile (or load from cache) each kernel for exactly its detector signature."""
+    for kernel, signature in KERNEL_SIGNATURES:
+        kernel.compile(signature)
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
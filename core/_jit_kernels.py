@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# ================================================================
+# core/_jit_kernels.py
+"""
+Numba-compiled numeric kernels for the core processing modules.
+
+Numba is an optional dependency. When it is not installed NUMBA_AVAILABLE is
+False, `njit` becomes a no-op decorator and callers fall back to their NumPy
+implementations.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True, fastmath=True)
+def find_lingual_position_core(vertices, tooth_center, arch_center, target_height,
+                               height_axis, tol, pct, min_v):
+    """Lingual bracket point: mean of the innermost `pct` percent of band vertices."""
+    n = vertices.shape[0]
+
+    # Vertices within the bracket-level height band
+    band = np.empty(n, dtype=np.int64)
+    count = 0
+    for i in range(n):
+        if abs(vertices[i, height_axis] - target_height) < tol:
+            band[count] = i
+            count += 1
+
+    if count < min_v:
+        # Fallback to tooth center at target height
+        result = tooth_center.astype(np.float64)
+        result[height_axis] = target_height
+        return result
+
+    # Radial direction (outward from arch center) in the horizontal plane
+    radial = np.zeros(3)
+    norm_sq = 0.0
+    for a in range(3):
+        if a != height_axis:
+            radial[a] = tooth_center[a] - arch_center[a]
+            norm_sq += radial[a] * radial[a]
+    if norm_sq > 0.0:
+        radial /= np.sqrt(norm_sq)
+    else:
+        radial[:] = 0.0
+        radial[1 if height_axis == 0 else 0] = 1.0
+
+    distances = np.empty(count)
+    for j in range(count):
+        d = 0.0
+        for a in range(3):
+            if a != height_axis:
+                d += (vertices[band[j], a] - arch_center[a]) * radial[a]
+        distances[j] = d
+
+    # Lingual vertices (lowest percentile = innermost). The k-th order
+    # statistic gives the same cutoff as np.percentile's linear interpolation
+    # for a `<=` mask, in O(N) instead of a full sort.
+    k = int(pct / 100.0 * (count - 1))
+    threshold = np.partition(distances, k)[k]
+    result = np.zeros(3)
+    selected = 0
+    closest = 0
+    for j in range(count):
+        if distances[j] < distances[closest]:
+            closest = j
+        if distances[j] <= threshold:
+            for a in range(3):
+                result[a] += vertices[band[j], a]
+            selected += 1
+
+    if selected > 3:
+        return result / selected
+    for a in range(3):
+        result[a] = vertices[band[closest], a]
+    return result
+
+
+@njit(cache=True, parallel=True)
+def find_lingual_positions_batch(vertices_flat, starts, ends, centers, arch_center,
+                                 target_heights, height_axis, tol, pct, min_v):
+    """Lingual bracket points for all teeth of a packed (SoA) teeth table.
+
+    Tooth t is searched over vertices_flat[starts[t]:ends[t]]. Teeth are
+    independent, so they are processed in parallel.
+    """
+    n_teeth = starts.shape[0]
+    positions = np.empty((n_teeth, 3))
+    for t in prange(n_teeth):
+        positions[t] = find_lingual_position_core(
+            vertices_flat[starts[t]:ends[t]], centers[t], arch_center,
+            target_heights[t], height_axis, tol, pct, min_v
+        )
+    return positions
+
+
+@njit(cache=True)
+def height_bands_core(heights, starts, ends, target_heights, tol):
+    """Bracket-level band [band_start, band_end) of every tooth in a packed table.
+
+    Heights are sorted within each tooth, so each band is two binary
+    searches over the tooth's run: heights >= target - tol and <= target + tol.
+    """
+    n_teeth = starts.shape[0]
+    band_starts = np.empty(n_teeth, dtype=np.int64)
+    band_ends = np.empty(n_teeth, dtype=np.int64)
+    for t in range(n_teeth):
+        tooth_heights = heights[starts[t]:ends[t]]
+        band_starts[t] = starts[t] + np.searchsorted(tooth_heights, target_heights[t] - tol)
+        band_ends[t] = starts[t] + np.searchsorted(tooth_heights, target_heights[t] + tol,
+                                                   side='right')
+    return band_starts, band_ends
+
+
+@njit(cache=True)
+def height_band_core(vertices, height_axis, level, tol):
+    """float32 copy of the vertices within tol of level along height_axis.
+
+    Counts, then gathers, in two streaming passes over the vertex array,
+    without materializing a difference array or a boolean mask.
+    """
+    n = vertices.shape[0]
+    count = 0
+    for i in range(n):
+        if abs(vertices[i, height_axis] - level) < tol:
+            count += 1
+
+    band = np.empty((count, 3), dtype=np.float32)
+    j = 0
+    for i in range(n):
+        if abs(vertices[i, height_axis] - level) < tol:
+            for a in range(3):
+                band[j, a] = vertices[i, a]
+            j += 1
+    return band
+
+
+@njit(cache=True)
+def segment_angles_core(sorted_angles, sorted_vertices, start_angle, angle_per_tooth, n_segments):
+    """Runs, sizes and centers of the angular tooth segments over angle-sorted vertices.
+
+    Segment i holds the angles in [start, end) with both bounds normalized to
+    [-pi, pi); when the bounds straddle the seam it is the runs [lo, n) and
+    [0, hi) of the sorted arrays.
+    """
+    n = sorted_angles.shape[0]
+    lo = np.empty(n_segments, dtype=np.int64)
+    hi = np.empty(n_segments, dtype=np.int64)
+    wraps = np.empty(n_segments, dtype=np.bool_)
+    counts = np.zeros(n_segments, dtype=np.int64)
+    centers = np.zeros((n_segments, 3))
+    for i in range(n_segments):
+        tooth_start = start_angle + i * angle_per_tooth
+        tooth_end = tooth_start + angle_per_tooth
+        tooth_start = np.mod(tooth_start + np.pi, 2 * np.pi) - np.pi
+        tooth_end = np.mod(tooth_end + np.pi, 2 * np.pi) - np.pi
+        lo[i] = np.searchsorted(sorted_angles, tooth_start)
+        hi[i] = np.searchsorted(sorted_angles, tooth_end)
+        wraps[i] = tooth_start >= tooth_end
+
+        # A seam-straddling run continues past n and wraps back to 0
+        first = lo[i]
+        last = hi[i] + n * wraps[i]
+        # Accumulate in float64 locals; rows are written once per segment
+        sx = 0.0
+        sy = 0.0
+        sz = 0.0
+        for j in range(first, last):
+            v = j if j < n else j - n
+            sx += sorted_vertices[v, 0]
+            sy += sorted_vertices[v, 1]
+            sz += sorted_vertices[v, 2]
+        counts[i] = last - first
+        if counts[i] > 0:
+            centers[i, 0] = sx / counts[i]
+            centers[i, 1] = sy / counts[i]
+            centers[i, 2] = sz / counts[i]
+    return lo, hi, wraps, counts, centers
+
+
+def _warm_up():
+    """Compile (or load from cache) all kernels for float64 and float32 vertices."""
+    center = np.ones(3)
+    for dtype in (np.float64, np.float32):
+        vertices = np.zeros((16, 3), dtype=dtype)
+        find_lingual_position_core(vertices, center, np.zeros(3), 0.0, 2, 2.0, 15.0, 10)
+        find_lingual_positions_batch(vertices, np.array([0]), np.array([16]), center.reshape(1, 3),
+                                     np.zeros(3), np.zeros(1), 2, 2.0, 15.0, 10)
+        height_bands_core(vertices[:, 2].copy(), np.array([0]), np.array([16]), np.zeros(1), 2.0)
+        segment_angles_core(np.linspace(-3.0, 3.0, 16).astype(dtype), vertices, -3.0, 0.5, 4)
+    height_band_core(np.zeros((16, 3)), 2, 0.0, 1.0)
+
+
+if NUMBA_AVAILABLE:
+    _warm_up()
@@ -11,6 +11,8 @@ Implements advanced collision detection and avoidance algorithms from FIXR resea
 - Real-time collision avoidance
 """
 
+import logging
+import math
 import numpy as np
 from scipy.spatial import cKDTree
 from typing import List, Dict, Tuple, Optional, Set
@@ -18,6 +20,32 @@ import time
 from dataclasses import dataclass
 from enum import Enum
 
+from core._collision_kernels import (
+    GRID_HASH_SIZE, NUMBA_AVAILABLE, bvh_closest_point, closest_point_on_segment,
+    find_closest_surface_point_batch, grid_closest_points, intersect_rays_bvh,
+    intersect_rays_tris, project_point_to_triangle
+)
+
+logger = logging.getLogger(__name__)
+
+def _sqdist(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Squared Euclidean distance along the last axis (for comparisons, no sqrt)."""
+    d = a - b
+    return (d * d).sum(axis=-1)
+
+
+# Binned SAH BVH build parameters
+BVH_SAH_BINS = 16
+BVH_MAX_LEAF_SIZE = 8
+
+# Uniform spatial hash grid: only built for meshes with at least this many
+# triangles; cells are this multiple of the mean triangle edge length
+GRID_MIN_TRIANGLES = 32
+GRID_CELL_EDGE_FACTOR = 2.0
+
+# Point query cache: direct-mapped table over 1 micron grid cells (power of two)
+COLLISION_CACHE_SIZE = 4096
+
 class CollisionType(Enum):
     """Types of collision detection."""
     POINT_SURFACE = "point_surface"
@@ -37,6 +65,80 @@ class CollisionResult:
     triangle_index: Optional[int] = None
     mesh_region: Optional[str] = None
 
+@dataclass
+class _BatchResults:
+    """
+    Per-point collision results as arrays (one row per query point).
+    
+    points holds the closest surface point for colliding rows and the query
+    point otherwise; tri_idx is -1 for clear rows. CollisionResult objects
+    are only built on demand by iter_results.
+    """
+    mask: np.ndarray
+    points: np.ndarray
+    normals: np.ndarray
+    distances: np.ndarray
+    tri_idx: np.ndarray
+    penetration: np.ndarray
+    collision_type: CollisionType = CollisionType.POINT_SURFACE
+    
+    @classmethod
+    def clear(cls, points: np.ndarray) -> '_BatchResults':
+        """Results for points with no collision and no mesh distance."""
+        n = len(points)
+        return cls(
+            mask=np.zeros(n, dtype=bool),
+            points=np.asarray(points, dtype=np.float32).reshape(n, 3).copy(),
+            normals=np.zeros((n, 3), dtype=np.float32),
+            distances=np.full(n, np.inf, dtype=np.float32),
+            tri_idx=np.full(n, -1, dtype=np.int32),
+            penetration=np.zeros(n, dtype=np.float32)
+        )
+    
+    @classmethod
+    def from_results(cls, results: List[CollisionResult]) -> '_BatchResults':
+        """Pack a list of CollisionResult objects."""
+        n = len(results)
+        return cls(
+            mask=np.array([r.collision_detected for r in results], dtype=bool),
+            points=np.array([r.collision_point for r in results], dtype=np.float32).reshape(n, 3),
+            normals=np.array([r.collision_normal for r in results], dtype=np.float32).reshape(n, 3),
+            distances=np.array([r.collision_distance for r in results], dtype=np.float32),
+            tri_idx=np.array([-1 if r.triangle_index is None else r.triangle_index
+                              for r in results], dtype=np.int32),
+            penetration=np.array([r.penetration_depth for r in results], dtype=np.float32)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.mask)
+    
+    @property
+    def collision_count(self) -> int:
+        return int(np.count_nonzero(self.mask))
+    
+    def iter_results(self):
+        """Lazily yield a CollisionResult per row."""
+        for i in range(len(self.mask)):
+            if self.mask[i]:
+                yield CollisionResult(
+                    collision_detected=True,
+                    collision_type=self.collision_type,
+                    collision_point=self.points[i],
+                    collision_normal=self.normals[i],
+                    penetration_depth=float(self.penetration[i]),
+                    collision_distance=float(self.distances[i]),
+                    triangle_index=int(self.tri_idx[i])
+                )
+            else:
+                yield CollisionResult(
+                    collision_detected=False,
+                    collision_type=self.collision_type,
+                    collision_point=self.points[i],
+                    collision_normal=self.normals[i],
+                    penetration_depth=0.0,
+                    collision_distance=float(self.distances[i])
+                )
+
 @dataclass
 class BoundingBox:
     """Axis-aligned bounding box."""
@@ -62,15 +164,21 @@ class CollisionDetector:
     - Real-time collision avoidance and path correction
     """
     
-    def __init__(self, collision_tolerance: float = 0.5, optimization_enabled: bool = True):
+    def __init__(self, collision_tolerance: float = 0.5, optimization_enabled: bool = True,
+                 timing_enabled: bool = False):
         """Initialize collision detection system."""
         self.collision_tolerance = collision_tolerance
         self.optimization_enabled = optimization_enabled
+        # Per-query timing costs a clock read per call; off unless debugging
+        self._timing_enabled = timing_enabled
         
         # Spatial acceleration structures
         self.mesh_kdtree = None
         self.triangle_kdtree = None
         self.bvh_tree = None
+        self.bvh_min = None
+        self.bvh_max = None
+        self.spatial_grid = None
         
         # Mesh data
         self.mesh_vertices = None
@@ -78,17 +186,23 @@ class CollisionDetector:
         self.mesh_normals = None
         self.triangle_centers = None
         self.triangle_normals = None
-        
-        # Performance tracking
-        self.collision_cache = {}
+        self.tri_v0 = None
+        self.tri_edge1 = None
+        self.tri_edge2 = None
+        
+        # Performance tracking. The point query cache is a fixed-size table
+        # keyed by quantized int32 grid cells; each slot holds the latest result.
+        self._cache_keys = np.zeros((COLLISION_CACHE_SIZE, 3), dtype=np.int32)
+        self._cache_valid = np.zeros(COLLISION_CACHE_SIZE, dtype=bool)
+        self._cache_results: List[Optional[CollisionResult]] = [None] * COLLISION_CACHE_SIZE
         self.performance_stats = {
             'total_queries': 0,
             'cache_hits': 0,
             'collision_detections': 0,
-            'average_query_time': 0.0
+            'total_time': 0.0
         }
         
-        print(f"CollisionDetector initialized with tolerance: {collision_tolerance}mm")
+        logger.debug("CollisionDetector initialized with tolerance: %smm", collision_tolerance)
     
     def initialize_mesh_data(self, mesh_vertices: np.ndarray, mesh_triangles: np.ndarray):
         """
@@ -97,21 +211,23 @@ class CollisionDetector:
         This implements the spatial indexing from FIXR research for efficient
         collision queries.
         """
-        print("Initializing collision detection mesh data...")
+        logger.debug("Initializing collision detection mesh data...")
         
-        self.mesh_vertices = mesh_vertices.copy()
-        self.mesh_triangles = mesh_triangles.copy()
+        # Single precision is ample for tenth-of-a-millimetre tolerances and
+        # halves the memory traffic of every tree and kernel query
+        self.mesh_vertices = np.array(mesh_vertices, dtype=np.float32, order='C')
+        self.mesh_triangles = np.array(mesh_triangles, dtype=np.int32, order='C')
         
         # Build spatial acceleration structures
         self._build_kdtree()
         self._calculate_triangle_data()
         self._build_bvh_tree()
+        self._build_spatial_grid()
         
-        print(f"Collision detection initialized:")
-        print(f"  • Vertices: {len(self.mesh_vertices)}")
-        print(f"  • Triangles: {len(self.mesh_triangles)}")
-        print(f"  • KD-Tree built with {len(self.mesh_vertices)} points")
-        print(f"  • BVH tree built with {len(self.triangle_centers)} triangles")
+        logger.debug("Collision detection initialized: %d vertices, %d triangles "
+                     "in KD-tree and BVH", len(self.mesh_vertices), len(self.mesh_triangles))
+        if self.spatial_grid is not None:
+            logger.debug("Spatial hash grid with %.3fmm cells", self.spatial_grid['cell_size'])
     
     def _build_kdtree(self):
         """Build KD-tree for fast nearest neighbor queries."""
@@ -119,35 +235,31 @@ class CollisionDetector:
             self.mesh_kdtree = cKDTree(self.mesh_vertices)
     
     def _calculate_triangle_data(self):
-        """Calculate triangle centers and normals for collision detection."""
+        """
+        Calculate triangle centers and normals for collision detection.
+        
+        Also keeps each triangle's first vertex and its two edges, the
+        ray-independent terms of every Möller-Trumbore and projection test.
+        """
         if self.mesh_vertices is None or self.mesh_triangles is None:
             return
         
-        self.triangle_centers = []
-        self.triangle_normals = []
+        # Gather all vertex triples at once: (T, 3, 3)
+        tris = self.mesh_vertices[self.mesh_triangles]
+        v0, v1, v2 = tris[:, 0], tris[:, 1], tris[:, 2]
         
-        for triangle in self.mesh_triangles:
-            # Triangle vertices
-            v0 = self.mesh_vertices[triangle[0]]
-            v1 = self.mesh_vertices[triangle[1]]
-            v2 = self.mesh_vertices[triangle[2]]
-            
-            # Triangle center
-            center = (v0 + v1 + v2) / 3
-            self.triangle_centers.append(center)
-            
-            # Triangle normal
-            edge1 = v1 - v0
-            edge2 = v2 - v0
-            normal = np.cross(edge1, edge2)
-            
-            if np.linalg.norm(normal) > 1e-10:
-                normal = normal / np.linalg.norm(normal)
-            
-            self.triangle_normals.append(normal)
+        # Triangle centers
+        self.triangle_centers = tris.mean(axis=1, dtype=np.float32)
         
-        self.triangle_centers = np.array(self.triangle_centers)
-        self.triangle_normals = np.array(self.triangle_normals)
+        self.tri_v0 = np.ascontiguousarray(v0)
+        self.tri_edge1 = np.ascontiguousarray(v1 - v0)
+        self.tri_edge2 = np.ascontiguousarray(v2 - v0)
+        
+        # Triangle normals (zero for degenerate triangles)
+        normals = np.cross(self.tri_edge1, self.tri_edge2)
+        lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+        self.triangle_normals = np.where(
+            lengths > 1e-10, normals / np.maximum(lengths, 1e-20), 0.0).astype(np.float32)
         
         # Build KD-tree for triangle centers
         if len(self.triangle_centers) > 0:
@@ -158,26 +270,196 @@ class CollisionDetector:
         Build Bounding Volume Hierarchy (BVH) tree.
         
         Implements extended OBB tree algorithms from FIXR research
-        for optimized collision detection.
+        for optimized collision detection. Triangle AABBs are kept as two
+        contiguous (T, 3) float32 arrays and organized into a binary AABB
+        hierarchy built with the binned surface area heuristic.
         """
-        if self.triangle_centers is None:
+        if self.triangle_centers is None or len(self.mesh_triangles) == 0:
             return
         
-        # Simplified BVH - in production this would be a full hierarchical structure
-        triangle_bboxes = []
+        tris = self.mesh_vertices[self.mesh_triangles]
         
-        for i, triangle in enumerate(self.mesh_triangles):
-            v0 = self.mesh_vertices[triangle[0]]
-            v1 = self.mesh_vertices[triangle[1]]
-            v2 = self.mesh_vertices[triangle[2]]
+        # Round outward after the float32 cast so every box stays conservative
+        self.bvh_min = np.ascontiguousarray(
+            np.nextafter(tris.min(axis=1).astype(np.float32), np.float32(-np.inf)))
+        self.bvh_max = np.ascontiguousarray(
+            np.nextafter(tris.max(axis=1).astype(np.float32), np.float32(np.inf)))
+        
+        self.bvh_tree = self._build_sah_bvh(self.bvh_min, self.bvh_max, self.triangle_centers)
+        self.bvh_tree.update(self._pack_leaf_triangles(self.bvh_tree['leaf_id']))
+    
+    def _build_sah_bvh(self, box_min: np.ndarray, box_max: np.ndarray,
+                       centroids: np.ndarray) -> Dict:
+        """
+        Binned SAH build over triangle boxes.
+        
+        Nodes are returned as SoA arrays. Internal nodes have node_count == 0
+        and children node_left / node_right_or_prim; leaves hold node_count
+        triangles in row node_right_or_prim of leaf_id, padded with -1 to
+        BVH_MAX_LEAF_SIZE lanes.
+        """
+        node_min, node_max = [], []
+        node_left, node_right_or_prim, node_count = [], [], []
+        leaf_triangles = []
+        max_depth = 0
+        
+        def new_node():
+            node_min.append(None)
+            node_max.append(None)
+            node_left.append(-1)
+            node_right_or_prim.append(-1)
+            node_count.append(0)
+            return len(node_min) - 1
+        
+        pending = [(new_node(), np.arange(len(centroids)), 0)]
+        while pending:
+            node, idx, depth = pending.pop()
+            max_depth = max(max_depth, depth)
+            node_min[node] = box_min[idx].min(axis=0)
+            node_max[node] = box_max[idx].max(axis=0)
             
-            min_point = np.minimum(np.minimum(v0, v1), v2)
-            max_point = np.maximum(np.maximum(v0, v1), v2)
+            if len(idx) <= BVH_MAX_LEAF_SIZE:
+                node_right_or_prim[node] = len(leaf_triangles)
+                node_count[node] = len(idx)
+                leaf_triangles.append(idx)
+                continue
             
-            bbox = BoundingBox(min_point, max_point)
-            triangle_bboxes.append(bbox)
+            left_mask = self._find_sah_split(idx, box_min, box_max, centroids)
+            left = new_node()
+            right = new_node()
+            node_left[node] = left
+            node_right_or_prim[node] = right
+            pending.append((left, idx[left_mask], depth + 1))
+            pending.append((right, idx[~left_mask], depth + 1))
+        
+        leaf_id = np.full((len(leaf_triangles), BVH_MAX_LEAF_SIZE), -1, dtype=np.int32)
+        for block, idx in enumerate(leaf_triangles):
+            leaf_id[block, :len(idx)] = idx
+        
+        return {
+            'node_min': np.array(node_min, dtype=np.float32),
+            'node_max': np.array(node_max, dtype=np.float32),
+            'node_left': np.array(node_left, dtype=np.int32),
+            'node_right_or_prim': np.array(node_right_or_prim, dtype=np.int32),
+            'node_count': np.array(node_count, dtype=np.int32),
+            'leaf_id': leaf_id,
+            # Depth-first traversal holds at most depth + 1 pending nodes
+            'stack_size': max(64, max_depth + 2)
+        }
+    
+    def _pack_leaf_triangles(self, leaf_id: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Pack leaf triangles into (L, BVH_MAX_LEAF_SIZE, 3) float32 blocks.
         
-        self.bvh_tree = triangle_bboxes
+        Each lane stores p0, e1 = p1 - p0, e2 = p2 - p0 and the unit normal,
+        so leaf tests read contiguous lanes instead of gathering vertices
+        through the triangle index array. Padding lanes are zero-area
+        triangles at the origin.
+        """
+        valid = leaf_id >= 0
+        packed = {}
+        for key, source in (('leaf_p0', self.tri_v0), ('leaf_e1', self.tri_edge1),
+                            ('leaf_e2', self.tri_edge2), ('leaf_n', self.triangle_normals)):
+            block = np.zeros(leaf_id.shape + (3,), dtype=np.float32)
+            block[valid] = source[leaf_id[valid]]
+            packed[key] = block
+        return packed
+    
+    def _find_sah_split(self, idx: np.ndarray, box_min: np.ndarray, box_max: np.ndarray,
+                        centroids: np.ndarray) -> np.ndarray:
+        """Mask of the triangles going left at the minimum-cost bin boundary."""
+        centers = centroids[idx]
+        c_min = centers.min(axis=0)
+        extent = centers.max(axis=0) - c_min
+        axis = int(np.argmax(extent))
+        
+        if extent[axis] <= 0:
+            # Coincident centroids: no plane separates them, split the list in half
+            left_mask = np.zeros(len(idx), dtype=bool)
+            left_mask[:len(idx) // 2] = True
+            return left_mask
+        
+        # Bin centroids along the longest axis and accumulate per-bin bounds
+        bins = np.minimum(
+            (BVH_SAH_BINS * (centers[:, axis] - c_min[axis]) / extent[axis]).astype(np.int64),
+            BVH_SAH_BINS - 1
+        )
+        counts = np.bincount(bins, minlength=BVH_SAH_BINS)
+        bin_min = np.full((BVH_SAH_BINS, 3), np.inf, dtype=np.float32)
+        bin_max = np.full((BVH_SAH_BINS, 3), -np.inf, dtype=np.float32)
+        np.minimum.at(bin_min, bins, box_min[idx])
+        np.maximum.at(bin_max, bins, box_max[idx])
+        
+        # Cost of splitting after each bin; the first and last bins are never
+        # empty, so both sides of every candidate plane hold triangles
+        left_count = np.cumsum(counts)[:-1]
+        right_count = len(idx) - left_count
+        left_area = self._surface_area(np.minimum.accumulate(bin_min)[:-1],
+                                       np.maximum.accumulate(bin_max)[:-1])
+        right_area = self._surface_area(np.minimum.accumulate(bin_min[::-1])[::-1][1:],
+                                        np.maximum.accumulate(bin_max[::-1])[::-1][1:])
+        cost = left_count * left_area + right_count * right_area
+        
+        return bins <= int(np.argmin(cost))
+    
+    def _build_spatial_grid(self):
+        """
+        Bucket triangles into a uniform spatial hash grid.
+        
+        Each triangle is added to every cell its AABB overlaps; cells are
+        hashed into GRID_HASH_SIZE buckets stored as CSR arrays
+        (cell_offsets, cell_tri_ids). Small meshes keep the KD-tree/BVH path.
+        """
+        self.spatial_grid = None
+        if self.mesh_triangles is None or len(self.mesh_triangles) < GRID_MIN_TRIANGLES:
+            return
+        
+        tris = self.mesh_vertices[self.mesh_triangles]
+        edge_lengths = np.linalg.norm(tris - np.roll(tris, 1, axis=1), axis=2)
+        cell_size = GRID_CELL_EDGE_FACTOR * float(edge_lengths.mean())
+        if cell_size <= 0:
+            return
+        
+        # Cell ranges covered by each triangle box
+        lo = np.floor(tris.min(axis=1) / cell_size).astype(np.int64)
+        hi = np.floor(tris.max(axis=1) / cell_size).astype(np.int64)
+        span = hi - lo + 1
+        cells_per_tri = span.prod(axis=1)
+        
+        # Enumerate every (triangle, cell) pair without a Python loop
+        tri_ids = np.repeat(np.arange(len(tris)), cells_per_tri)
+        local = np.arange(len(tri_ids)) - np.repeat(np.cumsum(cells_per_tri) - cells_per_tri, cells_per_tri)
+        sx = span[tri_ids, 0]
+        sy = span[tri_ids, 1]
+        ix = lo[tri_ids, 0] + local % sx
+        iy = lo[tri_ids, 1] + (local // sx) % sy
+        iz = lo[tri_ids, 2] + local // (sx * sy)
+        buckets = ((ix * 73856093) ^ (iy * 19349663) ^ (iz * 83492791)) & (GRID_HASH_SIZE - 1)
+        
+        order = np.argsort(buckets, kind='stable')
+        cell_offsets = np.zeros(GRID_HASH_SIZE + 1, dtype=np.int32)
+        np.cumsum(np.bincount(buckets, minlength=GRID_HASH_SIZE), out=cell_offsets[1:])
+        
+        self.spatial_grid = {
+            'cell_size': cell_size,
+            'cell_offsets': cell_offsets,
+            'cell_tri_ids': tri_ids[order].astype(np.int32)
+        }
+    
+    def _bvh_kernel_args(self, normals: bool = True) -> Tuple[np.ndarray, ...]:
+        """Node and packed leaf arrays in the order the BVH kernels take them."""
+        bvh = self.bvh_tree
+        args = (bvh['node_min'], bvh['node_max'], bvh['node_left'], bvh['node_right_or_prim'],
+                bvh['node_count'], bvh['leaf_p0'], bvh['leaf_e1'], bvh['leaf_e2'])
+        if normals:
+            args += (bvh['leaf_n'],)
+        return args + (bvh['leaf_id'],)
+    
+    @staticmethod
+    def _surface_area(box_min: np.ndarray, box_max: np.ndarray) -> np.ndarray:
+        """Surface area of axis-aligned boxes."""
+        d = box_max - box_min
+        return 2 * (d[..., 0] * d[..., 1] + d[..., 1] * d[..., 2] + d[..., 2] * d[..., 0])
     
     def check_point_collision(self, point: np.ndarray, 
                              collision_type: CollisionType = CollisionType.POINT_SURFACE) -> CollisionResult:
@@ -187,14 +469,17 @@ class CollisionDetector:
         Implements ray collision detection algorithms from FIXR research
         to identify potential interference between wire path and teeth structures.
         """
-        start_time = time.time()
+        if self._timing_enabled:
+            start_time = time.perf_counter()
         self.performance_stats['total_queries'] += 1
         
         # Check cache first
-        point_key = tuple(np.round(point, 3))
-        if point_key in self.collision_cache:
-            self.performance_stats['cache_hits'] += 1
-            return self.collision_cache[point_key]
+        slot, ix, iy, iz = self._cache_slot(point)
+        if self._cache_valid[slot]:
+            key = self._cache_keys[slot]
+            if key[0] == ix and key[1] == iy and key[2] == iz:
+                self.performance_stats['cache_hits'] += 1
+                return self._cache_results[slot]
         
         if self.mesh_kdtree is None:
             return CollisionResult(False, collision_type, point, np.zeros(3), 0.0, float('inf'))
@@ -231,27 +516,47 @@ class CollisionDetector:
                 collision_distance=min_distance
             )
         
-        # Cache result
-        self.collision_cache[point_key] = result
+        # Cache result, replacing whatever occupied the slot
+        self._cache_keys[slot] = (ix, iy, iz)
+        self._cache_valid[slot] = True
+        self._cache_results[slot] = result
         
         # Update performance stats
-        query_time = time.time() - start_time
-        self.performance_stats['average_query_time'] = (
-            (self.performance_stats['average_query_time'] * (self.performance_stats['total_queries'] - 1) + 
-             query_time) / self.performance_stats['total_queries']
-        )
+        if self._timing_enabled:
+            self.performance_stats['total_time'] += time.perf_counter() - start_time
         
         return result
     
+    @staticmethod
+    def _cache_slot(point: np.ndarray) -> Tuple[int, int, int, int]:
+        """Cache slot and 1 micron grid cell of a point (spatial-hash primes)."""
+        ix = math.floor(float(point[0]) * 1000.0)
+        iy = math.floor(float(point[1]) * 1000.0)
+        iz = math.floor(float(point[2]) * 1000.0)
+        slot = ((ix * 73856093) ^ (iy * 19349663) ^ (iz * 83492791)) & (COLLISION_CACHE_SIZE - 1)
+        return slot, ix, iy, iz
+    
     def _find_closest_surface_point(self, point: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
         """Find closest point on mesh surface and its normal."""
+        if NUMBA_AVAILABLE and self.bvh_tree is not None:
+            # Exact closest point over all triangles, pruned by BVH box distance
+            bvh = self.bvh_tree
+            closest_point, _, triangle_idx = bvh_closest_point(
+                np.asarray(point, dtype=np.float64), *self._bvh_kernel_args(), bvh['stack_size']
+            )
+            return closest_point, self.triangle_normals[triangle_idx], int(triangle_idx)
+        
         if self.triangle_kdtree is None:
             nearest_vertex_idx = self.mesh_kdtree.query(point)[1]
             return self.mesh_vertices[nearest_vertex_idx], np.array([0, 0, 1]), -1
         
         # Find nearest triangles
         distances, triangle_indices = self.triangle_kdtree.query(point, k=5)
-        
+        return self._closest_on_candidates(point, triangle_indices)
+    
+    def _closest_on_candidates(self, point: np.ndarray,
+                               triangle_indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Closest point, normal and index over candidate triangles (KD-tree padding skipped)."""
         closest_point = point
         closest_normal = np.array([0, 0, 1])
         closest_triangle_idx = -1
@@ -277,20 +582,73 @@ class CollisionDetector:
         
         return closest_point, closest_normal, closest_triangle_idx
     
+    def _find_closest_surface_points(self, points: np.ndarray,
+                                     max_distance: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Batched _find_closest_surface_point returning (N, 3) points, (N, 3) normals and (N,) indices.
+        
+        When every point is known to lie within max_distance of the surface
+        and that is below the grid cell size, the spatial hash grid answers
+        the query from each point's neighbouring cells.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        
+        grid = self.spatial_grid
+        if (NUMBA_AVAILABLE and grid is not None and max_distance is not None
+                and max_distance < grid['cell_size']):
+            closest_points, normals, triangle_indices = grid_closest_points(
+                points, grid['cell_size'], grid['cell_offsets'], grid['cell_tri_ids'],
+                self.tri_v0, self.tri_edge1, self.tri_edge2, self.triangle_normals
+            )
+            missed = triangle_indices < 0
+            if np.any(missed):
+                (closest_points[missed], normals[missed],
+                 triangle_indices[missed]) = self._find_closest_surface_points(points[missed])
+            return closest_points, normals, triangle_indices
+        
+        if NUMBA_AVAILABLE and self.bvh_tree is not None:
+            bvh = self.bvh_tree
+            return find_closest_surface_point_batch(
+                points, *self._bvh_kernel_args(), self.triangle_normals, bvh['stack_size']
+            )
+        
+        closest_points = np.empty((len(points), 3), dtype=np.float32)
+        normals = np.empty((len(points), 3), dtype=np.float32)
+        triangle_indices = np.empty(len(points), dtype=np.int64)
+        if self.triangle_kdtree is None or len(points) == 0:
+            for i, point in enumerate(points):
+                closest_points[i], normals[i], triangle_indices[i] = self._find_closest_surface_point(point)
+            return closest_points, normals, triangle_indices
+        
+        # Candidate triangles for all points in one multithreaded query
+        _, candidates = self.triangle_kdtree.query(points, k=5, workers=-1)
+        for i, point in enumerate(points):
+            closest_points[i], normals[i], triangle_indices[i] = self._closest_on_candidates(
+                point, candidates[i])
+        return closest_points, normals, triangle_indices
+    
     def _project_point_to_triangle(self, point: np.ndarray, v0: np.ndarray, 
                                   v1: np.ndarray, v2: np.ndarray) -> Tuple[np.ndarray, float]:
         """Project point onto triangle and return closest point and distance."""
+        if NUMBA_AVAILABLE:
+            qx, qy, qz, distance_sq = project_point_to_triangle(
+                point[0], point[1], point[2], v0[0], v0[1], v0[2],
+                v1[0], v1[1], v1[2], v2[0], v2[1], v2[2]
+            )
+            return np.array([qx, qy, qz]), np.sqrt(distance_sq)
+        
         # Triangle edges
         edge1 = v1 - v0
         edge2 = v2 - v0
         
         # Triangle normal
         normal = np.cross(edge1, edge2)
-        if np.linalg.norm(normal) > 1e-10:
-            normal = normal / np.linalg.norm(normal)
+        normal_length = np.sqrt(np.dot(normal, normal))
+        if normal_length > 1e-10:
+            normal = normal / normal_length
         else:
             # Degenerate triangle
-            return v0, np.linalg.norm(point - v0)
+            return v0, np.sqrt(_sqdist(point, v0))
         
         # Project point onto triangle plane
         to_point = point - v0
@@ -317,18 +675,26 @@ class CollisionDetector:
             return projected_point, abs(distance_to_plane)
         else:
             # Outside triangle - find closest edge point
-            edge_points = [
+            edge_points = np.array([
                 self._closest_point_on_line_segment(point, v0, v1),
                 self._closest_point_on_line_segment(point, v1, v2),
                 self._closest_point_on_line_segment(point, v2, v0)
-            ]
+            ])
             
-            closest_edge_point = min(edge_points, key=lambda p: np.linalg.norm(point - p))
-            return closest_edge_point, np.linalg.norm(point - closest_edge_point)
+            # Compare squared distances; only the chosen one needs a root
+            edge_distances_sq = _sqdist(edge_points, point)
+            nearest = int(np.argmin(edge_distances_sq))
+            return edge_points[nearest], np.sqrt(edge_distances_sq[nearest])
     
     def _closest_point_on_line_segment(self, point: np.ndarray, line_start: np.ndarray, 
                                       line_end: np.ndarray) -> np.ndarray:
         """Find closest point on line segment to given point."""
+        if NUMBA_AVAILABLE:
+            return np.array(closest_point_on_segment(
+                point[0], point[1], point[2], line_start[0], line_start[1], line_start[2],
+                line_end[0], line_end[1], line_end[2]
+            ))
+        
         line_vec = line_end - line_start
         point_vec = point - line_start
         
@@ -342,54 +708,89 @@ class CollisionDetector:
         
         return line_start + t * line_vec
     
-    def check_path_collision(self, path_points: np.ndarray) -> List[CollisionResult]:
+    def check_path_collision(self, path_points: np.ndarray) -> _BatchResults:
         """
         Check collision for entire wire path.
         
         Performs comprehensive collision detection along the wire path
-        with optimization for performance.
+        with optimization for performance: one KD-tree query for all points
+        and one batched surface query for the colliding ones. Results are
+        returned as arrays; use iter_results() for CollisionResult objects.
         """
-        collision_results = []
+        logger.debug("Checking collision for path with %d points...", len(path_points))
         
-        print(f"Checking collision for path with {len(path_points)} points...")
+        results = self._check_points(path_points)
         
-        for i, point in enumerate(path_points):
-            result = self.check_point_collision(point)
-            collision_results.append(result)
-            
-            # Progress reporting for large paths
-            if i % 100 == 0 and i > 0:
-                collision_count = sum(1 for r in collision_results if r.collision_detected)
-                print(f"  Progress: {i}/{len(path_points)} points, {collision_count} collisions detected")
+        logger.debug("Path collision check complete: %d collisions detected", results.collision_count)
         
-        total_collisions = sum(1 for r in collision_results if r.collision_detected)
-        print(f"Path collision check complete: {total_collisions} collisions detected")
+        return results
+    
+    def _check_points(self, points: np.ndarray) -> _BatchResults:
+        """Batched point collision check."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        results = _BatchResults.clear(points)
+        
+        self.performance_stats['total_queries'] += len(points)
+        if self.mesh_kdtree is None or len(points) == 0:
+            return results
+        
+        # Distances to the nearest mesh vertex for all points in one multithreaded call
+        distances, _ = self.mesh_kdtree.query(points, k=1, workers=-1)
+        hit = distances < self.collision_tolerance
+        results.distances = distances.astype(np.float32)
+        results.mask = hit
+        
+        # Surface point, normal and triangle for the colliding points only
+        if np.any(hit):
+            # A colliding point is closer to the surface than to its nearest
+            # vertex, so the tolerance bounds the search radius
+            closest_points, normals, triangle_indices = self._find_closest_surface_points(
+                points[hit], max_distance=self.collision_tolerance)
+            results.points[hit] = closest_points
+            results.normals[hit] = normals
+            results.tri_idx[hit] = triangle_indices
+            results.penetration[hit] = np.maximum(self.collision_tolerance - distances[hit], 0.0)
+            self.performance_stats['collision_detections'] += results.collision_count
         
-        return collision_results
+        return results
+    
+    def _as_batch_results(self, collision_results) -> _BatchResults:
+        """Accept either _BatchResults or a CollisionResult list."""
+        if isinstance(collision_results, _BatchResults):
+            return collision_results
+        return _BatchResults.from_results(collision_results)
     
-    def resolve_path_collisions(self, path_points: np.ndarray, 
-                               collision_results: List[CollisionResult]) -> np.ndarray:
+    def resolve_path_collisions(self, path_points: np.ndarray, collision_results) -> np.ndarray:
         """
         Resolve collisions by adjusting path points.
         
         Implements collision avoidance algorithms that maintain smooth
         wire path while avoiding geometric conflicts.
         """
-        corrected_path = path_points.copy()
-        correction_count = 0
-        
-        for i, (point, collision) in enumerate(zip(path_points, collision_results)):
-            if collision.collision_detected:
-                corrected_point = self._resolve_single_collision(point, collision)
-                corrected_path[i] = corrected_point
-                correction_count += 1
+        results = self._as_batch_results(collision_results)
+        mask = results.mask
+        correction_count = results.collision_count
+        
+        if correction_count == 0:
+            return path_points.copy()
+        
+        # Same rule as _resolve_single_collision for every point at once: move
+        # along the surface normal, else away from the surface point, else up
+        surface_points = results.points
+        normals = results.normals
+        away = path_points - surface_points
+        has_normal = _sqdist(normals, 0.0) > 1e-12
+        has_away = _sqdist(away, 0.0) >= 1e-12
+        directions = np.where(has_normal[:, None], normals,
+                              np.where(has_away[:, None], away, np.array([0.0, 0.0, 1.0])))
+        directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
         
-        if correction_count > 0:
-            print(f"Resolved {correction_count} collisions")
-            # Apply smoothing to maintain wire continuity
-            corrected_path = self._smooth_corrected_path(corrected_path, path_points, collision_results)
+        safe_distance = self.collision_tolerance + 0.5  # Extra margin
+        corrected_path = np.where(mask[:, None], surface_points + directions * safe_distance, path_points)
         
-        return corrected_path
+        logger.debug("Resolved %d collisions", correction_count)
+        # Apply smoothing to maintain wire continuity
+        return self._smooth_corrected_path(corrected_path, path_points, results)
     
     def _resolve_single_collision(self, collision_point: np.ndarray, 
                                  collision: CollisionResult) -> np.ndarray:
@@ -400,13 +801,13 @@ class CollisionDetector:
         # Move point along collision normal to safe distance
         safe_distance = self.collision_tolerance + 0.5  # Extra margin
         
-        if np.linalg.norm(collision.collision_normal) > 1e-6:
+        if _sqdist(collision.collision_normal, 0.0) > 1e-12:
             # Use surface normal for correction
             correction_direction = collision.collision_normal
         else:
             # Fallback: move away from collision point
             correction_direction = collision_point - collision.collision_point
-            if np.linalg.norm(correction_direction) < 1e-6:
+            if _sqdist(correction_direction, 0.0) < 1e-12:
                 correction_direction = np.array([0, 0, 1])  # Default upward
         
         # Normalize direction
@@ -418,32 +819,34 @@ class CollisionDetector:
         return corrected_point
     
     def _smooth_corrected_path(self, corrected_path: np.ndarray, original_path: np.ndarray,
-                              collision_results: List[CollisionResult]) -> np.ndarray:
-        """Apply smoothing to corrected path while preserving collision avoidance."""
-        smoothed_path = corrected_path.copy()
-        
-        # Identify corrected segments
-        corrected_indices = [i for i, result in enumerate(collision_results) if result.collision_detected]
+                              collision_results) -> np.ndarray:
+        """
+        Apply smoothing to corrected path while preserving collision avoidance.
         
-        # Apply local smoothing around corrected areas
-        for idx in corrected_indices:
-            # Define smoothing window
-            window_start = max(0, idx - 2)
-            window_end = min(len(smoothed_path), idx + 3)
-            
-            # Only smooth if we won't affect other corrected points
-            window_indices = list(range(window_start, window_end))
-            if any(i in corrected_indices for i in window_indices if i != idx):
-                continue
-            
-            # Apply gentle smoothing
-            for i in range(window_start + 1, window_end - 1):
-                if i == idx:
-                    continue  # Don't modify the corrected point
-                
-                # Weighted average with neighbors
-                neighbor_avg = (smoothed_path[i-1] + smoothed_path[i+1]) / 2
-                smoothed_path[i] = 0.7 * smoothed_path[i] + 0.3 * neighbor_avg
+        The direct neighbours of each isolated corrected point (no other
+        correction within two positions) are blended with their neighbour
+        average; corrected points and path ends are left unchanged.
+        """
+        smoothed_path = corrected_path.copy()
+        n = len(smoothed_path)
+        if n < 3:
+            return smoothed_path
+        
+        # Identify corrected points with no other correction in their window
+        corrected = self._as_batch_results(collision_results).mask
+        padded = np.pad(corrected, 2)
+        nearby = padded[:n] | padded[1:n + 1] | padded[3:n + 3] | padded[4:n + 4]
+        isolated = corrected & ~nearby
+        
+        # Their direct neighbours, excluding the path ends
+        targets = np.zeros(n, dtype=bool)
+        targets[:-1] |= isolated[1:]
+        targets[1:] |= isolated[:-1]
+        targets[[0, -1]] = False
+        
+        # Weighted average with neighbors
+        blended = 0.7 * corrected_path[1:-1] + 0.15 * (corrected_path[:-2] + corrected_path[2:])
+        smoothed_path[1:-1][targets[1:-1]] = blended[targets[1:-1]]
         
         return smoothed_path
     
@@ -459,14 +862,10 @@ class CollisionDetector:
             self.mesh_vertices is None):
             return False, 0.0, np.zeros(3)
         
-        triangle = self.mesh_triangles[triangle_index]
-        v0 = self.mesh_vertices[triangle[0]]
-        v1 = self.mesh_vertices[triangle[1]]
-        v2 = self.mesh_vertices[triangle[2]]
-        
-        # Möller-Trumbore intersection algorithm
-        edge1 = v1 - v0
-        edge2 = v2 - v0
+        # Möller-Trumbore intersection algorithm on the precomputed edges
+        v0 = self.tri_v0[triangle_index]
+        edge1 = self.tri_edge1[triangle_index]
+        edge2 = self.tri_edge2[triangle_index]
         h = np.cross(ray_direction, edge2)
         a = np.dot(edge1, h)
         
@@ -496,6 +895,84 @@ class CollisionDetector:
         
         return False, 0.0, np.zeros(3)
     
+    def ray_any_intersection(self, ray_origin: np.ndarray, ray_direction: np.ndarray,
+                             candidates: Optional[np.ndarray] = None) -> Tuple[bool, float, int]:
+        """
+        Nearest hit of a ray against all triangles (or the candidate subset).
+        
+        Returns (hit, t, triangle_index); t is 0.0 and the index -1 on a miss.
+        """
+        hits, t, indices = self.rays_first_intersection(
+            np.reshape(ray_origin, (1, 3)), np.reshape(ray_direction, (1, 3)), candidates)
+        return bool(hits[0]), float(t[0]), int(indices[0])
+    
+    def rays_first_intersection(self, ray_origins: np.ndarray, ray_directions: np.ndarray,
+                                candidates: Optional[np.ndarray] = None
+                                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized Möller-Trumbore for R rays against M triangles at once.
+        
+        Same acceptance tests as ray_triangle_intersection, evaluated on
+        (R, M) arrays. Returns per-ray hit flags, nearest t (0.0 on a miss)
+        and triangle indices (-1 on a miss). With Numba the rays are cast in
+        parallel by scalar kernels instead, through the BVH for whole-mesh
+        queries, without the (R, M) temporaries.
+        """
+        ray_origins = np.asarray(ray_origins, dtype=np.float64).reshape(-1, 3)
+        ray_directions = np.asarray(ray_directions, dtype=np.float64).reshape(-1, 3)
+        n_rays = len(ray_origins)
+        
+        if self.mesh_vertices is None or self.mesh_triangles is None:
+            return np.zeros(n_rays, dtype=bool), np.zeros(n_rays), np.full(n_rays, -1, dtype=np.int64)
+        
+        if NUMBA_AVAILABLE:
+            if candidates is None and self.bvh_tree is not None:
+                bvh = self.bvh_tree
+                t, indices = intersect_rays_bvh(
+                    ray_origins, ray_directions, *self._bvh_kernel_args(normals=False),
+                    bvh['stack_size']
+                )
+            else:
+                if candidates is None:
+                    candidates = np.arange(len(self.mesh_triangles))
+                t, indices = intersect_rays_tris(
+                    ray_origins, ray_directions, self.tri_v0, self.tri_edge1, self.tri_edge2,
+                    np.asarray(candidates, dtype=np.int64)
+                )
+            hits = indices >= 0
+            return hits, np.where(hits, t, 0.0), indices
+        
+        if candidates is None:
+            candidates = np.arange(len(self.mesh_triangles))
+        candidates = np.asarray(candidates, dtype=np.int64)
+        if len(candidates) == 0:
+            return np.zeros(n_rays, dtype=bool), np.zeros(n_rays), np.full(n_rays, -1, dtype=np.int64)
+        
+        v0 = self.tri_v0[candidates]
+        edge1 = self.tri_edge1[candidates]
+        edge2 = self.tri_edge2[candidates]
+        
+        # Rays along axis 0, triangles along axis 1
+        direction = ray_directions[:, None, :]
+        h = np.cross(direction, edge2)
+        a = np.einsum('mk,rmk->rm', edge1, h)
+        parallel = np.abs(a) < 1e-10
+        f = 1.0 / np.where(parallel, np.inf, a)
+        s = ray_origins[:, None, :] - v0
+        u = f * np.einsum('rmk,rmk->rm', s, h)
+        q = np.cross(s, edge1)
+        v = f * np.einsum('rmk,rmk->rm', direction, q)
+        t = f * np.einsum('mk,rmk->rm', edge2, q)
+        
+        valid = ~parallel & (u >= 0.0) & (u <= 1.0) & (v >= 0.0) & (u + v <= 1.0) & (t > 1e-10)
+        t = np.where(valid, t, np.inf)
+        nearest = np.argmin(t, axis=1)
+        nearest_t = t[np.arange(n_rays), nearest]
+        hits = np.isfinite(nearest_t)
+        
+        return (hits, np.where(hits, nearest_t, 0.0),
+                np.where(hits, candidates[nearest], -1))
+    
     def batch_collision_check(self, points: np.ndarray, use_parallel: bool = True) -> List[CollisionResult]:
         """
         Batch collision checking for improved performance.
@@ -507,136 +984,100 @@ class CollisionDetector:
             return [CollisionResult(False, CollisionType.POINT_SURFACE, point, 
                                   np.zeros(3), 0.0, float('inf')) for point in points]
         
-        print(f"Batch collision check for {len(points)} points...")
-        
-        # Query all points at once for better performance
-        distances, indices = self.mesh_kdtree.query(points, k=1)
+        logger.debug("Batch collision check for %d points...", len(points))
         
-        results = []
-        for i, (point, distance, vertex_idx) in enumerate(zip(points, distances, indices)):
-            collision_detected = distance < self.collision_tolerance
-            
-            if collision_detected:
-                # Get detailed collision information
-                closest_point, normal, triangle_idx = self._find_closest_surface_point(point)
-                penetration_depth = max(self.collision_tolerance - distance, 0.0)
-                
-                result = CollisionResult(
-                    collision_detected=True,
-                    collision_type=CollisionType.POINT_SURFACE,
-                    collision_point=closest_point,
-                    collision_normal=normal,
-                    penetration_depth=penetration_depth,
-                    collision_distance=distance,
-                    triangle_index=triangle_idx
-                )
-            else:
-                result = CollisionResult(
-                    collision_detected=False,
-                    collision_type=CollisionType.POINT_SURFACE,
-                    collision_point=point,
-                    collision_normal=np.zeros(3),
-                    penetration_depth=0.0,
-                    collision_distance=distance
-                )
-            
-            results.append(result)
+        results = self._check_points(points)
         
-        collision_count = sum(1 for r in results if r.collision_detected)
-        print(f"Batch collision check complete: {collision_count} collisions detected")
+        logger.debug("Batch collision check complete: %d collisions detected", results.collision_count)
         
-        return results
+        return list(results.iter_results())
     
     def get_collision_statistics(self) -> Dict:
         """Get comprehensive collision detection statistics."""
-        cache_hit_rate = (self.performance_stats['cache_hits'] / 
-                         max(self.performance_stats['total_queries'], 1)) * 100
+        total_queries = max(self.performance_stats['total_queries'], 1)
+        cache_hit_rate = (self.performance_stats['cache_hits'] / total_queries) * 100
+        average_query_time = self.performance_stats['total_time'] / total_queries
         
         return {
             'total_queries': self.performance_stats['total_queries'],
             'collision_detections': self.performance_stats['collision_detections'],
             'cache_hits': self.performance_stats['cache_hits'],
             'cache_hit_rate': cache_hit_rate,
-            'average_query_time': self.performance_stats['average_query_time'] * 1000,  # ms
+            'average_query_time': average_query_time * 1000,  # ms (0 unless timing_enabled)
             'collision_tolerance': self.collision_tolerance,
             'mesh_vertices': len(self.mesh_vertices) if self.mesh_vertices is not None else 0,
             'mesh_triangles': len(self.mesh_triangles) if self.mesh_triangles is not None else 0,
-            'cache_size': len(self.collision_cache)
+            'cache_size': int(np.count_nonzero(self._cache_valid))
         }
     
     def clear_cache(self):
         """Clear collision detection cache."""
-        self.collision_cache.clear()
-        print("Collision detection cache cleared")
+        self._cache_valid[:] = False
+        self._cache_results = [None] * COLLISION_CACHE_SIZE
+        logger.debug("Collision detection cache cleared")
     
     def set_collision_tolerance(self, tolerance: float):
         """Update collision tolerance and clear cache."""
         self.collision_tolerance = tolerance
         self.clear_cache()  # Cache is no longer valid
-        print(f"Collision tolerance updated to {tolerance}mm")
+        logger.debug("Collision tolerance updated to %smm", tolerance)
     
-    def visualize_collision_data(self, collision_results: List[CollisionResult]) -> Dict:
+    def visualize_collision_data(self, collision_results) -> Dict:
         """
         Generate visualization data for collision results.
         
         Returns data that can be used by visualization systems to show
         collision points, normals, and corrected paths.
         """
-        collision_points = []
-        collision_normals = []
-        penetration_depths = []
-        safe_points = []
-        
-        for result in collision_results:
-            if result.collision_detected:
-                collision_points.append(result.collision_point)
-                collision_normals.append(result.collision_normal)
-                penetration_depths.append(result.penetration_depth)
-                
-                # Calculate safe point
-                safe_distance = self.collision_tolerance + 0.5
-                if np.linalg.norm(result.collision_normal) > 1e-6:
-                    safe_point = (result.collision_point + 
-                                result.collision_normal * safe_distance)
-                    safe_points.append(safe_point)
+        results = self._as_batch_results(collision_results)
+        collision_points = results.points[results.mask]
+        collision_normals = results.normals[results.mask]
+        penetration_depths = results.penetration[results.mask]
+        
+        # Safe points along the surface normal, where there is one
+        safe_distance = self.collision_tolerance + 0.5
+        has_normal = _sqdist(collision_normals, 0.0) > 1e-12
+        safe_points = collision_points[has_normal] + collision_normals[has_normal] * safe_distance
         
         return {
-            'collision_points': np.array(collision_points) if collision_points else np.array([]),
-            'collision_normals': np.array(collision_normals) if collision_normals else np.array([]),
-            'penetration_depths': np.array(penetration_depths) if penetration_depths else np.array([]),
-            'safe_points': np.array(safe_points) if safe_points else np.array([]),
+            'collision_points': collision_points if len(collision_points) else np.array([]),
+            'collision_normals': collision_normals if len(collision_normals) else np.array([]),
+            'penetration_depths': penetration_depths if len(penetration_depths) else np.array([]),
+            'safe_points': safe_points if len(safe_points) else np.array([]),
             'collision_count': len(collision_points),
-            'max_penetration': max(penetration_depths) if penetration_depths else 0.0,
-            'average_penetration': np.mean(penetration_depths) if penetration_depths else 0.0
+            'max_penetration': float(penetration_depths.max()) if len(penetration_depths) else 0.0,
+            'average_penetration': float(penetration_depths.mean()) if len(penetration_depths) else 0.0
         }
     
-    def export_collision_report(self, collision_results: List[CollisionResult], 
+    def export_collision_report(self, collision_results, 
                                original_path: np.ndarray, corrected_path: np.ndarray) -> Dict:
         """
         Export comprehensive collision detection report.
         
         Provides detailed analysis for manufacturing and quality control.
         """
-        collision_points = [r for r in collision_results if r.collision_detected]
+        results = self._as_batch_results(collision_results)
+        penetration = results.penetration[results.mask]
+        deviations = self._point_deviations(original_path, corrected_path)
         
         report = {
             'summary': {
-                'total_path_points': len(collision_results),
-                'collision_detections': len(collision_points),
-                'collision_rate': len(collision_points) / len(collision_results) * 100,
+                'total_path_points': len(results),
+                'collision_detections': len(penetration),
+                'collision_rate': len(penetration) / len(results) * 100,
                 'collision_tolerance': self.collision_tolerance,
-                'max_penetration_depth': max([r.penetration_depth for r in collision_points]) if collision_points else 0.0,
-                'average_penetration_depth': np.mean([r.penetration_depth for r in collision_points]) if collision_points else 0.0
+                'max_penetration_depth': float(penetration.max()) if len(penetration) else 0.0,
+                'average_penetration_depth': float(penetration.mean()) if len(penetration) else 0.0
             },
             'path_analysis': {
                 'original_path_length': self._calculate_path_length(original_path),
                 'corrected_path_length': self._calculate_path_length(corrected_path),
-                'path_deviation': self._calculate_path_deviation(original_path, corrected_path),
-                'max_point_deviation': self._calculate_max_point_deviation(original_path, corrected_path)
+                'path_deviation': float(deviations.mean()) if len(deviations) else 0.0,
+                'max_point_deviation': float(deviations.max()) if len(deviations) else 0.0
             },
-            'collision_regions': self._analyze_collision_regions(collision_points),
+            'collision_regions': self._analyze_collision_regions(results.points[results.mask]),
             'performance_metrics': self.get_collision_statistics(),
-            'recommendations': self._generate_collision_recommendations(collision_results)
+            'recommendations': self._generate_collision_recommendations(results)
         }
         
         return report
@@ -646,68 +1087,49 @@ class CollisionDetector:
         if len(path) < 2:
             return 0.0
         
-        total_length = 0.0
-        for i in range(len(path) - 1):
-            segment_length = np.linalg.norm(path[i + 1] - path[i])
-            total_length += segment_length
-        
-        return total_length
+        return float(np.linalg.norm(np.diff(path, axis=0), axis=1).sum())
     
-    def _calculate_path_deviation(self, original: np.ndarray, corrected: np.ndarray) -> float:
-        """Calculate average deviation between original and corrected paths."""
+    def _point_deviations(self, original: np.ndarray, corrected: np.ndarray) -> np.ndarray:
+        """Per-point distances between original and corrected paths (empty if lengths differ)."""
         if len(original) != len(corrected):
-            return 0.0
-        
-        deviations = [np.linalg.norm(orig - corr) for orig, corr in zip(original, corrected)]
-        return np.mean(deviations)
-    
-    def _calculate_max_point_deviation(self, original: np.ndarray, corrected: np.ndarray) -> float:
-        """Calculate maximum point deviation between paths."""
-        if len(original) != len(corrected):
-            return 0.0
+            return np.empty(0)
         
-        deviations = [np.linalg.norm(orig - corr) for orig, corr in zip(original, corrected)]
-        return max(deviations) if deviations else 0.0
+        return np.linalg.norm(np.asarray(original) - np.asarray(corrected), axis=-1)
     
-    def _analyze_collision_regions(self, collision_results: List[CollisionResult]) -> Dict:
+    def _analyze_collision_regions(self, collision_points: np.ndarray) -> Dict:
         """Analyze collision distribution and identify problem regions."""
-        if not collision_results:
+        if len(collision_points) == 0:
             return {'total_regions': 0, 'regions': []}
         
-        # Simple clustering of collision points
-        collision_points = np.array([r.collision_point for r in collision_results])
-        
         # Basic region analysis (in production, use proper clustering)
-        regions = []
-        if len(collision_points) > 0:
-            center = np.mean(collision_points, axis=0)
-            max_distance = np.max([np.linalg.norm(p - center) for p in collision_points])
-            
-            regions.append({
-                'center': center.tolist(),
-                'radius': max_distance,
-                'collision_count': len(collision_points),
-                'severity': 'high' if len(collision_points) > 10 else 'medium' if len(collision_points) > 5 else 'low'
-            })
+        center = collision_points.mean(axis=0, dtype=np.float64)
+        max_distance = float(np.sqrt(_sqdist(collision_points, center).max()))
+        regions = [{
+            'center': center.tolist(),
+            'radius': max_distance,
+            'collision_count': len(collision_points),
+            'severity': 'high' if len(collision_points) > 10 else 'medium' if len(collision_points) > 5 else 'low'
+        }]
         
         return {
             'total_regions': len(regions),
             'regions': regions
         }
     
-    def _generate_collision_recommendations(self, collision_results: List[CollisionResult]) -> List[str]:
+    def _generate_collision_recommendations(self, results: _BatchResults) -> List[str]:
         """Generate recommendations based on collision analysis."""
         recommendations = []
         
-        collision_count = sum(1 for r in collision_results if r.collision_detected)
-        collision_rate = collision_count / len(collision_results) * 100
+        penetration = results.penetration[results.mask]
+        collision_count = len(penetration)
+        collision_rate = collision_count / len(results) * 100
         
         if collision_rate > 20:
             recommendations.append("High collision rate detected. Consider increasing wire height or adjusting bracket positions.")
         elif collision_rate > 10:
             recommendations.append("Moderate collision rate. Review wire path for potential optimization.")
         
-        max_penetration = max([r.penetration_depth for r in collision_results if r.collision_detected], default=0.0)
+        max_penetration = float(penetration.max()) if collision_count else 0.0
         if max_penetration > 1.0:
             recommendations.append(f"Deep penetration detected ({max_penetration:.2f}mm). Increase collision tolerance or revise wire design.")
         
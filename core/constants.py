@@ -24,6 +24,15 @@ WIRE_SIZES = {
     '0.021x0.025': (0.5334, 0.6350)
 }
 
+# WIRE_SIZES as a (width, height) table in mm: round wires have
+# width == height, so every size reads the same way. Row ids follow
+# WIRE_SIZES order; WIRE_SIZE_INDEX maps size names to rows.
+WIRE_SIZE_INDEX = {size: i for i, size in enumerate(WIRE_SIZES)}
+WIRE_SIZE_TABLE = np.array(
+    [dims if isinstance(dims, tuple) else (dims, dims) for dims in WIRE_SIZES.values()],
+    dtype=[('w', 'f8'), ('h', 'f8')]
+)
+
 # Tooth classification constants
 TOOTH_TYPES = {
     'incisor': {'count_range': (2, 4), 'position': 'anterior'},
@@ -46,54 +55,6 @@ CLINICAL_OFFSETS = {
 }
 
 
-# ================================================================
-# core/mesh_processor.py
-"""STL mesh loading and preprocessing."""
-
-import open3d as o3d
-import numpy as np
-
-class MeshProcessor:
-    """Handles STL file loading and mesh preprocessing."""
-    
-    def __init__(self):
-        """Initialize mesh processor."""
-        pass
-    
-    def load_stl(self, stl_path: str) -> o3d.geometry.TriangleMesh:
-        """Load STL file and return processed mesh."""
-        try:
-            mesh = o3d.io.read_triangle_mesh(stl_path)
-            if not mesh.has_triangles():
-                raise ValueError("No triangles found in mesh")
-            
-            print(f"Loaded STL: {len(mesh.vertices)} vertices, {len(mesh.triangles)} triangles")
-            return mesh
-            
-        except Exception as e:
-            print(f"Error loading STL: {e}")
-            return None
-    
-    def clean_mesh(self, mesh: o3d.geometry.TriangleMesh) -> o3d.geometry.TriangleMesh:
-        """Clean and prepare mesh for processing."""
-        # Remove duplicates and degenerates
-        mesh.remove_duplicated_vertices()
-        mesh.remove_degenerate_triangles()
-        
-        # Compute normals
-        mesh.compute_vertex_normals()
-        mesh.compute_triangle_normals()
-        
-        # Set natural tooth color
-        mesh.paint_uniform_color([0.95, 0.93, 0.88])
-        
-        return mesh
-    
-    def calculate_arch_center(self, mesh: o3d.geometry.TriangleMesh) -> np.ndarray:
-        """Calculate the center of the dental arch."""
-        return mesh.get_center()
-
-
 # ================================================================
 # wire/height_controller.py
 """Wire height adjustment controller."""
@@ -473,33 +434,27 @@ class BracketPositioner:
             bracket_pos[height_axis] = target_height
             return bracket_pos
         
-        # Calculate radial direction (outward from arch center)
-        tooth_horizontal = tooth_center.copy()
-        tooth_horizontal[height_axis] = 0
-        center_horizontal = arch_center.copy()
-        center_horizontal[height_axis] = 0
-        
-        radial_vector = tooth_horizontal - center_horizontal
-        if np.linalg.norm(radial_vector) > 0:
-            radial_direction = radial_vector / np.linalg.norm(radial_vector)
+        # Calculate radial direction (outward from arch center) in the
+        # horizontal plane: its height_axis component is zero, so height
+        # drops out of the projection below
+        radial_vector = tooth_center - arch_center
+        radial_vector[height_axis] = 0.0
+        norm_sq = radial_vector @ radial_vector
+        if norm_sq > 0:
+            radial_direction = radial_vector * (1.0 / np.sqrt(norm_sq))
         else:
-            radial_direction = np.array([1, 0, 0])
-        
-        # Find innermost vertices (lingual side)
-        radial_distances = []
-        for vertex in bracket_level_vertices:
-            vertex_horizontal = vertex.copy()
-            vertex_horizontal[height_axis] = 0
-            vertex_radial = vertex_horizontal - center_horizontal
-            radial_dist = np.dot(vertex_radial, radial_direction)
-            radial_distances.append(radial_dist)
-        
-        radial_distances = np.array(radial_distances)
-        
-        # Get lingual vertices (15th percentile = innermost)
-        percentile_15 = np.percentile(radial_distances, 15)
-        lingual_mask = radial_distances <= percentile_15
-        lingual_vertices = bracket_level_vertices[lingual_mask]
+            radial_direction = np.zeros(3)
+            radial_direction[1 if height_axis == 0 else 0] = 1.0
+        
+        # Find innermost vertices (lingual side) - one GEMV over the vertex
+        # offsets instead of a per-vertex loop
+        radial_distances = (bracket_level_vertices - arch_center) @ radial_direction
+        
+        # Get lingual vertices (15th percentile = innermost): every vertex at
+        # or below the k-th smallest distance, as np.percentile's mask kept,
+        # found in O(N) with partition instead of a full sort
+        k = int(0.15 * (len(radial_distances) - 1))
+        lingual_vertices = bracket_level_vertices[radial_distances <= np.partition(radial_distances, k)[k]]
         
         if len(lingual_vertices) > 3:
             return np.mean(lingual_vertices, axis=0)
@@ -3,9 +3,57 @@
 # core/mesh_processor.py
 """STL mesh loading and preprocessing."""
 
-import open3d as o3d
+from __future__ import annotations
+
+import weakref
 import numpy as np
-from typing import Optional
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+# Open3D takes seconds to import; it is loaded on first use, so importing
+# this module (e.g. for CachedMesh) stays cheap
+if TYPE_CHECKING:
+    import open3d as o3d
+
+
+@dataclass(eq=False)
+class CachedMesh:
+    """
+    Geometry of a mesh computed once: a NumPy copy of the vertices plus the
+    axis-aligned bounds and center, so repeated queries neither cross into
+    Open3D nor rescan the vertices.
+    """
+    vertices: np.ndarray
+    bbox_min: np.ndarray
+    bbox_max: np.ndarray
+    extent: np.ndarray
+    center: np.ndarray
+    
+    @classmethod
+    def from_mesh(cls, mesh) -> 'CachedMesh':
+        """Convert the mesh vertices once and derive bounds and center from them."""
+        vertices = np.array(mesh.vertices, dtype=np.float64).reshape(-1, 3)
+        if len(vertices) == 0:
+            zeros = np.zeros(3)
+            return cls(vertices, zeros, zeros.copy(), zeros.copy(), zeros.copy())
+        bbox_min = vertices.min(axis=0)
+        bbox_max = vertices.max(axis=0)
+        return cls(vertices, bbox_min, bbox_max, bbox_max - bbox_min, vertices.mean(axis=0))
+    
+    def matches(self, mesh) -> bool:
+        """Cheap staleness check: same vertex count and bounds as the mesh."""
+        if len(mesh.vertices) != len(self.vertices):
+            return False
+        if len(self.vertices) == 0:
+            return True
+        if hasattr(mesh, 'get_min_bound'):
+            # Open3D computes the bounds in C++ without copying the vertices
+            bbox_min, bbox_max = mesh.get_min_bound(), mesh.get_max_bound()
+        else:
+            vertices = np.asarray(mesh.vertices)
+            bbox_min, bbox_max = vertices.min(axis=0), vertices.max(axis=0)
+        return np.array_equal(bbox_min, self.bbox_min) and np.array_equal(bbox_max, self.bbox_max)
+
 
 class MeshProcessor:
     """Handles STL file loading and mesh preprocessing."""
@@ -14,9 +62,17 @@ class MeshProcessor:
         """Initialize mesh processor."""
         self.cleaning_enabled = True
         self.verbose = True
+        # Compute normals with Open3D's tensor geometry kernels; the round
+        # trip to and from the legacy mesh costs more than it saves on
+        # typical arch scans, so it is off unless a caller opts in
+        self.use_tensor_backend = False
+        # CachedMesh per live mesh; entries go away with their meshes
+        self._mesh_cache = weakref.WeakKeyDictionary()
         
     def load_stl(self, stl_path: str) -> Optional[o3d.geometry.TriangleMesh]:
         """Load STL file and return processed mesh."""
+        import open3d as o3d
+        
         try:
             mesh = o3d.io.read_triangle_mesh(stl_path)
             if not mesh.has_triangles():
@@ -41,55 +97,105 @@ class MeshProcessor:
         if not self.cleaning_enabled:
             return mesh
             
-        # Remove duplicates and degenerates
-        mesh.remove_duplicated_vertices()
+        # Merge close vertices; this also merges exact duplicates, so it runs
+        # first and the triangle passes see the triangles it collapses
+        mesh.merge_close_vertices(1e-6)
+        
+        # Remove degenerate and duplicated triangles
         mesh.remove_degenerate_triangles()
         mesh.remove_duplicated_triangles()
         
-        # Merge close vertices
-        mesh.merge_close_vertices(1e-6)
-        
-        # Compute normals
-        mesh.compute_vertex_normals()
-        mesh.compute_triangle_normals()
-        
-        # Set natural tooth color
-        mesh.paint_uniform_color([0.95, 0.93, 0.88])
+        # Compute normals; Open3D derives the (normalized) triangle normals
+        # on the way to the vertex normals
+        if self.use_tensor_backend:
+            self._compute_normals_tensor(mesh)
+        else:
+            mesh.compute_vertex_normals()
         
         if self.verbose:
             print(f"Mesh cleaned: {len(mesh.vertices)} vertices, {len(mesh.triangles)} triangles")
         
+        # Cleaning moved and removed vertices; cache the final geometry
+        self._mesh_cache[mesh] = CachedMesh.from_mesh(mesh)
+        
+        return mesh
+    
+    @staticmethod
+    def apply_display_color(mesh: o3d.geometry.TriangleMesh) -> o3d.geometry.TriangleMesh:
+        """Paint the mesh a natural tooth color for display; geometry is unchanged."""
+        mesh.paint_uniform_color([0.95, 0.93, 0.88])
         return mesh
     
+    @staticmethod
+    def _compute_normals_tensor(mesh: o3d.geometry.TriangleMesh):
+        """Compute triangle and vertex normals with the tensor geometry kernels."""
+        import open3d as o3d
+        
+        mesh_t = o3d.t.geometry.TriangleMesh.from_legacy(
+            mesh, vertex_dtype=o3d.core.float64)
+        mesh_t.compute_vertex_normals(normalized=True)
+        # Only the normals come back; the legacy mesh keeps its other attributes
+        mesh.triangle_normals = o3d.utility.Vector3dVector(mesh_t.triangle.normals.numpy())
+        mesh.vertex_normals = o3d.utility.Vector3dVector(mesh_t.vertex.normals.numpy())
+    
+    def get_cached_mesh(self, mesh: o3d.geometry.TriangleMesh) -> CachedMesh:
+        """
+        Get the cached geometry of a mesh, computing it on first use.
+
+        The cache is rebuilt when the vertex count or bounds no longer match
+        the mesh, e.g. after an in-place translate. Edits that keep both
+        (moving interior vertices) need invalidate_cached_mesh().
+        """
+        if isinstance(mesh, CachedMesh):
+            return mesh
+        cached = self._mesh_cache.get(mesh)
+        if cached is None or not cached.matches(mesh):
+            cached = CachedMesh.from_mesh(mesh)
+            self._mesh_cache[mesh] = cached
+        return cached
+    
+    def invalidate_cached_mesh(self, mesh: o3d.geometry.TriangleMesh):
+        """Drop the cached geometry of a mesh edited in place."""
+        self._mesh_cache.pop(mesh, None)
+    
     def calculate_arch_center(self, mesh: o3d.geometry.TriangleMesh) -> np.ndarray:
         """Calculate the center of the dental arch."""
-        return mesh.get_center()
+        return self.get_cached_mesh(mesh).center.copy()
     
     def get_mesh_bounds(self, mesh: o3d.geometry.TriangleMesh) -> tuple:
         """Get mesh bounding box information."""
-        bbox = mesh.get_axis_aligned_bounding_box()
-        return bbox.min_bound, bbox.max_bound, bbox.get_extent()
+        cached = self.get_cached_mesh(mesh)
+        return cached.bbox_min.copy(), cached.bbox_max.copy(), cached.extent.copy()
     
-    def get_mesh_statistics(self, mesh: o3d.geometry.TriangleMesh) -> dict:
-        """Get comprehensive mesh statistics."""
+    def get_mesh_statistics(self, mesh: o3d.geometry.TriangleMesh, include_topology: bool = False,
+                            include_volume: bool = False) -> dict:
+        """
+        Get comprehensive mesh statistics.
+        
+        Volume and the watertight/orientable checks each traverse the whole
+        mesh topology, so they are only computed when requested.
+        """
         if not mesh.has_triangles():
             return {'valid': False}
         
-        bbox = mesh.get_axis_aligned_bounding_box()
+        cached = self.get_cached_mesh(mesh)
         
-        return {
+        stats = {
             'valid': True,
             'vertex_count': len(mesh.vertices),
             'triangle_count': len(mesh.triangles),
             'bounding_box': {
-                'min': bbox.min_bound,
-                'max': bbox.max_bound,
-                'extent': bbox.get_extent(),
-                'center': mesh.get_center()
+                'min': cached.bbox_min.copy(),
+                'max': cached.bbox_max.copy(),
+                'extent': cached.extent.copy(),
+                'center': cached.center.copy()
             },
-            'surface_area': mesh.get_surface_area(),
-            'volume': mesh.get_volume(),
-            'is_watertight': mesh.is_watertight(),
-            'is_orientable': mesh.is_orientable()
+            'surface_area': mesh.get_surface_area()
         }
+        if include_volume:
+            stats['volume'] = mesh.get_volume()
+        if include_topology:
+            stats['is_watertight'] = mesh.is_watertight()
+            stats['is_orientable'] = mesh.is_orientable()
+        return stats
 
@@ -3,8 +3,19 @@
 # core/tooth_detector.py
 """Tooth detection and classification algorithms."""
 
+import weakref
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from ._jit_kernels import NUMBA_AVAILABLE, height_band_core, segment_angles_core
+from .mesh_processor import CachedMesh
+
+# numexpr fuses the elementwise chains of the NumPy fallbacks (no
+# temporaries, multithreaded) when Numba is not installed
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
 
 class ToothDetector:
     """Detects and classifies teeth from dental meshes."""
@@ -20,9 +31,22 @@ class ToothDetector:
             'expected_teeth': 14,
             'max_teeth': 16
         }
+        # Detection results per live mesh, keyed by arch type and parameters;
+        # entries go away with their meshes
+        self._detection_cache = weakref.WeakKeyDictionary()
         
     def detect_teeth(self, mesh, arch_type: str) -> List[Dict]:
-        """Detect teeth from mesh using angular segmentation."""
+        """
+        Detect teeth from mesh using angular segmentation.
+
+        mesh may be an Open3D mesh or its CachedMesh (see
+        MeshProcessor.get_cached_mesh), whose precomputed bounds are reused.
+        Results are memoized per mesh object, arch type and detection
+        parameters. A mesh whose vertex count or bounds change (e.g. an
+        in-place translate) is detected afresh; other in-place edits need
+        invalidate_cache(). Each tooth's 'vertices' array is shared with the
+        memo and read-only; copy it before editing.
+        """
         if mesh is None:
             print("Error: Mesh is None, cannot detect teeth")
             return []
@@ -31,10 +55,52 @@ class ToothDetector:
             print("Error: Mesh has no vertices")
             return []
 
-        vertices = np.asarray(mesh.vertices)
-        bbox = mesh.get_axis_aligned_bounding_box()
-        center = mesh.get_center()
-        extent = bbox.get_extent()
+        key = (arch_type, tuple(sorted(self.detection_parameters.items())))
+        fingerprint = self._geometry_fingerprint(mesh)
+        try:
+            cached_fingerprint, results = self._detection_cache.get(mesh, (None, None))
+            if results is None or cached_fingerprint != fingerprint:
+                results = {}
+                self._detection_cache[mesh] = (fingerprint, results)
+        except TypeError:
+            results = {}  # Not weak-referenceable; detect without caching
+        
+        if key not in results:
+            teeth = self._detect_teeth(mesh, arch_type)
+            # Shared by every later call: vertices are read-only rather than copied
+            for tooth in teeth:
+                tooth['vertices'].setflags(write=False)
+            results[key] = teeth
+        
+        # Fresh dicts and centers per call: callers (e.g. classify_teeth)
+        # update them in place, and the cached ones must stay as detected
+        return [dict(tooth, center=tooth['center'].copy()) for tooth in results[key]]
+    
+    @staticmethod
+    def _geometry_fingerprint(mesh) -> Tuple:
+        """Vertex count and bounds: changes when a mesh is moved or resized."""
+        if isinstance(mesh, CachedMesh):
+            bbox_min, bbox_max = mesh.bbox_min, mesh.bbox_max
+        elif hasattr(mesh, 'get_min_bound'):
+            bbox_min, bbox_max = mesh.get_min_bound(), mesh.get_max_bound()
+        else:
+            vertices = np.asarray(mesh.vertices)
+            bbox_min, bbox_max = vertices.min(axis=0), vertices.max(axis=0)
+        return (len(mesh.vertices),) + tuple(np.concatenate([bbox_min, bbox_max]).tolist())
+    
+    def invalidate_cache(self, mesh=None):
+        """Forget memoized detections for mesh, or for every mesh."""
+        if mesh is None:
+            self._detection_cache.clear()
+        else:
+            self._detection_cache.pop(mesh, None)
+    
+    def _detect_teeth(self, mesh, arch_type: str) -> List[Dict]:
+        """Run the crown-level angular segmentation on a non-empty mesh."""
+        cached = mesh if isinstance(mesh, CachedMesh) else CachedMesh.from_mesh(mesh)
+        vertices = cached.vertices
+        center = cached.center
+        extent = cached.extent
         
         # Identify anatomical axes
         lr_axis = np.argmax(extent)  # Left-Right (widest)
@@ -46,12 +112,11 @@ class ToothDetector:
         # Sample at crown level
         crown_ratio = (self.detection_parameters['crown_ratio_upper'] if arch_type == 'upper' 
                       else self.detection_parameters['crown_ratio_lower'])
-        crown_level = bbox.min_bound[height_axis] + extent[height_axis] * crown_ratio
+        crown_level = cached.bbox_min[height_axis] + extent[height_axis] * crown_ratio
         
         # Get crown vertices
         height_tolerance = self.detection_parameters['height_tolerance']
-        crown_mask = np.abs(vertices[:, height_axis] - crown_level) < height_tolerance
-        crown_vertices = vertices[crown_mask]
+        crown_vertices = self._crown_band(vertices, height_axis, crown_level, height_tolerance)
         
         if len(crown_vertices) < 100:
             print("Warning: Very few crown vertices detected")
@@ -68,16 +133,30 @@ class ToothDetector:
     def _angular_segmentation(self, crown_vertices: np.ndarray, center: np.ndarray,
                             lr_axis: int, ap_axis: int) -> List[Dict]:
         """Segment teeth using angular analysis."""
-        # Calculate angles
-        angles = np.arctan2(
-            crown_vertices[:, ap_axis] - center[ap_axis],
-            crown_vertices[:, lr_axis] - center[lr_axis]
-        )
+        # Calculate angles in the vertices' precision (float32 from
+        # detect_teeth); a float64 center would promote the whole pass
+        # The subtractions already yield unit-stride columns for arctan2,
+        # which then writes over the first of them
+        origin = np.asarray(center, dtype=crown_vertices.dtype)
+        if NUMEXPR_AVAILABLE:
+            angles = ne.evaluate('arctan2(ap - ap0, lr - lr0)', local_dict={
+                'ap': crown_vertices[:, ap_axis], 'ap0': origin[ap_axis],
+                'lr': crown_vertices[:, lr_axis], 'lr0': origin[lr_axis]})
+        else:
+            ap_offsets = np.subtract(crown_vertices[:, ap_axis], origin[ap_axis])
+            lr_offsets = np.subtract(crown_vertices[:, lr_axis], origin[lr_axis])
+            angles = np.arctan2(ap_offsets, lr_offsets, out=ap_offsets)
+        
+        # Sort once: every segment is then one (or, across the +/-pi seam,
+        # two) contiguous runs of the sorted vertices
+        sort_idx = np.argsort(angles)
+        sorted_angles = angles[sort_idx]
+        sorted_vertices = crown_vertices[sort_idx]
         
         # Find posterior gap (largest gap between teeth)
-        sorted_angles = np.sort(angles)
-        angle_diffs = np.diff(sorted_angles)
-        angle_diffs = np.append(angle_diffs, sorted_angles[0] + 2*np.pi - sorted_angles[-1])
+        angle_diffs = np.empty_like(sorted_angles)
+        np.subtract(sorted_angles[1:], sorted_angles[:-1], out=angle_diffs[:-1])
+        angle_diffs[-1] = sorted_angles[0] + 2*np.pi - sorted_angles[-1]
         
         posterior_gap_idx = np.argmax(angle_diffs)
         posterior_gap_size = angle_diffs[posterior_gap_idx]
@@ -88,71 +167,161 @@ class ToothDetector:
         angle_per_tooth = active_angle_range / expected_teeth
         start_angle = sorted_angles[(posterior_gap_idx + 1) % len(sorted_angles)]
         
+        lo, hi, wraps, counts, centers = self._segment_angles(
+            sorted_angles, sorted_vertices, start_angle, angle_per_tooth, expected_teeth + 2)
+        
+        # Angles of all segment centers at once; the loop below only
+        # assembles the per-tooth dicts
+        center_angles = np.arctan2(centers[:, ap_axis] - center[ap_axis],
+                                   centers[:, lr_axis] - center[lr_axis])
+        
+        # Spacing filter on the segment arrays; dicts are built only for the
+        # teeth that survive it. 'index' stays the position among the
+        # segments with enough vertices.
+        valid = np.flatnonzero(counts >= self.detection_parameters['min_tooth_vertices'])
+        kept = self._spaced_teeth(center_angles[valid], centers[valid])
+        
         teeth = []
-        for i in range(expected_teeth + 2):
-            tooth_start = start_angle + i * angle_per_tooth
-            tooth_end = tooth_start + angle_per_tooth
-            
-            # Normalize angles
-            tooth_start = np.mod(tooth_start + np.pi, 2*np.pi) - np.pi
-            tooth_end = np.mod(tooth_end + np.pi, 2*np.pi) - np.pi
-            
-            # Get vertices in segment
-            if tooth_start < tooth_end:
-                angle_mask = (angles >= tooth_start) & (angles < tooth_end)
+        for j in kept:
+            i = valid[j]
+            if wraps[i]:
+                segment_vertices = np.concatenate([sorted_vertices[lo[i]:], sorted_vertices[:hi[i]]])
             else:
-                angle_mask = (angles >= tooth_start) | (angles < tooth_end)
-            
-            segment_vertices = crown_vertices[angle_mask]
-            
-            if len(segment_vertices) < self.detection_parameters['min_tooth_vertices']:
-                continue
-            
-            # Calculate tooth center
-            tooth_center = np.mean(segment_vertices, axis=0)
-            tooth_angle = np.arctan2(
-                tooth_center[ap_axis] - center[ap_axis],
-                tooth_center[lr_axis] - center[lr_axis]
-            )
+                segment_vertices = sorted_vertices[lo[i]:hi[i]]
             
+            tooth_center = centers[i].copy()
             teeth.append({
                 'center': tooth_center,
                 'vertices': segment_vertices,
-                'angle': tooth_angle,
+                'angle': center_angles[i],
                 'ap_position': tooth_center[ap_axis],
                 'lr_position': tooth_center[lr_axis],
-                'index': len(teeth),
+                'index': int(j),
                 'type': 'posterior'  # Will be classified later
             })
         
-        # Filter teeth that are too close together
-        return self._filter_close_teeth(teeth)
+        return teeth
+    
+    @staticmethod
+    def _crown_band(vertices: np.ndarray, height_axis: int, crown_level: float,
+                    height_tolerance: float) -> np.ndarray:
+        """
+        Vertices within height_tolerance of the crown level, as float32.
+
+        Tooth vertex arrays are stored in float32: ample for sub-0.1mm
+        placement and half the bandwidth for the bracket passes over them.
+        Tooth centers are still accumulated in float64.
+        """
+        if NUMBA_AVAILABLE:
+            return height_band_core(vertices, int(height_axis), float(crown_level),
+                                    float(height_tolerance))
+        
+        if NUMEXPR_AVAILABLE:
+            crown_mask = ne.evaluate('abs(h - level) < tol', local_dict={
+                'h': vertices[:, height_axis], 'level': crown_level, 'tol': height_tolerance})
+            return vertices[crown_mask].astype(np.float32)
+        
+        # One unit-stride temporary for the difference, reused for the
+        # absolute value
+        offsets = np.subtract(vertices[:, height_axis], crown_level)
+        np.abs(offsets, out=offsets)
+        return vertices[offsets < height_tolerance].astype(np.float32)
+    
+    @staticmethod
+    def _segment_angles(sorted_angles: np.ndarray, sorted_vertices: np.ndarray, start_angle: float,
+                        angle_per_tooth: float, n_segments: int) -> Tuple[np.ndarray, ...]:
+        """
+        Locate angular segments as runs of the angle-sorted vertices.
+
+        Returns (lo, hi, wraps, counts, centers): segment i is
+        sorted_vertices[lo:hi], or [lo:] + [:hi] where wraps marks bounds
+        that straddle the +/-pi seam.
+        """
+        if NUMBA_AVAILABLE:
+            return segment_angles_core(sorted_angles, np.ascontiguousarray(sorted_vertices),
+                                       float(start_angle), float(angle_per_tooth), n_segments)
+        
+        # Segment starts and ends normalized in one pass and located with one
+        # search: [lo, hi) holds angles >= tooth_start and < tooth_end. The
+        # bounds keep the mod form exactly: the segment start and the last
+        # angle before the gap lie on bounds, so rounding decides their side.
+        tooth_starts = start_angle + np.arange(n_segments) * angle_per_tooth
+        bounds = np.concatenate([tooth_starts, tooth_starts + angle_per_tooth])
+        bounds += np.pi
+        np.mod(bounds, 2*np.pi, out=bounds)
+        bounds -= np.pi
+        positions = np.searchsorted(sorted_angles, bounds, side='left')
+        lo, hi = positions[:n_segments], positions[n_segments:]
+        
+        # Segments whose bounds straddle the seam take [lo, N) + [0, hi)
+        wraps = bounds[:n_segments] >= bounds[n_segments:]
+        n = len(sorted_angles)
+        counts = np.where(wraps, n - lo + hi, hi - lo)
+        
+        # Segment centers from prefix sums, one pass over the vertices
+        prefix = np.zeros((n + 1, 3))
+        np.cumsum(sorted_vertices, axis=0, dtype=np.float64, out=prefix[1:])
+        sums = np.where(wraps[:, None], prefix[n] - prefix[lo] + prefix[hi], prefix[hi] - prefix[lo])
+        centers = sums / np.maximum(counts, 1)[:, None]
+        return lo, hi, wraps, counts, centers
     
     def _filter_close_teeth(self, teeth: List[Dict]) -> List[Dict]:
         """Remove teeth that are too close to each other."""
         if not teeth:
             return []
         
-        filtered_teeth = []
-        sorted_teeth = sorted(teeth, key=lambda t: t['angle'])
+        angles = np.array([tooth['angle'] for tooth in teeth])
+        centers = np.array([tooth['center'] for tooth in teeth])
+        return [teeth[i] for i in self._spaced_teeth(angles, centers)]
+    
+    def _spaced_teeth(self, angles: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        """
+        Indices of the teeth kept by the spacing filter, in angular order.
+
+        Walking teeth by angle, a tooth is kept when its center is more than
+        min_tooth_spacing from the last kept one; at most max_teeth are kept.
+        """
+        if len(angles) == 0:
+            return np.empty(0, dtype=np.int64)
+        
+        order = np.argsort(angles, kind='stable')
+        centers = centers[order]
         min_spacing = self.detection_parameters['min_tooth_spacing']
         
-        for tooth in sorted_teeth:
-            if not filtered_teeth:
-                filtered_teeth.append(tooth)
-            else:
-                # Check distance to previous tooth
-                prev_tooth = filtered_teeth[-1]
-                dist = np.linalg.norm(tooth['center'] - prev_tooth['center'])
-                if dist > min_spacing:
-                    filtered_teeth.append(tooth)
+        # All pairwise center distances at once, compared squared so no
+        # sqrt is taken; the walk below only looks them up, since each
+        # tooth is compared to the last one kept
+        offsets = centers[:, None] - centers[None]
+        too_close = (np.einsum('ijk,ijk->ij', offsets, offsets) <= min_spacing * min_spacing).tolist()
+        
+        kept = [0]
+        for i in range(1, len(order)):
+            if not too_close[i][kept[-1]]:
+                kept.append(i)
         
         # Limit to reasonable number of teeth
-        max_teeth = self.detection_parameters['max_teeth']
-        if len(filtered_teeth) > max_teeth:
-            filtered_teeth = filtered_teeth[:max_teeth]
+        return order[kept[:self.detection_parameters['max_teeth']]]
+    
+    @staticmethod
+    def pack_teeth(teeth: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Pack detected teeth into a Structure-of-Arrays table.
+
+        Tooth i owns vertices_flat[offsets[i]:offsets[i + 1]], so batch
+        consumers can process every tooth in a single pass. The vertices
+        keep the teeth's dtype (float32 from detect_teeth).
+        """
+        counts = [len(tooth['vertices']) for tooth in teeth]
+        offsets = np.zeros(len(teeth) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
         
-        return filtered_teeth
+        return {
+            'centers': np.array([tooth['center'] for tooth in teeth], dtype=np.float64).reshape(-1, 3),
+            'vertices_flat': (np.concatenate([tooth['vertices'] for tooth in teeth])
+                              if teeth else np.empty((0, 3))),
+            'offsets': offsets,
+            'types': np.array([tooth.get('type', 'posterior') for tooth in teeth], dtype=object)
+        }
     
     def classify_teeth(self, teeth: List[Dict], arch_center: np.ndarray) -> List[Dict]:
         """Classify teeth into incisors, canines, and posterior."""
@@ -160,41 +329,27 @@ class ToothDetector:
             print("Not enough teeth for classification")
             return teeth
         
-        # Reset all to posterior
-        for tooth in teeth:
-            tooth['type'] = 'posterior'
-        
-        # Sort by anterior position (most anterior first)
-        teeth_by_ap = sorted(teeth, key=lambda t: t['ap_position'], reverse=True)
+        ap_positions = np.array([tooth['ap_position'] for tooth in teeth])
+        lr_positions = np.array([tooth['lr_position'] for tooth in teeth])
         
-        # Take the 6 most anterior teeth
-        anterior_count = min(6, len(teeth_by_ap))
-        anterior_teeth = teeth_by_ap[:anterior_count]
+        # The 6 most anterior teeth, ordered left to right. A stable sort
+        # rather than argpartition, so teeth tied on AP position resolve
+        # the same way every time; with at most 16 teeth the O(n log n)
+        # is immaterial.
+        anterior_idx = np.argsort(-ap_positions, kind='stable')[:6]
+        anterior_idx = anterior_idx[np.argsort(lr_positions[anterior_idx], kind='stable')]
         
-        # Sort by left-right position
-        anterior_teeth_by_lr = sorted(anterior_teeth, key=lambda t: t['lr_position'])
-        
-        # Assign types to anterior teeth
-        if len(anterior_teeth_by_lr) >= 6:
-            # Canines (outermost)
-            anterior_teeth_by_lr[0]['type'] = 'canine'
-            anterior_teeth_by_lr[5]['type'] = 'canine'
-            
-            # Incisors (inner 4)
-            for i in range(1, 5):
-                anterior_teeth_by_lr[i]['type'] = 'incisor'
-        elif len(anterior_teeth_by_lr) >= 4:
-            # If we have at least 4 anterior teeth, make the middle ones incisors
-            start_idx = (len(anterior_teeth_by_lr) - 2) // 2
-            end_idx = start_idx + 2
-            for i in range(start_idx, min(end_idx, len(anterior_teeth_by_lr))):
-                anterior_teeth_by_lr[i]['type'] = 'incisor'
+        # Canines are the outermost two, incisors the inner four; everything
+        # else is posterior
+        types = np.full(len(teeth), 'posterior', dtype=object)
+        types[anterior_idx[[0, -1]]] = 'canine'
+        types[anterior_idx[1:-1]] = 'incisor'
+        for tooth, tooth_type in zip(teeth, types):
+            tooth['type'] = tooth_type
         
         # Count classification results
-        classification_counts = {}
-        for tooth in teeth:
-            tooth_type = tooth['type']
-            classification_counts[tooth_type] = classification_counts.get(tooth_type, 0) + 1
+        names, counts = np.unique(types, return_counts=True)
+        classification_counts = dict(zip(names, counts))
         
         print("Tooth classification:")
         for tooth_type, count in classification_counts.items():
@@ -6,9 +6,11 @@ Supports three modes: Automatic, Manual, and Hybrid.
 """
 
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import Optional, List, Dict, Any, Tuple
 import open3d as o3d
+from scipy.spatial import cKDTree
 
 from core.mesh_processor import MeshProcessor
 from core.tooth_detector import ToothDetector
@@ -29,14 +31,22 @@ class WorkflowManager:
     Coordinates between automatic detection, manual design, and hybrid approaches.
     """
     
-    def __init__(self):
-        """Initialize the workflow manager"""
+    def __init__(self, display_colors: bool = True):
+        """
+        Initialize the workflow manager
+
+        Args:
+            display_colors: Paint loaded arches for display; headless
+                pipelines that never render can skip that pass
+        """
         # Core components
         self.mesh_processor = MeshProcessor()
         self.tooth_detector = ToothDetector()
         self.bracket_positioner = BracketPositioner()
         self.wire_path_creator = WirePathCreator()
         
+        self.display_colors = display_colors
+        
         # State management
         self.current_mode = WorkflowMode.AUTOMATIC
         self.active_arch = 'upper'
@@ -64,8 +74,10 @@ class WorkflowManager:
             }
         }
         
-        # Opposing arch for collision detection
+        # Opposing arch for collision detection, with a KD-tree over its
+        # vertices built once per load
         self.opposing_arch_mesh = None
+        self._opposing_tree = None
     
     # ============================================
     # MODE AND STATE MANAGEMENT
@@ -126,7 +138,10 @@ class WorkflowManager:
         
         # Clean and process mesh
         mesh = self.mesh_processor.clean_mesh(mesh)
-        mesh.compute_vertex_normals()
+        if not mesh.has_vertex_normals():
+            mesh.compute_vertex_normals()
+        if self.display_colors:
+            self.mesh_processor.apply_display_color(mesh)
         
         print(f"Mesh cleaned: {len(mesh.vertices)} vertices, {len(mesh.triangles)} triangles")
         
@@ -135,12 +150,28 @@ class WorkflowManager:
         self.arch_data[arch_type]['file_path'] = file_path
         
         # Calculate arch center for reference
-        vertices = np.asarray(mesh.vertices)
-        arch_center = np.mean(vertices, axis=0)
+        arch_center = self.mesh_processor.calculate_arch_center(mesh)
         self.arch_data[arch_type]['arch_center'] = arch_center
         
         print(f"Successfully loaded {arch_type} arch: {len(mesh.vertices)} vertices")
     
+    def notify_mesh_modified(self, arch_type: str):
+        """
+        Refresh derived geometry after an arch mesh was edited in place
+        (e.g. re-centred by the visualizer).
+        
+        Drops the cached vertex geometry and memoized tooth detections for
+        the mesh and recomputes the arch center in the new coordinates.
+        """
+        arch_data = self.arch_data[arch_type]
+        mesh = arch_data['mesh']
+        if mesh is None:
+            return
+        
+        self.mesh_processor.invalidate_cached_mesh(mesh)
+        self.tooth_detector.invalidate_cache(mesh)
+        arch_data['arch_center'] = self.mesh_processor.calculate_arch_center(mesh)
+    
     def load_opposing_arch(self, file_path: str):
         """Load opposing arch for collision detection"""
         mesh = o3d.io.read_triangle_mesh(file_path)
@@ -149,11 +180,46 @@ class WorkflowManager:
             raise ValueError(f"Failed to load opposing arch from {file_path}")
         
         mesh = self.mesh_processor.clean_mesh(mesh)
-        mesh.compute_vertex_normals()
+        if not mesh.has_vertex_normals():
+            mesh.compute_vertex_normals()
+        if self.display_colors:
+            self.mesh_processor.apply_display_color(mesh)
         
         self.opposing_arch_mesh = mesh
+        # clean_mesh already converted the vertices; build on that copy
+        self._opposing_tree = cKDTree(self.mesh_processor.get_cached_mesh(mesh).vertices)
         print(f"Loaded opposing arch: {len(mesh.vertices)} vertices")
     
+    def load_both_arches(self, upper_path: Optional[str] = None, lower_path: Optional[str] = None,
+                         opposing_path: Optional[str] = None):
+        """
+        Load the upper, lower and opposing arches concurrently.
+        
+        Each path given is loaded as by load_arch / load_opposing_arch, on
+        its own thread: the Open3D reading and cleaning run in C++, so the
+        loads overlap and the wall time approaches that of the largest
+        file. Raises the first load error after all loads have finished.
+        
+        Args:
+            upper_path: STL file for the upper arch
+            lower_path: STL file for the lower arch
+            opposing_path: STL file for the opposing arch (collision checks)
+        """
+        loads = [(self.load_arch, (path, arch_type))
+                 for path, arch_type in ((upper_path, 'upper'), (lower_path, 'lower'))
+                 if path is not None]
+        if opposing_path is not None:
+            loads.append((self.load_opposing_arch, (opposing_path,)))
+        
+        if not loads:
+            return
+        
+        with ThreadPoolExecutor(max_workers=len(loads)) as executor:
+            futures = [executor.submit(load, *args) for load, args in loads]
+        
+        for future in futures:
+            future.result()
+    
     def has_opposing_arch(self) -> bool:
         """Check if opposing arch is loaded"""
         return self.opposing_arch_mesh is not None
@@ -183,7 +249,8 @@ class WorkflowManager:
         
         # Step 1: Detect teeth
         print(f"Detecting teeth for {arch_type} arch...")
-        detected_teeth = self.tooth_detector.detect_teeth(mesh, arch_type)
+        detected_teeth = self.tooth_detector.detect_teeth(
+            self.mesh_processor.get_cached_mesh(mesh), arch_type)
         arch_data['teeth_detected'] = detected_teeth
         print(f"Detected {len(detected_teeth)} teeth using angular segmentation")
         
@@ -223,31 +290,15 @@ class WorkflowManager:
         if arch_center is None:
             raise ValueError(f"No arch center found for {arch_type} arch")
         
-        # Get visible brackets only
-        visible_brackets = [b for b in bracket_positions if b.get('visible', True)]
+        # Get visible brackets only: one mask over the packed table
+        packed = BracketPositioner.pack_brackets(bracket_positions)
+        visible = np.flatnonzero(packed['visible'])
         
-        if len(visible_brackets) < 2:
-            raise ValueError(f"Need at least 2 visible brackets, found {len(visible_brackets)}")
+        if len(visible) < 2:
+            raise ValueError(f"Need at least 2 visible brackets, found {len(visible)}")
         
         # Extract control points from bracket positions
-        control_points = []
-        for bracket in visible_brackets:
-            # Use the current position (with height offset applied)
-            pos = bracket['position'].copy()
-            
-            # Apply global height offset
-            if self.global_height_offset != 0.0:
-                normal = bracket['normal']
-                pos = pos + normal * self.global_height_offset
-            
-            control_points.append({
-                'position': pos,
-                'original_position': bracket['original_position'].copy(),
-                'type': 'bracket',
-                'index': bracket['tooth_index'],
-                'bend_angle': 0.0,
-                'vertical_offset': self.global_height_offset
-            })
+        control_points = self._bracket_control_points(packed, visible)
         
         # ✅ FIXED: Handle single return value
         wire_path = self.wire_path_creator.create_smooth_path(
@@ -256,7 +307,31 @@ class WorkflowManager:
         )
         
         return wire_path
-    
+
+    def _bracket_control_points(self, packed: Dict[str, np.ndarray],
+                                rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Control points for the given rows of a packed bracket table (see
+        BracketPositioner.pack_brackets), with the global height offset
+        applied in one pass.
+
+        Uses the dict-of-arrays layout of ControlPointManager.setup
+        ('positions', 'original_positions', 'types', 'bend_angles',
+        'vertical_offsets') plus 'indices', the bracket tooth indices.
+        WirePathCreator.create_smooth_path accepts it directly.
+        """
+        selected = {key: values[rows] for key, values in packed.items()}
+        count = len(rows)
+        height_offset = self.global_height_offset
+        return {
+            'positions': BracketPositioner.offset_positions(selected, height_offset),
+            'original_positions': selected['original_positions'],
+            'types': np.full(count, 'bracket', dtype=object),
+            'indices': selected['tooth_indices'],
+            'bend_angles': np.zeros(count),
+            'vertical_offsets': np.full(count, height_offset)
+        }
+
     # ============================================
     # MANUAL WORKFLOW
     # ============================================
@@ -359,96 +434,41 @@ class WorkflowManager:
         p2 = manual_points[1]['position']
         p3 = manual_points[2]['position']
         
-        # Get visible brackets
-        visible_brackets = [b for b in bracket_positions if b.get('visible', True)]
+        # Get visible brackets: one mask over the packed table
+        packed = BracketPositioner.pack_brackets(bracket_positions)
+        visible = np.flatnonzero(packed['visible'])
         
-        if len(visible_brackets) < 2:
+        if len(visible) < 2:
             # Not enough brackets, fall back to simple spline
             return self._generate_simple_spline(manual_points)
         
-        # Sort brackets by position along the arch
-        # Use the first manual point as reference
-        bracket_distances = []
-        for bracket in visible_brackets:
-            dist = np.linalg.norm(bracket['position'] - p1)
-            bracket_distances.append((dist, bracket))
-        
-        bracket_distances.sort(key=lambda x: x[0])
-        sorted_brackets = [b[1] for b in bracket_distances]
-        
-        # Find brackets between p1 and p3
-        # Simple approach: use all brackets that are within the bounding box
-        min_coords = np.minimum(np.minimum(p1, p2), p3)
-        max_coords = np.maximum(np.maximum(p1, p2), p3)
-        
-        relevant_brackets = []
-        for bracket in sorted_brackets:
-            pos = bracket['position']
-            if np.all(pos >= min_coords - 5) and np.all(pos <= max_coords + 5):
-                relevant_brackets.append(bracket)
-        
-        # Build control points: manual points + relevant brackets
-        all_control_points = []
-        
-        # Add first manual point
-        all_control_points.append({
-            'position': p1.copy(),
-            'original_position': p1.copy(),
-            'type': 'manual',
-            'index': 0,
-            'bend_angle': 0.0,
-            'vertical_offset': self.global_height_offset
-        })
-        
-        # Add brackets between p1 and p2
-        for bracket in relevant_brackets[:len(relevant_brackets)//2]:
-            pos = bracket['position'].copy()
-            if self.global_height_offset != 0.0:
-                pos = pos + bracket['normal'] * self.global_height_offset
-            
-            all_control_points.append({
-                'position': pos,
-                'original_position': bracket['original_position'].copy(),
-                'type': 'bracket',
-                'index': bracket['tooth_index'],
-                'bend_angle': 0.0,
-                'vertical_offset': self.global_height_offset
-            })
-        
-        # Add second manual point
-        all_control_points.append({
-            'position': p2.copy(),
-            'original_position': p2.copy(),
-            'type': 'manual',
-            'index': 1,
-            'bend_angle': 0.0,
-            'vertical_offset': self.global_height_offset
-        })
-        
-        # Add brackets between p2 and p3
-        for bracket in relevant_brackets[len(relevant_brackets)//2:]:
-            pos = bracket['position'].copy()
-            if self.global_height_offset != 0.0:
-                pos = pos + bracket['normal'] * self.global_height_offset
-            
-            all_control_points.append({
-                'position': pos,
-                'original_position': bracket['original_position'].copy(),
-                'type': 'bracket',
-                'index': bracket['tooth_index'],
-                'bend_angle': 0.0,
-                'vertical_offset': self.global_height_offset
-            })
-        
-        # Add third manual point
-        all_control_points.append({
-            'position': p3.copy(),
-            'original_position': p3.copy(),
-            'type': 'manual',
-            'index': 2,
-            'bend_angle': 0.0,
-            'vertical_offset': self.global_height_offset
-        })
+        # Sort brackets by distance from the first manual point and keep those
+        # within the manual points' bounding box (plus a 5mm margin), both
+        # over the visible rows. The stable sort keeps tied brackets in
+        # input order.
+        positions = packed['positions'][visible]
+        order = np.argsort(np.linalg.norm(positions - p1, axis=1), kind='stable')
+        
+        manual_positions = np.array([p1, p2, p3], dtype=np.float64)
+        min_coords = manual_positions.min(axis=0)
+        max_coords = manual_positions.max(axis=0)
+        in_box = np.all((positions >= min_coords - 5) & (positions <= max_coords + 5), axis=1)
+        
+        relevant = visible[order[in_box[order]]]
+        
+        # Control points p1, first half of the brackets, p2, second half, p3
+        control_points = self._bracket_control_points(packed, relevant)
+        count = len(relevant)
+        slots = [0, count // 2, count]
+        all_control_points = {
+            'positions': np.insert(control_points['positions'], slots, manual_positions, axis=0),
+            'original_positions': np.insert(control_points['original_positions'], slots,
+                                            manual_positions, axis=0),
+            'types': np.insert(control_points['types'], slots, 'manual'),
+            'indices': np.insert(control_points['indices'], slots, [0, 1, 2]),
+            'bend_angles': np.zeros(count + 3),
+            'vertical_offsets': np.full(count + 3, self.global_height_offset)
+        }
         
         # ✅ FIXED: Handle single return value
         wire_path = self.wire_path_creator.create_smooth_path(
@@ -514,23 +534,27 @@ class WorkflowManager:
         # Use 10-15 control points for good editability
         num_control_points = min(15, max(5, len(wire_path) // 20))
         
-        indices = np.linspace(0, len(wire_path) - 1, num_control_points, dtype=int)
-        control_points = [wire_path[i] for i in indices]
+        indices = np.linspace(0, len(wire_path) - 1, num_control_points, dtype=np.intp)
+        selected = np.asarray(wire_path)[indices]
         
-        # Store these as control points in the arch data
+        # Store these as control points in the arch data. Positions and
+        # original positions are rows of their own copies, so editing one
+        # never moves the other or the returned points.
+        positions = selected.copy()
+        original_positions = selected.copy()
         arch_data['control_points'] = [
             {
-                'position': pt.copy(),
-                'original_position': pt.copy(),
+                'position': positions[i],
+                'original_position': original_positions[i],
                 'type': 'converted',
                 'index': i,
                 'bend_angle': 0.0,
                 'vertical_offset': 0.0
             }
-            for i, pt in enumerate(control_points)
+            for i in range(num_control_points)
         ]
         
-        return control_points
+        return list(selected)
     
     # ============================================
     # COLLISION DETECTION
@@ -558,21 +582,18 @@ class WorkflowManager:
         if wire_path is None or len(wire_path) == 0:
             raise ValueError(f"No wire path found for {arch_type} arch")
         
-        # Simple collision detection: check if wire points are inside opposing mesh
-        collisions = []
+        # Simple collision detection: wire points near the opposing mesh
+        if self._opposing_tree is None:
+            self._opposing_tree = cKDTree(
+                self.mesh_processor.get_cached_mesh(self.opposing_arch_mesh).vertices)
         
-        # Convert opposing mesh to point cloud for distance calculations
-        opposing_vertices = np.asarray(self.opposing_arch_mesh.vertices)
-        
-        # For each wire point, check distance to nearest opposing mesh vertex
+        # Distance from every wire point to its nearest opposing mesh vertex
+        # in one tree query; points beyond the threshold come back as inf
         collision_threshold = 2.0  # mm - adjust based on wire diameter
-        
-        for wire_point in wire_path:
-            distances = np.linalg.norm(opposing_vertices - wire_point, axis=1)
-            min_distance = np.min(distances)
-            
-            if min_distance < collision_threshold:
-                collisions.append(wire_point.copy())
+        wire_points = np.asarray(wire_path)
+        distances, _ = self._opposing_tree.query(
+            wire_points, k=1, distance_upper_bound=collision_threshold)
+        collisions = list(wire_points[distances < collision_threshold])
         
         print(f"Found {len(collisions)} collision points")
         return collisions
@@ -581,8 +602,9 @@ class WorkflowManager:
     # EXPORT FUNCTIONS
     # ============================================
     
-    def export_gcode(self, wire_size: float = 0.9, arch_type: str = None) -> str:
-        """Export wire path as G-code"""
+    def export_gcode(self, wire_size: float = 0.9, arch_type: str = None,
+                     feed_rate: int = 1000) -> str:
+        """Export wire path as G-code, moving at feed_rate (mm/min)"""
         if arch_type is None:
             arch_type = self.active_arch
         
@@ -605,10 +627,12 @@ class WorkflowManager:
             ""
         ]
         
-        # Add wire path movements
-        for i, point in enumerate(wire_path):
-            x, y, z = point
-            gcode_lines.append(f"G1 X{x:.3f} Y{y:.3f} Z{z:.3f} F1000")
+        # Add wire path movements: one %-format over all coordinates, as
+        # plain floats, instead of a format call per point. The feed rate
+        # is fixed into the move template up front.
+        coords = np.asarray(wire_path, dtype=np.float64).reshape(-1, 3)
+        move = f"G1 X%.3f Y%.3f Z%.3f F{int(feed_rate)}"
+        gcode_lines.append("\n".join([move] * len(coords)) % tuple(coords.ravel().tolist()))
         
         gcode_lines.append("")
         gcode_lines.append("M30 ; end")
@@ -670,5 +694,6 @@ class WorkflowManager:
             }
         }
         self.opposing_arch_mesh = None
+        self._opposing_tree = None
         self.global_height_offset = 0.0
         print("Workflow reset")
\ No newline at end of file
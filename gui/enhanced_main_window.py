@@ -339,6 +339,8 @@ class EnhancedMainWindow(QMainWindow if PYQT5_AVAILABLE else object):
             arch_data = self.workflow_manager.get_arch_data(arch_type)
             if arch_data:
                 self.visualizer.load_arch(arch_data['mesh'], arch_type)
+                # The visualizer re-centres the mesh in place
+                self.workflow_manager.notify_mesh_modified(arch_type)
                 self.status_panel.update_arch_info(arch_type, file_path)
                 self.update_status(f"{arch_type.capitalize()} arch loaded successfully")
         except Exception as e:
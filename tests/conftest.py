@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Shared fixtures for the unit tests.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def numba_module():
+    """Module whose NUMBA_AVAILABLE flag the numba fixtures patch; override per test file."""
+    pytest.fail("define a numba_module fixture in the test file to use the numba fixtures")
+
+
+@pytest.fixture(params=[True, False], ids=['numba', 'numpy'])
+def use_numba(request, numba_module, monkeypatch):
+    """Run a test against both the compiled kernels and the NumPy fallback."""
+    if request.param and not numba_module.NUMBA_AVAILABLE:
+        pytest.skip("numba not installed")
+    monkeypatch.setattr(numba_module, 'NUMBA_AVAILABLE', request.param)
+    return request.param
+
+
+@pytest.fixture
+def set_numba(numba_module, monkeypatch):
+    """Switch between the compiled kernels and the NumPy fallback within one test."""
+    if not numba_module.NUMBA_AVAILABLE:
+        pytest.skip("numba not installed")
+
+    def set_numba(enabled):
+        monkeypatch.setattr(numba_module, 'NUMBA_AVAILABLE', enabled)
+
+    return set_numba
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Unit tests for bracket positioning.
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core.bracket_positioner as bracket_positioner_module
+from core.bracket_positioner import BracketPositioner
+from core.constants import BRACKET_HEIGHTS
+
+
+def make_tooth(angle, arch_radius=20.0, tooth_radius=3.0, height=10.0, n=400, seed=0):
+    """Create a cylindrical point cloud standing on the arch at the given angle."""
+    rng = np.random.default_rng(seed)
+    center_xy = arch_radius * np.array([np.cos(angle), np.sin(angle)])
+    theta = rng.uniform(0, 2 * np.pi, n)
+    z = rng.uniform(0, height, n)
+    vertices = np.column_stack([
+        center_xy[0] + tooth_radius * np.cos(theta),
+        center_xy[1] + tooth_radius * np.sin(theta),
+        z
+    ])
+    return {
+        'center': vertices.mean(axis=0),
+        'vertices': vertices,
+        'type': 'posterior'
+    }
+
+
+def reference_bracket(positioner, tooth, arch_center, arch_type):
+    """Per-tooth position and normal, computed one tooth at a time as an oracle."""
+    vertices = tooth['vertices']
+    bracket_height = BRACKET_HEIGHTS.get(tooth.get('type', 'posterior'), 4.5)
+    if arch_type == 'upper':
+        target_height = vertices[:, 2].min() + bracket_height
+    else:
+        target_height = vertices[:, 2].max() - bracket_height
+    position = positioner._find_lingual_position(vertices, tooth['center'], arch_center,
+                                                 target_height, 2)
+    horizontal = tooth['center'] - arch_center
+    horizontal[2] = 0.0
+    normal = positioner._normal_sign * horizontal / np.linalg.norm(horizontal)
+    return position + normal * positioner.clinical_offset, normal
+
+
+@pytest.fixture
+def numba_module():
+    """Module patched by the shared use_numba / set_numba fixtures."""
+    return bracket_positioner_module
+
+
+@pytest.fixture
+def arch():
+    """Fourteen synthetic teeth spread over a half-circle around the origin."""
+    angles = np.linspace(0.1, np.pi - 0.1, 14)
+    return [make_tooth(a, seed=i) for i, a in enumerate(angles)]
+
+
+def reference_lingual_position(tooth_vertices, tooth_center, arch_center,
+                               target_height, height_axis=2):
+    """Straightforward per-vertex implementation used as an oracle."""
+    mask = np.abs(tooth_vertices[:, height_axis] - target_height) < 2.0
+    level = tooth_vertices[mask]
+    if len(level) < 10:
+        pos = tooth_center.copy()
+        pos[height_axis] = target_height
+        return pos
+    tooth_h = tooth_center.copy()
+    tooth_h[height_axis] = 0
+    center_h = arch_center.copy()
+    center_h[height_axis] = 0
+    radial = tooth_h - center_h
+    radial = radial / np.linalg.norm(radial)
+    distances = []
+    for vertex in level:
+        v = vertex.copy()
+        v[height_axis] = 0
+        distances.append(np.dot(v - center_h, radial))
+    distances = np.array(distances)
+    lingual = level[distances <= np.percentile(distances, 15)]
+    if len(lingual) > 3:
+        return lingual.mean(axis=0)
+    return level[np.argmin(distances)]
+
+
+class TestLingualPosition:
+    """Test lingual surface point selection."""
+
+    def test_matches_reference(self, arch, use_numba):
+        positioner = BracketPositioner()
+        arch_center = np.zeros(3)
+        for tooth in arch:
+            expected = reference_lingual_position(
+                tooth['vertices'], tooth['center'], arch_center, 5.0
+            )
+            result = positioner._find_lingual_position(
+                tooth['vertices'], tooth['center'], arch_center, 5.0, 2
+            )
+            np.testing.assert_allclose(result, expected, atol=1e-9)
+
+    @pytest.mark.parametrize('height_axis', [0, 1])
+    def test_other_height_axes(self, arch, use_numba, height_axis):
+        # Rotate the columns so the tooth height lies along height_axis
+        order = np.roll(np.arange(3), height_axis - 2)
+        positioner = BracketPositioner()
+        arch_center = np.array([0.5, -0.5, 0.25])
+        for tooth in arch[:4]:
+            vertices = tooth['vertices'][:, order]
+            center = tooth['center'][order]
+            expected = reference_lingual_position(vertices, center, arch_center, 5.0, height_axis)
+            result = positioner._find_lingual_position(vertices, center, arch_center, 5.0, height_axis)
+            np.testing.assert_allclose(result, expected, atol=1e-9)
+
+    def test_keeps_all_vertices_tied_at_cutoff(self, use_numba):
+        # 20 band vertices: the 15th-percentile cutoff (k = 2) falls inside
+        # a run of five vertices at the same radial distance
+        x = np.array([8.0] * 5 + [9.0] * 15, dtype=np.float32)
+        y = np.arange(20, dtype=np.float32)
+        vertices = np.column_stack([x, y, np.full(20, 5.0, dtype=np.float32)])
+        result = BracketPositioner()._find_lingual_position(
+            vertices, np.array([10.0, 0.0, 5.0]), np.zeros(3), 5.0, 2)
+        np.testing.assert_allclose(result, vertices[:5].astype(np.float64).mean(axis=0))
+        np.testing.assert_allclose(
+            result, reference_lingual_position(vertices.astype(np.float64), np.array([10.0, 0.0, 5.0]),
+                                               np.zeros(3), 5.0))
+
+    def test_lingual_side_faces_arch_center(self, arch):
+        positioner = BracketPositioner()
+        arch_center = np.zeros(3)
+        tooth = arch[7]
+        result = positioner._find_lingual_position(
+            tooth['vertices'], tooth['center'], arch_center, 5.0, 2
+        )
+        assert np.linalg.norm(result[:2]) < np.linalg.norm(tooth['center'][:2])
+
+    def test_fallback_when_band_is_empty(self, arch, use_numba):
+        positioner = BracketPositioner()
+        tooth = arch[0]
+        result = positioner._find_lingual_position(
+            tooth['vertices'], tooth['center'], np.zeros(3), 50.0, 2
+        )
+        np.testing.assert_allclose(result[:2], tooth['center'][:2])
+        assert result[2] == 50.0
+
+
+class TestCalculatePositions:
+    """Test full bracket placement."""
+
+    def test_one_bracket_per_tooth(self, arch):
+        positioner = BracketPositioner()
+        brackets = positioner.calculate_positions(arch, None, np.zeros(3), 'lower')
+        assert len(brackets) == len(arch)
+        assert [b['tooth_index'] for b in brackets] == list(range(len(arch)))
+
+    def test_normals_point_inward_for_lingual(self, arch, use_numba):
+        positioner = BracketPositioner('lingual')
+        brackets = positioner.calculate_positions(arch, None, np.zeros(3), 'lower')
+        for bracket in brackets:
+            assert np.isclose(np.linalg.norm(bracket['normal']), 1.0)
+            assert np.dot(bracket['normal'], bracket['tooth_center']) < 0
+
+    def test_normals_point_outward_for_labial(self, arch, use_numba):
+        positioner = BracketPositioner('labial')
+        brackets = positioner.calculate_positions(arch, None, np.zeros(3), 'lower')
+        for bracket in brackets:
+            assert np.dot(bracket['normal'], bracket['tooth_center']) > 0
+
+    def test_target_height_depends_on_arch(self, arch):
+        positioner = BracketPositioner()
+        lower = positioner.calculate_positions(arch, None, np.zeros(3), 'lower')
+        upper = positioner.calculate_positions(arch, None, np.zeros(3), 'upper')
+        # Lower brackets sit below the occlusal (max Z) edge, upper above the min
+        for lo, up in zip(lower, upper):
+            assert lo['position'][2] == pytest.approx(10.0 - 4.5, abs=1.0)
+            assert up['position'][2] == pytest.approx(4.5, abs=1.0)
+
+    def test_batch_matches_per_tooth_reference(self, arch, use_numba):
+        positioner = BracketPositioner()
+        for i, tooth in enumerate(arch):
+            tooth['type'] = ['incisor', 'canine', 'posterior'][i % 3]
+        brackets = positioner.calculate_positions(arch, None, np.zeros(3), 'upper')
+        for i, (tooth, bracket) in enumerate(zip(arch, brackets)):
+            position, normal = reference_bracket(positioner, tooth, np.zeros(3), 'upper')
+            np.testing.assert_allclose(bracket['position'], position, atol=1e-9)
+            np.testing.assert_allclose(bracket['normal'], normal, atol=1e-12)
+            assert bracket['tooth_index'] == i
+            assert bracket['tooth_type'] == tooth['type']
+            assert bracket['visible'] == (tooth['type'] == 'posterior')
+
+    def test_empty_teeth(self):
+        assert BracketPositioner().calculate_positions([], None, np.zeros(3), 'lower') == []
+
+    def test_repeated_calls_reuse_tooth_cache(self, arch, use_numba):
+        positioner = BracketPositioner()
+        first = positioner.calculate_positions(arch, None, np.zeros(3), 'lower')
+        cached_table = positioner._tooth_cache['vertices']
+        second = positioner.calculate_positions(arch, None, np.zeros(3), 'lower')
+        assert positioner._tooth_cache['vertices'] is cached_table
+        for a, b in zip(first, second):
+            np.testing.assert_array_equal(a['position'], b['position'])
+
+    def test_tooth_cache_invalidated_when_teeth_change(self, arch, use_numba):
+        positioner = BracketPositioner()
+        positioner.calculate_positions(arch, None, np.zeros(3), 'lower')
+        moved = [dict(t, vertices=t['vertices'] + [1.0, 0, 0], center=t['center'] + [1.0, 0, 0])
+                 for t in arch]
+        brackets = positioner.calculate_positions(moved, None, np.zeros(3), 'lower')
+        for tooth, bracket in zip(moved, brackets):
+            position, _ = reference_bracket(positioner, tooth, np.zeros(3), 'lower')
+            np.testing.assert_allclose(bracket['position'], position, atol=1e-9)
+
+
+class TestPackBrackets:
+    """Test the Structure-of-Arrays bracket table."""
+
+    def test_rows_match_brackets(self, arch):
+        brackets = BracketPositioner().calculate_positions(arch, None, np.zeros(3), 'lower')
+        brackets[3]['visible'] = False
+        packed = BracketPositioner.pack_brackets(brackets)
+        assert packed['positions'].shape == packed['normals'].shape == (len(brackets), 3)
+        for i, bracket in enumerate(brackets):
+            np.testing.assert_array_equal(packed['positions'][i], bracket['position'])
+            np.testing.assert_array_equal(packed['original_positions'][i], bracket['original_position'])
+            np.testing.assert_array_equal(packed['normals'][i], bracket['normal'])
+            assert packed['tooth_indices'][i] == bracket['tooth_index']
+            assert packed['visible'][i] == bracket.get('visible', True)
+
+    def test_offset_positions(self, arch):
+        brackets = BracketPositioner().calculate_positions(arch, None, np.zeros(3), 'lower')
+        packed = BracketPositioner.pack_brackets(brackets)
+        moved = BracketPositioner.offset_positions(packed, 0.5)
+        for bracket, position in zip(brackets, moved):
+            np.testing.assert_allclose(position, bracket['position'] + bracket['normal'] * 0.5)
+
+        per_bracket = np.arange(len(brackets), dtype=float)
+        moved = BracketPositioner.offset_positions(packed, per_bracket)
+        np.testing.assert_allclose(moved[-1], brackets[-1]['position'] + brackets[-1]['normal'] * per_bracket[-1])
+
+    def test_empty(self):
+        packed = BracketPositioner.pack_brackets([])
+        assert packed['positions'].shape == (0, 3)
+        assert BracketPositioner.offset_positions(packed, 1.0).shape == (0, 3)
+
+
+class TestHeightBands:
+    """Test the compiled band search over the packed teeth table."""
+
+    def test_matches_per_tooth_searchsorted(self, arch):
+        if not bracket_positioner_module.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        positioner = BracketPositioner()
+        cache = positioner._get_tooth_cache(arch, None, np.zeros(3), 2)
+        heights, offsets = cache['heights'], cache['offsets']
+        targets = np.linspace(3.0, 7.0, len(arch))
+        band_starts, band_ends = bracket_positioner_module.height_bands_core(
+            heights, offsets[:-1], offsets[1:], targets, 2.0)
+        for i in range(len(arch)):
+            tooth_heights = heights[offsets[i]:offsets[i + 1]]
+            in_band = np.flatnonzero((tooth_heights >= targets[i] - 2.0) &
+                                     (tooth_heights <= targets[i] + 2.0)) + offsets[i]
+            assert band_starts[i] == in_band[0] and band_ends[i] == in_band[-1] + 1
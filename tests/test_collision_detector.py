@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the collision detection system.
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core._collision_kernels as collision_kernels_module
+import core.collision_detector2 as collision_detector_module
+from core.collision_detector2 import CollisionDetector, CollisionResult, CollisionType, _BatchResults
+
+
+def make_sphere_mesh(radius=5.0, n_lat=24, n_lon=48, center=(0.0, 0.0, 0.0)):
+    """Create a closed latitude/longitude sphere with outward-facing triangles."""
+    vertices = [[0.0, 0.0, radius]]
+    for i in range(1, n_lat):
+        phi = np.pi * i / n_lat
+        for j in range(n_lon):
+            theta = 2 * np.pi * j / n_lon
+            vertices.append([radius * np.sin(phi) * np.cos(theta),
+                             radius * np.sin(phi) * np.sin(theta),
+                             radius * np.cos(phi)])
+    vertices.append([0.0, 0.0, -radius])
+    vertices = np.array(vertices) + np.asarray(center)
+
+    def ring(i, j):
+        return 1 + (i - 1) * n_lon + (j % n_lon)
+
+    triangles = []
+    for j in range(n_lon):
+        triangles.append([0, ring(1, j), ring(1, j + 1)])
+    for i in range(1, n_lat - 1):
+        for j in range(n_lon):
+            a, b = ring(i, j), ring(i, j + 1)
+            c, d = ring(i + 1, j), ring(i + 1, j + 1)
+            triangles.append([a, c, d])
+            triangles.append([a, d, b])
+    bottom = len(vertices) - 1
+    for j in range(n_lon):
+        triangles.append([bottom, ring(n_lat - 1, j + 1), ring(n_lat - 1, j)])
+    return vertices, np.array(triangles)
+
+
+@pytest.fixture
+def numba_module():
+    """Module patched by the shared use_numba / set_numba fixtures."""
+    return collision_detector_module
+
+
+@pytest.fixture
+def sphere():
+    return make_sphere_mesh()
+
+
+@pytest.fixture
+def detector(sphere):
+    detector = CollisionDetector(collision_tolerance=0.5)
+    detector.initialize_mesh_data(*sphere)
+    return detector
+
+
+class TestMeshInitialization:
+    """Test triangle data and acceleration structure construction."""
+
+    def test_triangle_data_matches_per_triangle_loop(self, sphere, detector):
+        vertices, triangles = sphere
+        for i, (a, b, c) in enumerate(triangles):
+            v0, v1, v2 = vertices[a], vertices[b], vertices[c]
+            normal = np.cross(v1 - v0, v2 - v0)
+            normal /= np.linalg.norm(normal)
+            np.testing.assert_allclose(detector.triangle_centers[i], (v0 + v1 + v2) / 3, atol=1e-5)
+            np.testing.assert_allclose(detector.triangle_normals[i], normal, atol=1e-5)
+
+    def test_triangle_edges_are_precomputed(self, detector):
+        tris = detector.mesh_vertices[detector.mesh_triangles]
+        np.testing.assert_array_equal(detector.tri_v0, tris[:, 0])
+        np.testing.assert_array_equal(detector.tri_edge1, tris[:, 1] - tris[:, 0])
+        np.testing.assert_array_equal(detector.tri_edge2, tris[:, 2] - tris[:, 0])
+
+    def test_normals_point_outward(self, detector):
+        assert np.all(np.einsum('ij,ij->i', detector.triangle_normals, detector.triangle_centers) > 0)
+
+    def test_degenerate_triangle_has_zero_normal(self):
+        vertices = np.array([[0.0, 0, 0], [1, 0, 0], [0, 1, 0], [2, 0, 0]])
+        triangles = np.array([[0, 1, 2], [0, 1, 3]])
+        detector = CollisionDetector()
+        detector.initialize_mesh_data(vertices, triangles)
+        np.testing.assert_allclose(detector.triangle_normals[1], 0.0)
+
+    def test_triangle_boxes_contain_vertices(self, sphere, detector):
+        vertices, triangles = sphere
+        tris = vertices[triangles]
+        assert np.all(detector.bvh_min[:, None, :] <= tris)
+        assert np.all(detector.bvh_max[:, None, :] >= tris)
+
+    def test_mesh_arrays_are_single_precision(self, sphere, detector):
+        assert detector.mesh_vertices.dtype == np.float32
+        assert detector.mesh_triangles.dtype == np.int32
+        assert detector.triangle_centers.dtype == np.float32
+        assert detector.triangle_normals.dtype == np.float32
+        # The detector keeps its own copy of the mesh
+        assert not np.shares_memory(detector.mesh_triangles, sphere[1])
+
+    def test_triangle_boxes_are_float32_arrays(self, detector):
+        assert detector.bvh_min.dtype == np.float32
+        assert detector.bvh_max.dtype == np.float32
+        assert detector.bvh_min.flags['C_CONTIGUOUS']
+        assert detector.bvh_min.shape == (len(detector.mesh_triangles), 3)
+
+    def test_bvh_leaves_cover_every_triangle_once(self, detector):
+        bvh = detector.bvh_tree
+        leaves = bvh['node_count'] > 0
+        assert np.all(bvh['node_count'][leaves] <= collision_detector_module.BVH_MAX_LEAF_SIZE)
+        covered = np.concatenate([
+            bvh['leaf_id'][block, :count]
+            for block, count in zip(bvh['node_right_or_prim'][leaves], bvh['node_count'][leaves])
+        ])
+        np.testing.assert_array_equal(np.sort(covered), np.arange(len(detector.mesh_triangles)))
+
+    def test_packed_leaf_blocks(self, sphere, detector):
+        vertices, triangles = sphere
+        bvh = detector.bvh_tree
+        lanes = collision_detector_module.BVH_MAX_LEAF_SIZE
+        assert bvh['leaf_p0'].shape == (len(bvh['leaf_id']), lanes, 3)
+        assert bvh['leaf_p0'].dtype == np.float32
+        valid = bvh['leaf_id'] >= 0
+        tris = vertices[triangles[bvh['leaf_id'][valid]]]
+        np.testing.assert_allclose(bvh['leaf_p0'][valid], tris[:, 0], atol=1e-5)
+        np.testing.assert_allclose(bvh['leaf_e1'][valid], tris[:, 1] - tris[:, 0], atol=1e-5)
+        np.testing.assert_allclose(bvh['leaf_e2'][valid], tris[:, 2] - tris[:, 0], atol=1e-5)
+        # Padding lanes are zero-area triangles
+        assert np.all(bvh['leaf_e1'][~valid] == 0) and np.all(bvh['leaf_e2'][~valid] == 0)
+
+    def test_bvh_parent_boxes_contain_children(self, detector):
+        bvh = detector.bvh_tree
+        for node in np.flatnonzero(bvh['node_count'] == 0):
+            for child in (bvh['node_left'][node], bvh['node_right_or_prim'][node]):
+                assert np.all(bvh['node_min'][node] <= bvh['node_min'][child])
+                assert np.all(bvh['node_max'][node] >= bvh['node_max'][child])
+
+
+def brute_force_closest(detector, point):
+    """Closest surface point by projecting onto every triangle."""
+    best = (None, np.inf, -1)
+    for i, (a, b, c) in enumerate(detector.mesh_triangles):
+        q, d = detector._project_point_to_triangle(
+            point, detector.mesh_vertices[a], detector.mesh_vertices[b], detector.mesh_vertices[c])
+        if d < best[1]:
+            best = (q, d, i)
+    return best
+
+
+class TestClosestSurfacePoint:
+    """Test closest surface point queries."""
+
+    def test_bvh_matches_brute_force(self, detector, set_numba):
+        rng = np.random.default_rng(0)
+        for point in rng.uniform(-7, 7, (12, 3)):
+            set_numba(False)
+            expected_point, expected_dist, _ = brute_force_closest(detector, point)
+            set_numba(True)
+            closest, normal, tri = detector._find_closest_surface_point(point)
+            # Leaf triangles are packed in float32
+            np.testing.assert_allclose(np.linalg.norm(closest - point), expected_dist, atol=1e-5)
+            np.testing.assert_allclose(normal, detector.triangle_normals[tri])
+
+    def test_closest_point_lies_on_sphere(self, detector, use_numba):
+        point = np.array([0.3, -0.2, 5.4])
+        closest, normal, tri = detector._find_closest_surface_point(point)
+        assert 0 <= tri < len(detector.mesh_triangles)
+        assert np.linalg.norm(closest) == pytest.approx(5.0, abs=0.1)
+        assert np.dot(normal, point) > 0
+
+    def test_projection_kernel_matches_numpy(self, set_numba):
+        detector = CollisionDetector()
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            point, v0, v1, v2 = rng.normal(size=(4, 3))
+            compiled = detector._project_point_to_triangle(point, v0, v1, v2)
+            set_numba(False)
+            expected = detector._project_point_to_triangle(point, v0, v1, v2)
+            set_numba(True)
+            np.testing.assert_allclose(compiled[0], expected[0], atol=1e-9)
+            assert compiled[1] == pytest.approx(expected[1], abs=1e-9)
+
+    def test_batch_matches_single_queries(self, detector, use_numba):
+        points = np.random.default_rng(2).uniform(-6, 6, (20, 3))
+        closest, normals, triangles = detector._find_closest_surface_points(points)
+        for i, point in enumerate(points):
+            single = detector._find_closest_surface_point(point)
+            np.testing.assert_allclose(closest[i], single[0], atol=1e-12)
+            np.testing.assert_allclose(normals[i], single[1], atol=1e-12)
+            assert triangles[i] == single[2]
+
+
+class TestBatchCollisionCheck:
+    """Test batched point collision checks."""
+
+    def test_matches_single_point_checks(self, detector, use_numba):
+        rng = np.random.default_rng(3)
+        directions = rng.normal(size=(40, 3))
+        points = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+        points *= rng.uniform(4.0, 6.0, (40, 1))
+        batch = detector.batch_collision_check(points)
+        for point, result in zip(points, batch):
+            single = detector.check_point_collision(point)
+            assert result.collision_detected == single.collision_detected
+            if result.collision_detected:
+                # Batches resolve through the grid, single points through the
+                # float32 BVH leaves; triangles sharing the closest edge tie
+                np.testing.assert_allclose(result.collision_point, single.collision_point, atol=1e-5)
+                assert result.triangle_index >= 0
+
+
+@pytest.fixture
+def grazing_path():
+    """A path along the equator that dips into the tolerance band midway."""
+    angles = np.linspace(0, np.pi, 60)
+    radius = 5.3 + 1.0 * np.abs(np.linspace(-1, 1, 60))
+    return np.column_stack([radius * np.cos(angles), radius * np.sin(angles), np.zeros(60)])
+
+
+class TestPathCollision:
+    """Test whole-path collision checks."""
+
+    def test_arrays_match_single_point_checks(self, detector, grazing_path, use_numba):
+        results = detector.check_path_collision(grazing_path)
+        assert results.mask.any() and not results.mask.all()
+        for i, point in enumerate(grazing_path):
+            single = detector.check_point_collision(point)
+            assert results.mask[i] == single.collision_detected
+            assert results.distances[i] == pytest.approx(single.collision_distance)
+            if single.collision_detected:
+                np.testing.assert_allclose(results.points[i], single.collision_point, atol=1e-5)
+                # Triangles sharing the closest edge or vertex tie
+                assert results.tri_idx[i] >= 0
+                assert results.penetration[i] == pytest.approx(single.penetration_depth)
+            else:
+                assert results.tri_idx[i] == -1
+
+    def test_lazy_results_and_resolution_accept_arrays(self, detector, grazing_path):
+        results = detector.check_path_collision(grazing_path)
+        as_list = list(results.iter_results())
+        assert [r.collision_detected for r in as_list] == results.mask.tolist()
+        np.testing.assert_array_equal(
+            detector.resolve_path_collisions(grazing_path, results),
+            detector.resolve_path_collisions(grazing_path, as_list)
+        )
+
+    def test_round_trip_through_result_objects(self, detector, grazing_path):
+        results = detector.check_path_collision(grazing_path)
+        packed = _BatchResults.from_results(list(results.iter_results()))
+        for field in ('mask', 'points', 'normals', 'distances', 'tri_idx', 'penetration'):
+            np.testing.assert_array_equal(getattr(packed, field), getattr(results, field))
+
+    def test_visualization_data(self, detector, grazing_path):
+        results = detector.check_path_collision(grazing_path)
+        data = detector.visualize_collision_data(results)
+        assert data['collision_count'] == results.collision_count
+        np.testing.assert_array_equal(data['collision_points'], results.points[results.mask])
+        assert data['max_penetration'] == pytest.approx(results.penetration[results.mask].max())
+        empty = detector.visualize_collision_data(detector.check_path_collision(grazing_path + 50))
+        assert empty['collision_count'] == 0 and empty['max_penetration'] == 0.0
+
+    def test_without_mesh(self, grazing_path):
+        results = CollisionDetector().check_path_collision(grazing_path)
+        assert not results.mask.any()
+        np.testing.assert_array_equal(results.points, grazing_path.astype(np.float32))
+
+
+class TestQueryCache:
+    """Test the fixed-size point query cache."""
+
+    def test_repeated_point_hits_cache(self, detector):
+        point = np.array([0.0, 0.0, 5.2])
+        first = detector.check_point_collision(point)
+        second = detector.check_point_collision(point + 1e-5)
+        assert second is first
+        assert detector.get_collision_statistics()['cache_hits'] == 1
+
+    def test_distinct_cells_are_not_confused(self, detector):
+        inside = detector.check_point_collision(np.array([0.0, 0.0, 5.2]))
+        outside = detector.check_point_collision(np.array([0.0, 0.0, 9.0]))
+        assert inside.collision_detected and not outside.collision_detected
+
+    def test_cache_size_is_bounded(self, detector):
+        points = np.random.default_rng(4).uniform(-8, 8, (3 * collision_detector_module.COLLISION_CACHE_SIZE, 3))
+        for point in points:
+            detector.check_point_collision(point)
+        assert detector.get_collision_statistics()['cache_size'] <= collision_detector_module.COLLISION_CACHE_SIZE
+
+    def test_clear_cache(self, detector):
+        point = np.array([0.0, 0.0, 5.2])
+        first = detector.check_point_collision(point)
+        detector.clear_cache()
+        assert detector.get_collision_statistics()['cache_size'] == 0
+        assert detector.check_point_collision(point) is not first
+
+
+class TestQueryTiming:
+    """Test the optional per-query timing statistics."""
+
+    def test_timing_disabled_by_default(self, detector):
+        detector.check_point_collision(np.array([0.0, 0.0, 5.2]))
+        assert detector.performance_stats['total_time'] == 0.0
+        assert detector.get_collision_statistics()['average_query_time'] == 0.0
+
+    def test_average_is_total_over_queries(self, sphere):
+        detector = CollisionDetector(collision_tolerance=0.5, timing_enabled=True)
+        detector.initialize_mesh_data(*sphere)
+        for z in (5.2, 6.0, 9.0):
+            detector.check_point_collision(np.array([0.0, 0.0, z]))
+        stats = detector.get_collision_statistics()
+        assert detector.performance_stats['total_time'] > 0.0
+        assert stats['average_query_time'] == pytest.approx(
+            detector.performance_stats['total_time'] / 3 * 1000)
+
+
+class TestSpatialGrid:
+    """Test the uniform spatial hash grid broad phase."""
+
+    def test_grid_built_for_large_meshes_only(self, detector):
+        assert detector.spatial_grid is not None
+        small = CollisionDetector()
+        vertices, triangles = make_sphere_mesh(n_lat=3, n_lon=4)
+        small.initialize_mesh_data(vertices, triangles)
+        assert len(triangles) < collision_detector_module.GRID_MIN_TRIANGLES
+        assert small.spatial_grid is None
+
+    def test_every_triangle_is_bucketed(self, detector):
+        grid = detector.spatial_grid
+        assert grid['cell_offsets'][-1] == len(grid['cell_tri_ids'])
+        np.testing.assert_array_equal(np.unique(grid['cell_tri_ids']),
+                                      np.arange(len(detector.mesh_triangles)))
+
+    def test_grid_matches_bvh_near_surface(self, detector):
+        if not collision_detector_module.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        rng = np.random.default_rng(5)
+        directions = rng.normal(size=(200, 3))
+        points = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+        points *= rng.uniform(4.7, 5.3, (200, 1))
+        grid_points, grid_normals, grid_tris = detector._find_closest_surface_points(points, max_distance=0.5)
+        bvh_points, bvh_normals, bvh_tris = detector._find_closest_surface_points(points)
+        np.testing.assert_allclose(np.linalg.norm(grid_points - points, axis=1),
+                                   np.linalg.norm(bvh_points - points, axis=1), atol=1e-5)
+        assert np.all(grid_tris >= 0)
+
+
+class TestRayIntersection:
+    """Test ray casting against the mesh."""
+
+    def test_vectorized_matches_per_triangle(self, detector, use_numba):
+        rng = np.random.default_rng(6)
+        origins = rng.uniform(-2, 2, (10, 3))
+        directions = rng.normal(size=(10, 3))
+        hits, t, indices = detector.rays_first_intersection(origins, directions)
+        for origin, direction, hit, t_hit, idx in zip(origins, directions, hits, t, indices):
+            per_triangle = [detector.ray_triangle_intersection(origin, direction, i)
+                            for i in range(len(detector.mesh_triangles))]
+            t_values = [r[1] if r[0] else np.inf for r in per_triangle]
+            assert hit == np.isfinite(min(t_values))
+            assert t_hit == pytest.approx(min(t_values))
+            assert idx == int(np.argmin(t_values))
+
+    def test_ray_from_center_hits_sphere(self, detector, use_numba):
+        hit, t, idx = detector.ray_any_intersection(np.zeros(3), np.array([0.0, 0.0, 1.0]))
+        assert hit
+        assert t == pytest.approx(5.0, abs=0.05)
+        assert detector.triangle_normals[idx][2] > 0
+
+    def test_ray_pointing_away_misses(self, detector, use_numba):
+        hit, t, idx = detector.ray_any_intersection(np.array([0.0, 0.0, 8.0]), np.array([0.0, 0.0, 1.0]))
+        assert not hit and t == 0.0 and idx == -1
+
+    def test_candidate_subset(self, detector, use_numba):
+        _, _, idx = detector.ray_any_intersection(np.zeros(3), np.array([1.0, 0.0, 0.0]))
+        others = np.setdiff1d(np.arange(len(detector.mesh_triangles)), [idx])
+        hit, _, other_idx = detector.ray_any_intersection(np.zeros(3), np.array([1.0, 0.0, 0.0]), others)
+        assert other_idx != idx
+
+
+class TestKernelSignatures:
+    """Test that the kernels are compiled ahead of the first query."""
+
+    def test_queries_reuse_warm_up_signatures(self, detector):
+        if not collision_detector_module.NUMBA_AVAILABLE:
+            pytest.skip("numba not installed")
+        kernels = [kernel for kernel, _ in collision_kernels_module.KERNEL_SIGNATURES]
+        compiled = [len(kernel.signatures) for kernel in kernels]
+
+        points = np.random.default_rng(9).uniform(-6, 6, (50, 3))
+        detector.check_path_collision(points)
+        detector._find_closest_surface_points(points)
+        detector._find_closest_surface_point(points[0])
+        detector.rays_first_intersection(points, -points)
+        detector.rays_first_intersection(points, -points, candidates=np.arange(10))
+        detector._project_point_to_triangle(*points[:4])
+
+        # No query needed a further specialization
+        assert [len(kernel.signatures) for kernel in kernels] == compiled
+
+
+class TestCollisionResolution:
+    """Test moving colliding path points to a safe distance."""
+
+    def test_matches_single_point_resolution(self, detector, grazing_path):
+        results = detector.check_path_collision(grazing_path)
+        corrected = detector.resolve_path_collisions(grazing_path, results)
+        for i, collision in enumerate(results.iter_results()):
+            if collision.collision_detected:
+                expected = detector._resolve_single_collision(grazing_path[i], collision)
+                np.testing.assert_allclose(corrected[i], expected, atol=1e-6)
+
+    def test_fallback_directions(self, detector):
+        path = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [2.0, 0.0, 0.0], [3.0, 0.0, 0.0], [4.0, 0.0, 0.0]])
+        collisions = [
+            CollisionResult(False, CollisionType.POINT_SURFACE, path[0], np.zeros(3), 0.0, 1.0),
+            # No normal: move away from the surface point
+            CollisionResult(True, CollisionType.POINT_SURFACE, np.array([1.0, -0.2, 0.0]),
+                            np.zeros(3), 0.3, 0.2, 0),
+            CollisionResult(False, CollisionType.POINT_SURFACE, path[2], np.zeros(3), 0.0, 1.0),
+            # No normal and on the surface: move up
+            CollisionResult(True, CollisionType.POINT_SURFACE, path[3].copy(), np.zeros(3), 0.5, 0.0, 1),
+            CollisionResult(False, CollisionType.POINT_SURFACE, path[4], np.zeros(3), 0.0, 1.0),
+        ]
+        corrected = detector.resolve_path_collisions(path, collisions)
+        np.testing.assert_allclose(corrected[1], [1.0, -0.2 + 1.0, 0.0], atol=1e-6)
+        np.testing.assert_allclose(corrected[3], [3.0, 0.0, 1.0], atol=1e-6)
+
+    def test_no_collisions_returns_copy(self, detector):
+        path = np.array([[0.0, 0.0, 20.0], [1.0, 0.0, 20.0]])
+        corrected = detector.resolve_path_collisions(path, detector.check_path_collision(path))
+        np.testing.assert_array_equal(corrected, path)
+        assert corrected is not path
+
+
+def reference_smoothing(path, corrected_indices):
+    """Per-window smoothing loop the vectorized version replaces."""
+    smoothed = path.copy()
+    for idx in corrected_indices:
+        start, end = max(0, idx - 2), min(len(smoothed), idx + 3)
+        if any(i in corrected_indices for i in range(start, end) if i != idx):
+            continue
+        for i in range(start + 1, end - 1):
+            if i != idx:
+                smoothed[i] = 0.7 * smoothed[i] + 0.3 * (smoothed[i - 1] + smoothed[i + 1]) / 2
+    return smoothed
+
+
+class TestPathSmoothing:
+    """Test smoothing around corrected points."""
+
+    @pytest.mark.parametrize('corrected_indices', [
+        [0], [1], [5], [18], [19], [4, 5], [2, 9, 15], [3, 4, 12, 19]
+    ])
+    def test_matches_window_loop(self, detector, corrected_indices):
+        path = np.random.default_rng(7).normal(size=(20, 3))
+        results = _BatchResults.clear(path)
+        results.mask[corrected_indices] = True
+        smoothed = detector._smooth_corrected_path(path, path, results)
+        np.testing.assert_allclose(smoothed, reference_smoothing(path, corrected_indices), atol=1e-12)
+
+    def test_corrected_points_are_kept(self, detector):
+        path = np.random.default_rng(8).normal(size=(20, 3))
+        results = _BatchResults.clear(path)
+        results.mask[[3, 6, 10]] = True
+        smoothed = detector._smooth_corrected_path(path, path, results)
+        np.testing.assert_array_equal(smoothed[results.mask], path[results.mask])
+
+
+class TestPathMetrics:
+    """Test path length and deviation metrics."""
+
+    def test_path_length(self, detector):
+        path = np.array([[0.0, 0.0, 0.0], [3.0, 4.0, 0.0], [3.0, 4.0, 2.0]])
+        assert detector._calculate_path_length(path) == pytest.approx(7.0)
+        assert detector._calculate_path_length(path[:1]) == 0.0
+
+    def test_collision_report_matches_per_result_scan(self, detector, grazing_path):
+        results = detector.check_path_collision(grazing_path)
+        corrected = detector.resolve_path_collisions(grazing_path, results)
+        report = detector.export_collision_report(results, grazing_path, corrected)
+
+        hits = [r for r in results.iter_results() if r.collision_detected]
+        depths = [r.penetration_depth for r in hits]
+        deviations = [np.linalg.norm(a - b) for a, b in zip(grazing_path, corrected)]
+        summary, analysis = report['summary'], report['path_analysis']
+        assert summary['collision_detections'] == len(hits) > 0
+        assert summary['max_penetration_depth'] == pytest.approx(max(depths))
+        assert summary['average_penetration_depth'] == pytest.approx(np.mean(depths))
+        assert analysis['path_deviation'] == pytest.approx(np.mean(deviations))
+        assert analysis['max_point_deviation'] == pytest.approx(max(deviations))
+
+        points = np.array([r.collision_point for r in hits])
+        region = report['collision_regions']['regions'][0]
+        np.testing.assert_allclose(region['center'], points.mean(axis=0), atol=1e-5)
+        assert region['radius'] == pytest.approx(
+            max(np.linalg.norm(p - points.mean(axis=0)) for p in points), abs=1e-5)
+
+    def test_collision_report_accepts_result_list(self, detector, grazing_path):
+        results = detector.batch_collision_check(grazing_path)
+        report = detector.export_collision_report(results, grazing_path, grazing_path)
+        assert report['summary']['total_path_points'] == len(grazing_path)
+        assert report['path_analysis']['max_point_deviation'] == 0.0
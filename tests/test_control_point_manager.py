@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Unit tests for control point management.
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualization.control_point_manager import ControlPointManager
+from wire.wire_path_creator import WirePathCreator
+
+
+class RecordingPathCreator:
+    """Minimal wire path creator stand-in that records updates."""
+
+    def __init__(self):
+        self.updates = []
+        self.bends = []
+
+    def update_control_point(self, index, new_position):
+        self.updates.append((index, new_position.copy()))
+
+    def adjust_bend_angle(self, index, angle_delta):
+        self.bends.append((index, angle_delta))
+
+
+@pytest.fixture
+def control_points():
+    return [
+        {'position': np.array([0.0, 0.0, 0.0]), 'type': 'bracket', 'bend_angle': 5.0,
+         'original_position': np.array([0.0, 0.0, 0.0])},
+        {'position': np.array([1.0, 2.0, 3.0]), 'type': 'intermediate'},
+        {'position': np.array([4.0, 5.0, 6.0]), 'type': 'bracket',
+         'original_position': np.array([4.0, 5.0, 6.0])},
+    ]
+
+
+@pytest.fixture
+def manager(control_points):
+    manager = ControlPointManager()
+    manager.setup(control_points, RecordingPathCreator(), None)
+    return manager
+
+
+class TestControlPointBuffers:
+    """Test the Structure-of-Arrays control point storage."""
+
+    def test_setup_from_dict_list(self, manager, control_points):
+        assert len(manager) == 3
+        np.testing.assert_array_equal(manager.positions, [cp['position'] for cp in control_points])
+        assert list(manager.types) == ['bracket', 'intermediate', 'bracket']
+        np.testing.assert_array_equal(manager.bend_angles, [5.0, 0.0, 0.0])
+
+    def test_setup_from_arrays(self):
+        manager = ControlPointManager()
+        manager.setup({'positions': np.zeros((2, 3)), 'types': ['bracket', 'bracket']}, None, None)
+        assert len(manager) == 2
+        np.testing.assert_array_equal(manager.vertical_offsets, 0.0)
+
+    def test_to_dict_list_roundtrip(self, manager, control_points):
+        dicts = manager.to_dict_list()
+        assert [cp['type'] for cp in dicts] == [cp['type'] for cp in control_points]
+        assert 'original_position' not in dicts[1]
+        for cp, expected in zip(dicts, control_points):
+            np.testing.assert_array_equal(cp['position'], expected['position'])
+
+    def test_dicts_are_snapshots(self, manager, control_points):
+        dicts = manager.control_points
+        dicts[0]['position'] += 1.0
+        dicts[0]['bend_angle'] = 30.0
+        np.testing.assert_array_equal(manager.positions[0], [0.0, 0.0, 0.0])
+        assert manager.bend_angles[0] == 5.0
+
+        # setup copied the caller's list: moves are read back from the manager
+        manager.select_control_point(0)
+        manager.move_selected_point(np.array([1.0, 0.0, 0.0]), step=1.0)
+        np.testing.assert_array_equal(control_points[0]['position'], [0.0, 0.0, 0.0])
+        np.testing.assert_array_equal(manager.control_points[0]['position'], [1.0, 0.0, 0.0])
+
+    def test_assign_control_points(self, manager):
+        creator = manager.wire_path_creator
+        manager.select_control_point(2)
+        manager.control_points = [{'position': np.array([7.0, 8.0, 9.0]), 'type': 'manual'}]
+        assert len(manager) == 1 and list(manager.types) == ['manual']
+        assert manager.selected_index is None
+        assert manager.wire_path_creator is creator
+
+    def test_extra_fields_roundtrip(self, manager, control_points):
+        control_points[1]['index'] = 7
+        control_points[1]['bracket_data'] = {'tooth': 3}
+        manager.control_points = control_points
+        cp = manager.control_points[1]
+        assert cp['index'] == 7 and cp['bracket_data'] == {'tooth': 3}
+        assert 'index' not in manager.control_points[0]
+
+    def test_indices_from_arrays(self):
+        manager = ControlPointManager()
+        manager.setup({'positions': np.zeros((2, 3)), 'types': ['bracket', 'bracket'],
+                       'indices': np.array([4, 9])}, None, None)
+        assert [cp['index'] for cp in manager.control_points] == [4, 9]
+
+    def test_bend_then_move_keeps_bend_offset(self):
+        creator = WirePathCreator()
+        angles = np.linspace(0.2, np.pi - 0.2, 6)
+        brackets = [{'position': np.array([20 * np.cos(a), 20 * np.sin(a), 5.0]), 'visible': True}
+                    for a in angles]
+        creator.create_smooth_path(brackets, np.zeros(3))
+        manager = ControlPointManager()
+        manager.setup(creator.control_points, creator, None)
+        index = next(i for i, cp in enumerate(creator.control_points) if cp['type'] == 'bracket')
+
+        manager.select_control_point(index)
+        assert manager.adjust_bend_angle(60.0)
+        assert manager.bend_angles[index] == 45.0
+        bent = creator.control_points[index]['position'].copy()
+        np.testing.assert_array_equal(manager.get_selected_control_point()['position'], bent)
+        assert manager.get_control_point_info(index)['bend_angle'] == 45.0
+
+        manager.move_selected_point(np.array([0.0, 0.0, 1.0]), step=1.0)
+        np.testing.assert_allclose(creator.control_points[index]['position'], bent + [0.0, 0.0, 1.0])
+
+    def test_move_updates_buffer_in_place(self, manager):
+        positions = manager.positions
+        manager.select_control_point(1)
+        assert manager.move_selected_point(np.array([0.0, 0.0, 1.0]), step=0.5)
+        assert manager.positions is positions
+        np.testing.assert_array_equal(positions[1], [1.0, 2.0, 3.5])
+        index, sent = manager.wire_path_creator.updates[-1]
+        assert index == 1
+        np.testing.assert_array_equal(sent, [1.0, 2.0, 3.5])
+
+    def test_move_without_selection(self, manager):
+        assert not manager.move_selected_point(np.array([1.0, 0.0, 0.0]))
+
+    def test_reset_restores_points_with_original(self, manager):
+        manager.select_control_point(0)
+        manager.move_selected_point(np.array([1.0, 0.0, 0.0]))
+        manager.select_control_point(1)
+        manager.move_selected_point(np.array([1.0, 0.0, 0.0]))
+        manager.reset_control_points()
+        np.testing.assert_array_equal(manager.positions[0], [0.0, 0.0, 0.0])
+        # No original position recorded: left where it was moved
+        np.testing.assert_array_equal(manager.positions[1], [1.5, 2.0, 3.0])
+        assert manager.bend_angles[0] == 0.0
+
+    def test_control_point_info(self, manager):
+        manager.select_control_point(2)
+        info = manager.get_control_point_info(2)
+        assert info['is_selected'] and info['type'] == 'bracket'
+        assert info['position'] == [4.0, 5.0, 6.0]
+        assert manager.get_control_point_info(3) is None
+
+    def test_move_logs_instead_of_printing(self, manager, capsys, caplog):
+        manager.select_control_point(1)
+        with caplog.at_level('DEBUG', logger='visualization.control_point_manager'):
+            manager.move_selected_point(np.array([0.0, 0.0, 1.0]), step=0.5)
+        assert capsys.readouterr().out == ''
+        assert '[1.00, 2.00, 3.00] to [1.00, 2.00, 3.50]' in caplog.text
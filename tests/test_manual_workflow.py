@@ -65,5 +65,157 @@ def test_3_point_wire_definition_workflow(workflow_manager):
 
     print(f"Successfully generated wire path with {wire_path.shape[0]} points.")
 
+def test_detection_follows_in_place_translation(workflow_manager):
+    """Re-centring the loaded mesh in place moves the detected teeth with it."""
+    o3d = pytest.importorskip("open3d")
+    rng = np.random.default_rng(0)
+    # Flat crown-level ring of tooth blobs, as in the tooth detector tests
+    blobs = [np.array([20 * np.cos(a), 20 * np.sin(a), 5.0]) + rng.normal(scale=[1.5, 1.5, 0.5], size=(150, 3))
+             for a in np.linspace(0.15, np.pi - 0.15, 14)]
+    mesh = o3d.geometry.TriangleMesh()
+    mesh.vertices = o3d.utility.Vector3dVector(np.concatenate(blobs) + [30.0, -10.0, 4.0])
+    detector = workflow_manager.tooth_detector
+    detector.detection_parameters['crown_ratio_lower'] = 0.5
+    detector.detection_parameters['height_tolerance'] = 10.0
+
+    arch_data = workflow_manager.arch_data['lower']
+    arch_data['mesh'] = mesh
+    arch_data['arch_center'] = workflow_manager.mesh_processor.calculate_arch_center(mesh)
+    detect = lambda: detector.detect_teeth(workflow_manager.mesh_processor.get_cached_mesh(mesh), 'lower')
+    before = detect()
+
+    # What the visualizer does on load
+    center = mesh.get_center()
+    mesh.translate(-center, relative=True)
+    workflow_manager.notify_mesh_modified('lower')
+
+    after = detect()
+    assert len(after) == len(before) > 0
+    for old, new in zip(before, after):
+        np.testing.assert_allclose(new['center'], old['center'] - center, atol=1e-4)
+    np.testing.assert_allclose(arch_data['arch_center'], 0.0, atol=1e-9)
+
+def test_detect_collisions_matches_brute_force(workflow_manager, tmp_path):
+    """The KD-tree query flags the same wire points as a full distance scan."""
+    o3d = pytest.importorskip("open3d")
+    sphere = o3d.geometry.TriangleMesh.create_sphere(radius=10.0, resolution=30)
+    stl_path = str(tmp_path / "opposing.stl")
+    sphere.compute_triangle_normals()
+    assert o3d.io.write_triangle_mesh(stl_path, sphere)
+    workflow_manager.load_opposing_arch(stl_path)
+
+    rng = np.random.default_rng(0)
+    directions = rng.normal(size=(200, 3))
+    directions /= np.linalg.norm(directions, axis=1, keepdims=True)
+    wire_path = directions * rng.uniform(6.0, 14.0, size=(200, 1))
+    workflow_manager.arch_data['lower']['wire_path'] = wire_path
+
+    vertices = np.asarray(workflow_manager.opposing_arch_mesh.vertices)
+    nearest = np.array([np.linalg.norm(vertices - p, axis=1).min() for p in wire_path])
+    expected = wire_path[nearest < 2.0]
+
+    collisions = workflow_manager.detect_collisions('lower')
+    assert 0 < len(collisions) < len(wire_path)
+    np.testing.assert_array_equal(np.array(collisions), expected)
+
+
+def test_export_gcode_moves(workflow_manager):
+    """One G1 move per wire point, framed by the header and footer."""
+    wire_path = np.array([[1.0, -2.0, 3.14159], [-0.0004, 10.5, 0.0]])
+    workflow_manager.arch_data['upper']['wire_path'] = wire_path
+
+    lines = workflow_manager.export_gcode(arch_type='upper').split("\n")
+    assert lines[0] == "; Orthodontic Wire G-Code"
+    assert lines[9:11] == ["G1 X1.000 Y-2.000 Z3.142 F1000",
+                           "G1 X-0.000 Y10.500 Z0.000 F1000"]
+    assert lines[-2:] == ["", "M30 ; end"]
+
+    lines = workflow_manager.export_gcode(arch_type='upper', feed_rate=600).split("\n")
+    assert lines[9] == "G1 X1.000 Y-2.000 Z3.142 F600"
+
+
+def make_brackets(count=10, radius=20.0):
+    """Visible brackets along a semicircular arch around the origin."""
+    brackets = []
+    for i, angle in enumerate(np.linspace(0.2, np.pi - 0.2, count)):
+        position = np.array([radius * np.cos(angle), radius * np.sin(angle), 5.0])
+        brackets.append({'position': position, 'original_position': position.copy(),
+                         'normal': np.array([0.0, 0.0, 1.0]), 'tooth_index': i, 'visible': True})
+    return brackets
+
+
+def test_packed_bracket_control_points_match_dicts(workflow_manager):
+    """Packed control points produce the same wire as the per-bracket dicts."""
+    from wire.wire_path_creator import WirePathCreator
+
+    brackets = make_brackets()
+    brackets[4]['visible'] = False
+    workflow_manager.arch_data['upper']['bracket_positions'] = brackets
+    workflow_manager.arch_data['upper']['arch_center'] = np.zeros(3)
+    workflow_manager.set_global_height(1.5)
+    wire_path = workflow_manager.generate_wire_from_brackets('upper')
+
+    control_points = [{'position': b['position'] + b['normal'] * 1.5, 'type': 'bracket'}
+                      for b in brackets if b['visible']]
+    expected = WirePathCreator().create_smooth_path(control_points, np.zeros(3))
+    np.testing.assert_array_equal(wire_path, expected)
+
+
+def test_following_teeth_control_point_order(workflow_manager, monkeypatch):
+    """Manual points are interleaved with the nearest-first bracket halves."""
+    brackets = make_brackets(count=6)
+    workflow_manager.arch_data['upper']['arch_center'] = np.zeros(3)
+    captured = []
+    monkeypatch.setattr(workflow_manager.wire_path_creator, 'create_smooth_path',
+                        lambda control_points, center: captured.append(control_points))
+
+    manual = [{'position': brackets[i]['position'] + [0.0, 0.0, 1.0]} for i in (0, 3, 5)]
+    workflow_manager._generate_wire_following_teeth(manual, brackets)
+
+    packed = captured[0]
+    assert list(packed['types']) == ['manual'] + ['bracket'] * 3 + ['manual'] + ['bracket'] * 3 + ['manual']
+    assert list(packed['indices']) == [0, 0, 1, 2, 1, 3, 4, 5, 2]
+    np.testing.assert_array_equal(packed['positions'][[0, 4, 8]], [m['position'] for m in manual])
+
+
+def test_load_both_arches(workflow_manager, tmp_path):
+    """Concurrent loading fills the same state as the individual loads."""
+    o3d = pytest.importorskip("open3d")
+    paths = []
+    for name, radius in (('upper', 10.0), ('lower', 11.0), ('opposing', 12.0)):
+        sphere = o3d.geometry.TriangleMesh.create_sphere(radius=radius, resolution=20)
+        sphere.compute_triangle_normals()
+        paths.append(str(tmp_path / f"{name}.stl"))
+        assert o3d.io.write_triangle_mesh(paths[-1], sphere)
+
+    workflow_manager.load_both_arches(*paths)
+
+    for arch_type, path in zip(('upper', 'lower'), paths):
+        arch_data = workflow_manager.get_arch_data(arch_type)
+        assert arch_data['file_path'] == path
+        assert arch_data['mesh'].has_vertex_normals()
+        assert arch_data['arch_center'] is not None
+    assert workflow_manager.has_opposing_arch()
+
+    with pytest.raises(ValueError):
+        workflow_manager.load_both_arches(lower_path=str(tmp_path / "missing.stl"))
+
+
+def test_extract_control_points_from_auto(workflow_manager):
+    """Evenly spaced wire points, stored as independent control points."""
+    wire_path = np.column_stack([np.arange(200.0), np.zeros(200), np.ones(200)])
+    workflow_manager.arch_data['upper']['wire_path'] = wire_path
+
+    points = workflow_manager.extract_control_points_from_auto('upper')
+    assert isinstance(points, list) and len(points) == 10
+    np.testing.assert_array_equal(points, wire_path[np.linspace(0, 199, 10, dtype=int)])
+
+    stored = workflow_manager.arch_data['upper']['control_points']
+    stored[0]['position'] += 1.0
+    np.testing.assert_array_equal(stored[0]['original_position'], wire_path[0])
+    np.testing.assert_array_equal(points[0], wire_path[0])
+    np.testing.assert_array_equal(wire_path[0], [0.0, 0.0, 1.0])
+
+
 if __name__ == "__main__":
-    pytest.main(['-v', __file__])
\ No newline at end of file
+    pytest.main(['-v', __file__])
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Unit tests for mesh processing.
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+o3d = pytest.importorskip("open3d")
+
+from core.mesh_processor import CachedMesh, MeshProcessor
+
+
+@pytest.fixture
+def mesh():
+    mesh = o3d.geometry.TriangleMesh.create_box(width=4.0, height=2.0, depth=1.0)
+    mesh.translate([1.0, -2.0, 3.0])
+    return mesh
+
+
+@pytest.fixture
+def processor():
+    processor = MeshProcessor()
+    processor.verbose = False
+    return processor
+
+
+class TestCachedMesh:
+    """Test cached mesh geometry."""
+
+    def test_matches_open3d_queries(self, mesh):
+        cached = CachedMesh.from_mesh(mesh)
+        bbox = mesh.get_axis_aligned_bounding_box()
+        np.testing.assert_allclose(cached.bbox_min, bbox.min_bound)
+        np.testing.assert_allclose(cached.bbox_max, bbox.max_bound)
+        np.testing.assert_allclose(cached.extent, bbox.get_extent())
+        np.testing.assert_allclose(cached.center, mesh.get_center())
+
+    def test_vertices_are_a_copy(self, mesh):
+        cached = CachedMesh.from_mesh(mesh)
+        mesh.translate([10.0, 0.0, 0.0])
+        assert cached.vertices[:, 0].max() < 10.0
+
+    def test_processor_reuses_cache(self, processor, mesh):
+        cached = processor.get_cached_mesh(mesh)
+        assert processor.get_cached_mesh(mesh) is cached
+        assert processor.get_cached_mesh(cached) is cached
+
+    def test_in_place_translate_refreshes_cache(self, processor, mesh):
+        stale = processor.get_cached_mesh(mesh)
+        mesh.translate(-mesh.get_center())
+        cached = processor.get_cached_mesh(mesh)
+        assert cached is not stale
+        np.testing.assert_array_equal(cached.vertices, np.asarray(mesh.vertices))
+        np.testing.assert_allclose(cached.center, 0.0, atol=1e-12)
+
+    def test_invalidate_cached_mesh(self, processor, mesh):
+        stale = processor.get_cached_mesh(mesh)
+        processor.invalidate_cached_mesh(mesh)
+        assert processor.get_cached_mesh(mesh) is not stale
+
+    def test_clean_mesh_refreshes_cache(self, processor, mesh):
+        stale = processor.get_cached_mesh(mesh)
+        cleaned = processor.clean_mesh(mesh)
+        cached = processor.get_cached_mesh(cleaned)
+        assert cached is not stale
+        assert len(cached.vertices) == len(cleaned.vertices)
+
+    def test_bounds_and_center_from_cache(self, processor, mesh):
+        bbox_min, bbox_max, extent = processor.get_mesh_bounds(mesh)
+        np.testing.assert_allclose(extent, [4.0, 2.0, 1.0])
+        np.testing.assert_allclose(processor.calculate_arch_center(mesh), mesh.get_center())
+
+
+class TestMeshStatistics:
+    """Test optional mesh statistics."""
+
+    def test_default_skips_volume_and_topology(self, processor, mesh):
+        stats = processor.get_mesh_statistics(mesh)
+        assert stats['valid'] and stats['vertex_count'] == len(mesh.vertices)
+        assert stats['surface_area'] == pytest.approx(28.0)
+        assert 'volume' not in stats and 'is_watertight' not in stats
+
+    def test_opt_in_volume_and_topology(self, processor, mesh):
+        stats = processor.get_mesh_statistics(mesh, include_topology=True, include_volume=True)
+        assert stats['volume'] == pytest.approx(8.0)
+        assert stats['is_watertight'] and stats['is_orientable']
+
+
+class TestCleanMesh:
+    """Test mesh cleaning."""
+
+    def test_merges_duplicates_and_computes_normals(self, processor, mesh):
+        # Duplicate every vertex and point the second half of the triangles at the copies
+        vertices = np.asarray(mesh.vertices)
+        triangles = np.asarray(mesh.triangles)
+        mesh.vertices = o3d.utility.Vector3dVector(np.vstack([vertices, vertices]))
+        mesh.triangles = o3d.utility.Vector3iVector(np.vstack([triangles, triangles + len(vertices)]))
+
+        cleaned = processor.clean_mesh(mesh)
+        assert len(cleaned.vertices) == 8
+        assert len(cleaned.triangles) == 12
+        assert cleaned.has_vertex_normals() and cleaned.has_triangle_normals()
+        np.testing.assert_allclose(np.linalg.norm(np.asarray(cleaned.triangle_normals), axis=1), 1.0)
+
+    def test_tensor_backend_matches_legacy_normals(self, processor):
+        legacy = processor.clean_mesh(o3d.geometry.TriangleMesh.create_sphere(radius=5.0))
+        processor.use_tensor_backend = True
+        tensor = processor.clean_mesh(o3d.geometry.TriangleMesh.create_sphere(radius=5.0))
+        np.testing.assert_allclose(np.asarray(tensor.vertex_normals),
+                                   np.asarray(legacy.vertex_normals), atol=1e-9)
+        np.testing.assert_allclose(np.asarray(tensor.triangle_normals),
+                                   np.asarray(legacy.triangle_normals), atol=1e-9)
+
+    def test_display_color_is_a_separate_pass(self, processor, mesh):
+        cleaned = processor.clean_mesh(mesh)
+        assert not cleaned.has_vertex_colors()
+        assert processor.apply_display_color(cleaned) is cleaned
+        np.testing.assert_allclose(np.asarray(cleaned.vertex_colors), [[0.95, 0.93, 0.88]] * 8)
+
+
+class TestLazyImport:
+    """Test that Open3D is only loaded when a mesh is actually handled."""
+
+    def test_import_does_not_load_open3d(self):
+        import subprocess
+        code = ("import sys; import core.mesh_processor, core.tooth_detector; "
+                "sys.exit('open3d' in sys.modules)")
+        result = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parent.parent)
+        assert result.returncode == 0
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tooth detection.
+"""
+
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import core.tooth_detector as tooth_detector_module
+from core.tooth_detector import ToothDetector
+
+
+def make_crown_ring(n_teeth=14, arch_radius=20.0, tooth_radius=3.0, per_tooth=150,
+                    arc=(0.15, np.pi - 0.15), rotation=0.0, seed=0):
+    """Crown-level point cloud: one blob per tooth along an arch around the origin."""
+    rng = np.random.default_rng(seed)
+    blobs = []
+    for angle in np.linspace(arc[0], arc[1], n_teeth) + rotation:
+        center = np.array([arch_radius * np.cos(angle), arch_radius * np.sin(angle), 5.0])
+        blobs.append(center + rng.normal(scale=[tooth_radius / 2, tooth_radius / 2, 0.5],
+                                         size=(per_tooth, 3)))
+    return np.concatenate(blobs)
+
+
+def reference_segmentation(detector, crown_vertices, center, lr_axis, ap_axis):
+    """Original per-segment masking loop used as an oracle (before spacing filter)."""
+    angles = np.arctan2(crown_vertices[:, ap_axis] - center[ap_axis],
+                        crown_vertices[:, lr_axis] - center[lr_axis])
+    sorted_angles = np.sort(angles)
+    angle_diffs = np.append(np.diff(sorted_angles), sorted_angles[0] + 2*np.pi - sorted_angles[-1])
+    gap_idx = np.argmax(angle_diffs)
+    expected = detector.detection_parameters['expected_teeth']
+    angle_per_tooth = (2 * np.pi - angle_diffs[gap_idx]) / expected
+    start_angle = sorted_angles[(gap_idx + 1) % len(sorted_angles)]
+
+    segments = []
+    for i in range(expected + 2):
+        tooth_start = start_angle + i * angle_per_tooth
+        tooth_end = tooth_start + angle_per_tooth
+        tooth_start = np.mod(tooth_start + np.pi, 2*np.pi) - np.pi
+        tooth_end = np.mod(tooth_end + np.pi, 2*np.pi) - np.pi
+        if tooth_start < tooth_end:
+            mask = (angles >= tooth_start) & (angles < tooth_end)
+        else:
+            mask = (angles >= tooth_start) | (angles < tooth_end)
+        if mask.sum() >= detector.detection_parameters['min_tooth_vertices']:
+            segments.append(crown_vertices[mask])
+    return segments
+
+
+@pytest.fixture
+def numba_module():
+    """Module patched by the shared use_numba / set_numba fixtures."""
+    return tooth_detector_module
+
+
+@pytest.fixture
+def detector():
+    return ToothDetector()
+
+
+class TestAngularSegmentation:
+    """Test angular tooth segmentation."""
+
+    @pytest.mark.parametrize('rotation', [0.0, np.pi / 2, np.pi - 0.05, -np.pi / 3])
+    def test_matches_reference(self, detector, monkeypatch, rotation, use_numba):
+        crown = make_crown_ring(rotation=rotation)
+        center = np.zeros(3)
+        expected = reference_segmentation(detector, crown, center, 0, 1)
+
+        # Compare before the spacing filter, which only drops and orders teeth
+        monkeypatch.setattr(detector, '_spaced_teeth', lambda angles, centers: np.arange(len(angles)))
+        teeth = detector._angular_segmentation(crown, center, 0, 1)
+
+        assert len(teeth) == len(expected)
+        for tooth, segment in zip(teeth, expected):
+            np.testing.assert_allclose(tooth['center'], segment.mean(axis=0), atol=1e-9)
+            np.testing.assert_array_equal(np.unique(tooth['vertices'], axis=0),
+                                          np.unique(segment, axis=0))
+
+    def test_segment_across_angle_seam(self, detector, monkeypatch, use_numba):
+        # Arch centered on the -x axis, so a segment straddles +/-pi
+        crown = make_crown_ring(rotation=np.pi / 2 + 0.03)
+        center = np.zeros(3)
+        monkeypatch.setattr(detector, '_spaced_teeth', lambda angles, centers: np.arange(len(angles)))
+        teeth = detector._angular_segmentation(crown, center, 0, 1)
+        total = sum(len(t['vertices']) for t in teeth)
+        expected = reference_segmentation(detector, crown, center, 0, 1)
+        assert total == sum(len(s) for s in expected)
+
+    def test_detects_every_tooth(self, detector):
+        teeth = detector._angular_segmentation(make_crown_ring(), np.zeros(3), 0, 1)
+        assert 12 <= len(teeth) <= detector.detection_parameters['max_teeth']
+        angles = [t['angle'] for t in teeth]
+        assert angles == sorted(angles)
+
+
+class TestDetectTeeth:
+    """Test detection from a mesh and from its cached geometry."""
+
+    def test_cached_mesh_matches_open3d_mesh(self, detector):
+        o3d = pytest.importorskip("open3d")
+        from core.mesh_processor import CachedMesh
+
+        crown = make_crown_ring()
+        # Flat arch: height is the smallest extent, crown level at its middle
+        mesh = o3d.geometry.TriangleMesh()
+        mesh.vertices = o3d.utility.Vector3dVector(crown)
+        detector.detection_parameters['crown_ratio_lower'] = 0.5
+        detector.detection_parameters['height_tolerance'] = 10.0
+
+        from_mesh = detector.detect_teeth(mesh, 'lower')
+        from_cache = detector.detect_teeth(CachedMesh.from_mesh(mesh), 'lower')
+        assert len(from_mesh) == len(from_cache) > 0
+        for a, b in zip(from_mesh, from_cache):
+            np.testing.assert_allclose(a['center'], b['center'])
+
+    def test_tooth_vertices_are_float32(self, detector):
+        from core.mesh_processor import CachedMesh
+
+        crown = make_crown_ring()
+        cached = CachedMesh(crown, crown.min(axis=0), crown.max(axis=0),
+                            np.ptp(crown, axis=0), crown.mean(axis=0))
+        detector.detection_parameters['crown_ratio_lower'] = 0.5
+        detector.detection_parameters['height_tolerance'] = 10.0
+        teeth = detector.detect_teeth(cached, 'lower')
+        assert teeth
+        for tooth in teeth:
+            assert tooth['vertices'].dtype == np.float32
+            assert tooth['center'].dtype == np.float64
+            np.testing.assert_allclose(tooth['center'], tooth['vertices'].astype(np.float64).mean(axis=0),
+                                       atol=1e-9)
+
+
+class TestDetectionCache:
+    """Test memoization of detect_teeth per mesh."""
+
+    @pytest.fixture
+    def cached(self, detector):
+        from core.mesh_processor import CachedMesh
+
+        crown = make_crown_ring()
+        detector.detection_parameters['crown_ratio_lower'] = 0.5
+        detector.detection_parameters['height_tolerance'] = 10.0
+        return CachedMesh(crown, crown.min(axis=0), crown.max(axis=0),
+                          np.ptp(crown, axis=0), crown.mean(axis=0))
+
+    @pytest.fixture
+    def calls(self, detector, monkeypatch):
+        calls = []
+        detect = detector._detect_teeth
+
+        def counting(mesh, arch_type):
+            calls.append(arch_type)
+            return detect(mesh, arch_type)
+
+        monkeypatch.setattr(detector, '_detect_teeth', counting)
+        return calls
+
+    def test_repeat_call_is_cached(self, detector, cached, calls):
+        first = detector.detect_teeth(cached, 'lower')
+        second = detector.detect_teeth(cached, 'lower')
+        assert calls == ['lower']
+        assert len(first) == len(second) > 0
+        for a, b in zip(first, second):
+            np.testing.assert_array_equal(a['center'], b['center'])
+
+    def test_key_includes_arch_and_parameters(self, detector, cached, calls):
+        detector.detect_teeth(cached, 'lower')
+        detector.detect_teeth(cached, 'upper')
+        detector.detection_parameters['min_tooth_vertices'] += 1
+        detector.detect_teeth(cached, 'lower')
+        assert calls == ['lower', 'upper', 'lower']
+
+    def test_invalidate_cache(self, detector, cached, calls):
+        detector.detect_teeth(cached, 'lower')
+        detector.invalidate_cache(cached)
+        detector.detect_teeth(cached, 'lower')
+        detector.invalidate_cache()
+        detector.detect_teeth(cached, 'lower')
+        assert calls == ['lower'] * 3
+
+    def test_in_place_translation_is_detected_afresh(self, detector, calls):
+        o3d = pytest.importorskip("open3d")
+        mesh = o3d.geometry.TriangleMesh()
+        mesh.vertices = o3d.utility.Vector3dVector(make_crown_ring())
+        before = detector.detect_teeth(mesh, 'lower')
+        mesh.translate([5.0, -3.0, 0.0])
+        after = detector.detect_teeth(mesh, 'lower')
+        assert calls == ['lower', 'lower']
+        assert len(after) == len(before) > 0
+        for old, new in zip(before, after):
+            np.testing.assert_allclose(new['center'], old['center'] + [5.0, -3.0, 0.0], atol=1e-4)
+
+    def test_results_are_independent_copies(self, detector, cached):
+        teeth = detector.classify_teeth(detector.detect_teeth(cached, 'lower'), np.zeros(3))
+        assert {t['type'] for t in teeth} > {'posterior'}
+        assert {t['type'] for t in detector.detect_teeth(cached, 'lower')} == {'posterior'}
+
+    def test_cached_arrays_are_not_shared_writable(self, detector, cached):
+        teeth = detector.detect_teeth(cached, 'lower')
+        center = teeth[0]['center'].copy()
+        teeth[0]['center'] += 100.0
+        with pytest.raises(ValueError):
+            teeth[0]['vertices'] += 100.0
+        np.testing.assert_array_equal(detector.detect_teeth(cached, 'lower')[0]['center'], center)
+
+    def test_entry_dropped_with_mesh(self, detector, cached):
+        import gc
+        from core.mesh_processor import CachedMesh
+
+        mesh = CachedMesh(cached.vertices.copy(), cached.bbox_min, cached.bbox_max,
+                          cached.extent, cached.center)
+        detector.detect_teeth(mesh, 'lower')
+        assert len(detector._detection_cache) == 1
+        del mesh
+        gc.collect()
+        assert len(detector._detection_cache) == 0
+
+
+class TestFilterCloseTeeth:
+    """Test removal of teeth closer than the minimum spacing."""
+
+    def test_matches_sequential_filter(self, detector):
+        rng = np.random.default_rng(5)
+        angles = np.sort(rng.uniform(0, np.pi, 20))
+        teeth = [{'angle': a, 'center': np.array([20 * np.cos(a), 20 * np.sin(a), 0.0])}
+                 for a in rng.permutation(angles)]
+
+        expected = []
+        for tooth in sorted(teeth, key=lambda t: t['angle']):
+            if not expected or np.linalg.norm(tooth['center'] - expected[-1]['center']) > 3.0:
+                expected.append(tooth)
+        expected = expected[:detector.detection_parameters['max_teeth']]
+
+        assert [t['angle'] for t in detector._filter_close_teeth(teeth)] == [t['angle'] for t in expected]
+
+    def test_empty(self, detector):
+        assert detector._filter_close_teeth([]) == []
+
+
+class TestClassifyTeeth:
+    """Test incisor/canine/posterior classification."""
+
+    @staticmethod
+    def reference_types(teeth):
+        anterior = sorted(teeth, key=lambda t: t['ap_position'], reverse=True)[:6]
+        by_lr = sorted(anterior, key=lambda t: t['lr_position'])
+        types = {id(t): 'posterior' for t in teeth}
+        types[id(by_lr[0])] = types[id(by_lr[5])] = 'canine'
+        for tooth in by_lr[1:5]:
+            types[id(tooth)] = 'incisor'
+        return [types[id(t)] for t in teeth]
+
+    def test_matches_sorted_reference(self, detector):
+        rng = np.random.default_rng(2)
+        # Repeated AP values exercise tie ordering
+        teeth = [{'ap_position': float(ap), 'lr_position': float(lr)}
+                 for ap, lr in zip(rng.integers(0, 5, 14), rng.normal(size=14))]
+        expected = self.reference_types(teeth)
+        classified = detector.classify_teeth(teeth, np.zeros(3))
+        assert [t['type'] for t in classified] == expected
+        assert expected.count('canine') == 2 and expected.count('incisor') == 4
+
+    def test_too_few_teeth_left_unchanged(self, detector):
+        teeth = [{'ap_position': 0.0, 'lr_position': 0.0}] * 3
+        assert detector.classify_teeth(teeth, np.zeros(3)) is teeth
+
+
+class TestCrownBand:
+    """Test the crown-level vertex filter."""
+
+    def test_matches_mask(self, use_numba):
+        rng = np.random.default_rng(3)
+        vertices = rng.uniform(-10, 10, size=(5000, 3))
+        band = ToothDetector._crown_band(vertices, 1, 2.5, 1.5)
+        expected = vertices[np.abs(vertices[:, 1] - 2.5) < 1.5].astype(np.float32)
+        assert band.dtype == np.float32
+        np.testing.assert_array_equal(band, expected)
+
+    def test_empty_band(self, use_numba):
+        band = ToothDetector._crown_band(np.zeros((10, 3)), 2, 5.0, 1.0)
+        assert band.shape == (0, 3)
+
+    def test_numexpr_matches_numpy(self, monkeypatch):
+        pytest.importorskip("numexpr")
+        monkeypatch.setattr(tooth_detector_module, 'NUMBA_AVAILABLE', False)
+        vertices = np.random.default_rng(4).uniform(-10, 10, size=(5000, 3))
+        fused = ToothDetector._crown_band(vertices, 2, 1.0, 2.0)
+        monkeypatch.setattr(tooth_detector_module, 'NUMEXPR_AVAILABLE', False)
+        np.testing.assert_array_equal(fused, ToothDetector._crown_band(vertices, 2, 1.0, 2.0))
@@ -105,7 +105,7 @@ class DesignSerializer:
         if generator.mesh is None:
             return {}
         
-        stats = generator.mesh_processor.get_mesh_statistics(generator.mesh)
+        stats = generator.mesh_processor.get_mesh_statistics(generator.mesh, include_volume=True)
         return {
             'vertex_count': stats.get('vertex_count', 0),
             'triangle_count': stats.get('triangle_count', 0),
@@ -3,62 +3,155 @@
 # visualization/control_point_manager.py
 """Control point selection and manipulation."""
 
+import logging
 import numpy as np
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
+
+logger = logging.getLogger(__name__)
+
+# Per-point fields held in the dedicated buffers; any other key is kept in extras
+BUFFERED_FIELDS = ('position', 'original_position', 'type', 'bend_angle', 'vertical_offset')
 
 class ControlPointManager:
-    """Manages control point selection and manipulation."""
+    """
+    Manages control point selection and manipulation.
+    
+    Control points are held as Structure-of-Arrays buffers: positions and
+    original positions (N, 3), types (N,), bend angles and vertical offsets
+    (N,). Any other per-point fields (e.g. 'index') are kept as dicts in
+    extras (N,). setup() copies the caller's control points into these
+    buffers, so later edits do not reach the caller's data; to_dict_list()
+    returns snapshots of the current state for reading back.
+    """
     
     def __init__(self):
         """Initialize control point manager."""
-        self.control_points = []
+        self.positions = np.empty((0, 3))
+        self.original_positions = np.empty((0, 3))
+        self.has_original = np.empty(0, dtype=bool)
+        self.types = np.empty(0, dtype=object)
+        self.bend_angles = np.empty(0)
+        self.vertical_offsets = np.empty(0)
+        self.extras = np.empty(0, dtype=object)
         self.selected_index = None
         self.wire_path_creator = None
         self.wire_mesh_builder = None
         self.selection_history = []
         
-    def setup(self, control_points: List[Dict], 
+    def setup(self, control_points: Union[List[Dict], Dict[str, np.ndarray]], 
               wire_path_creator, wire_mesh_builder):
-        """Setup with control points and generators."""
-        self.control_points = control_points
+        """
+        Setup with control points and generators.
+        
+        control_points is either the legacy list of dicts or a dict of arrays
+        with 'positions' and 'types' (and optionally 'original_positions',
+        'bend_angles', 'vertical_offsets', and 'indices', kept as each point's
+        'index'). It is copied: edits made through
+        the manager are read back with to_dict_list().
+        """
+        if isinstance(control_points, dict):
+            positions = np.array(control_points['positions'], dtype=np.float64).reshape(-1, 3)
+            count = len(positions)
+            original = control_points.get('original_positions')
+            self.has_original = np.full(count, original is not None)
+            self.original_positions = (np.array(original, dtype=np.float64).reshape(-1, 3)
+                                       if original is not None else positions.copy())
+            self.types = np.array(control_points['types'], dtype=object)
+            self.bend_angles = np.array(control_points.get('bend_angles', np.zeros(count)), dtype=np.float64)
+            self.vertical_offsets = np.array(control_points.get('vertical_offsets', np.zeros(count)),
+                                             dtype=np.float64)
+            indices = control_points.get('indices')
+            extras = [{} if indices is None else {'index': indices[i]} for i in range(count)]
+        else:
+            positions = np.array([cp['position'] for cp in control_points], dtype=np.float64).reshape(-1, 3)
+            self.has_original = np.array(['original_position' in cp for cp in control_points], dtype=bool)
+            self.original_positions = np.array([cp.get('original_position', cp['position'])
+                                                for cp in control_points], dtype=np.float64).reshape(-1, 3)
+            self.types = np.array([cp['type'] for cp in control_points], dtype=object)
+            self.bend_angles = np.array([cp.get('bend_angle', 0.0) for cp in control_points], dtype=np.float64)
+            self.vertical_offsets = np.array([cp.get('vertical_offset', 0.0) for cp in control_points],
+                                             dtype=np.float64)
+            extras = [{key: value for key, value in cp.items() if key not in BUFFERED_FIELDS}
+                      for cp in control_points]
+        self.extras = np.empty(len(extras), dtype=object)
+        self.extras[:] = extras
+        self.positions = positions
         self.wire_path_creator = wire_path_creator
         self.wire_mesh_builder = wire_mesh_builder
-        
+    
+    def __len__(self) -> int:
+        """Number of control points."""
+        return len(self.positions)
+    
+    def _as_dict(self, index: int) -> Dict:
+        """Legacy dict for one control point, as a snapshot of the buffers."""
+        cp = dict(self.extras[index])
+        cp.update({
+            'position': self.positions[index].copy(),
+            'type': self.types[index],
+            'bend_angle': float(self.bend_angles[index]),
+            'vertical_offset': float(self.vertical_offsets[index])
+        })
+        if self.has_original[index]:
+            cp['original_position'] = self.original_positions[index].copy()
+        return cp
+    
+    def to_dict_list(self) -> List[Dict]:
+        """
+        Control points as the legacy list of dicts.
+
+        The dicts are snapshots: writing to them does not change the
+        manager. Edit through the manager's methods, or assign a whole list
+        to control_points.
+        """
+        return [self._as_dict(i) for i in range(len(self))]
+    
+    @property
+    def control_points(self) -> List[Dict]:
+        """Legacy list of control point dicts (snapshots, see to_dict_list)."""
+        return self.to_dict_list()
+    
+    @control_points.setter
+    def control_points(self, control_points: Union[List[Dict], Dict[str, np.ndarray]]):
+        """Replace all control points, keeping the current generators (see setup)."""
+        self.setup(control_points, self.wire_path_creator, self.wire_mesh_builder)
+        if self.selected_index is not None and self.selected_index >= len(self):
+            self.selected_index = None
+    
     def select_control_point(self, index: int) -> bool:
         """Select a control point by index."""
-        if 0 <= index < len(self.control_points):
+        if 0 <= index < len(self):
             self.selected_index = index
             self.selection_history.append(index)
-            cp = self.control_points[index]
-            print(f"Selected control point {index} ({cp['type']})")
-            print(f"  Position: [{cp['position'][0]:.2f}, {cp['position'][1]:.2f}, {cp['position'][2]:.2f}]")
+            position = self.positions[index]
+            logger.debug("Selected control point %d (%s) at [%.2f, %.2f, %.2f]",
+                         index, self.types[index], position[0], position[1], position[2])
             return True
         return False
     
     def deselect_control_point(self):
         """Deselect current control point."""
         self.selected_index = None
-        print("Control point deselected")
+        logger.debug("Control point deselected")
     
     def move_selected_point(self, direction: np.ndarray, step: float = 0.5) -> bool:
         """Move the selected control point."""
         if self.selected_index is None:
             return False
         
-        # Update position in data model
-        old_position = self.control_points[self.selected_index]['position'].copy()
-        self.control_points[self.selected_index]['position'] += direction * step
+        # Update position in data model, in place
+        position = self.positions[self.selected_index]
+        move = direction * step
+        position += move
         
-        # Update in wire path creator
+        # Update in wire path creator (passes a view into the positions buffer)
         if self.wire_path_creator:
-            self.wire_path_creator.update_control_point(
-                self.selected_index,
-                self.control_points[self.selected_index]['position']
-            )
+            self.wire_path_creator.update_control_point(self.selected_index, position)
         
-        print(f"Moved control point {self.selected_index} by {direction * step}")
-        print(f"  From: [{old_position[0]:.2f}, {old_position[1]:.2f}, {old_position[2]:.2f}]")
-        print(f"  To: [{self.control_points[self.selected_index]['position'][0]:.2f}, {self.control_points[self.selected_index]['position'][1]:.2f}, {self.control_points[self.selected_index]['position'][2]:.2f}]")
+        if logger.isEnabledFor(logging.DEBUG):
+            old_position = position - move
+            logger.debug("Moved control point %d by %s from [%.2f, %.2f, %.2f] to [%.2f, %.2f, %.2f]",
+                         self.selected_index, move, *old_position, *position)
         return True
     
     def adjust_bend_angle(self, angle_delta: float) -> bool:
@@ -67,40 +160,46 @@ class ControlPointManager:
             return False
         
         if self.wire_path_creator:
-            self.wire_path_creator.adjust_bend_angle(self.selected_index, angle_delta)
-            print(f"Adjusted bend angle by {angle_delta:.1f}°")
+            index = self.selected_index
+            self.wire_path_creator.adjust_bend_angle(index, angle_delta)
+            self.bend_angles[index] = np.clip(self.bend_angles[index] + angle_delta, -45, 45)
+            
+            # The creator may move the point to apply the bend; keep the buffer in step
+            # so the next move does not overwrite that offset
+            creator_points = getattr(self.wire_path_creator, 'control_points', None)
+            if creator_points is not None and index < len(creator_points):
+                self.positions[index] = creator_points[index]['position']
+            logger.debug("Adjusted bend angle by %.1f°", angle_delta)
             return True
         return False
     
     def get_selected_control_point(self) -> Optional[Dict]:
         """Get currently selected control point."""
         if self.selected_index is not None:
-            return self.control_points[self.selected_index]
+            return self._as_dict(self.selected_index)
         return None
     
     def get_control_point_info(self, index: int) -> Optional[Dict]:
         """Get information about a specific control point."""
-        if 0 <= index < len(self.control_points):
-            cp = self.control_points[index]
+        if 0 <= index < len(self):
             return {
                 'index': index,
-                'type': cp['type'],
-                'position': cp['position'].tolist(),
-                'bend_angle': cp.get('bend_angle', 0.0),
-                'vertical_offset': cp.get('vertical_offset', 0.0),
+                'type': self.types[index],
+                'position': self.positions[index].tolist(),
+                'bend_angle': float(self.bend_angles[index]),
+                'vertical_offset': float(self.vertical_offsets[index]),
                 'is_selected': index == self.selected_index
             }
         return None
     
     def reset_control_points(self):
         """Reset all control points to original positions."""
-        for cp in self.control_points:
-            if 'original_position' in cp:
-                cp['position'] = cp['original_position'].copy()
-                cp['bend_angle'] = 0.0
-                cp['vertical_offset'] = 0.0
+        reset = self.has_original
+        self.positions[reset] = self.original_positions[reset]
+        self.bend_angles[reset] = 0.0
+        self.vertical_offsets[reset] = 0.0
         
-        print("All control points reset to original positions")
+        logger.info("All control points reset to original positions")
         
         # Update wire path creator
         if self.wire_path_creator:
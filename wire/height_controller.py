@@ -3,6 +3,11 @@
 # wire/height_controller.py
 """Wire height adjustment controller."""
 
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
 class HeightController:
     """Manages wire height adjustments and offsets."""
     
@@ -17,7 +22,7 @@ class HeightController:
         """Adjust wire height by delta amount."""
         self.height_offset += delta
         self.history.append(self.height_offset)
-        print(f"Height adjusted by {delta:.2f}mm (total: {self.height_offset:.2f}mm)")
+        logger.debug("Height adjusted by %.2fmm (total: %.2fmm)", delta, self.height_offset)
     
     def set_height(self, new_height: float):
         """Set absolute height offset."""
@@ -28,7 +33,7 @@ class HeightController:
         """Reset height to original position."""
         self.height_offset = self.original_offset
         self.history.append(self.original_offset)
-        print(f"Height reset to {self.original_offset:.2f}mm")
+        logger.info("Height reset to %.2fmm", self.original_offset)
     
     def get_height_offset(self) -> float:
         """Get current height offset."""
@@ -40,7 +45,7 @@ class HeightController:
     
     def set_step_size(self, step: float):
         """Set height adjustment step size."""
-        self.step_size = max(0.1, min(5.0, step))  # Clamp between 0.1 and 5.0mm
+        self.step_size = float(np.clip(step, 0.1, 5.0))  # Clamp between 0.1 and 5.0mm
     
     def get_history(self) -> list:
         """Get height adjustment history."""
@@ -51,7 +56,7 @@ class HeightController:
         if len(self.history) > 1:
             self.history.pop()  # Remove current
             self.height_offset = self.history[-1]  # Set to previous
-            print(f"Height adjustment undone, now: {self.height_offset:.2f}mm")
+            logger.debug("Height adjustment undone, now: %.2fmm", self.height_offset)
         else:
-            print("No height adjustments to undo")
+            logger.debug("No height adjustments to undo")
 
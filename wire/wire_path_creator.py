@@ -10,10 +10,19 @@ It handles spline interpolation, control points, and path smoothing.
 
 import numpy as np
 from scipy import interpolate
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Union
 import math
 from utils.catmull_rom import catmull_rom_spline
 
+# Packed control-point arrays and the per-point dict keys they map to
+PACKED_FIELDS = (
+    ('original_positions', 'original_position'),
+    ('types', 'type'),
+    ('indices', 'index'),
+    ('bend_angles', 'bend_angle'),
+    ('vertical_offsets', 'vertical_offset')
+)
+
 class WirePathCreator:
     """
     Core wire path generation algorithm.
@@ -34,7 +43,7 @@ class WirePathCreator:
         self.smoothing_factor = 0.1
         self.minimum_segment_length = 0.5  # mm
         
-    def create_smooth_path(self, bracket_positions: List[Dict], 
+    def create_smooth_path(self, bracket_positions: Union[List[Dict], Dict[str, np.ndarray]], 
                           arch_center: np.ndarray,
                           height_offset: float = 0.0) -> Optional[np.ndarray]:
         """
@@ -44,23 +53,31 @@ class WirePathCreator:
         through the bracket positions using spline interpolation.
         
         Args:
-            bracket_positions: List of bracket position dictionaries
+            bracket_positions: List of bracket position dictionaries, or
+                packed arrays with 'positions' (and optionally 'visible'
+                and the fields of ControlPointManager.setup)
             arch_center: Center point of the dental arch
             height_offset: Global height adjustment for the wire
             
         Returns:
             numpy array of 3D points representing the wire path
         """
-        if not bracket_positions:
-            return None
+        if isinstance(bracket_positions, dict):
+            # Steps 1-2 on the packed arrays
+            sorted_brackets = self._sort_packed_brackets(bracket_positions, arch_center)
+            if len(sorted_brackets) < 2:
+                return None
+        else:
+            if not bracket_positions:
+                return None
             
-        # Step 1: Extract and sort bracket positions
-        visible_brackets = [b for b in bracket_positions if b.get('visible', True)]
-        if len(visible_brackets) < 2:
-            return None
+            # Step 1: Extract and sort bracket positions
+            visible_brackets = [b for b in bracket_positions if b.get('visible', True)]
+            if len(visible_brackets) < 2:
+                return None
             
-        # Step 2: Sort brackets by angular position around arch center
-        sorted_brackets = self._sort_brackets_by_angle(visible_brackets, arch_center)
+            # Step 2: Sort brackets by angular position around arch center
+            sorted_brackets = self._sort_brackets_by_angle(visible_brackets, arch_center)
         
         # Step 3: Generate control points for wire shaping
         self.control_points = self._generate_control_points(sorted_brackets, arch_center)
@@ -91,6 +108,26 @@ class WirePathCreator:
         
         return sorted(brackets, key=calculate_angle)
     
+    def _sort_packed_brackets(self, packed: Dict[str, np.ndarray],
+                              center: np.ndarray) -> List[Dict]:
+        """
+        Visible packed brackets as dicts, sorted by angle around the arch.
+
+        Filtering and the angle sort run on the arrays; dicts are built only
+        for the rows kept, in order. The stable sort matches sorted() on ties.
+        """
+        positions = np.asarray(packed['positions'], dtype=np.float64).reshape(-1, 3)
+        rows = np.arange(len(positions))
+        if 'visible' in packed:
+            rows = rows[np.asarray(packed['visible'], dtype=bool)]
+        
+        angles = np.arctan2(positions[rows, 1] - center[1], positions[rows, 0] - center[0])
+        rows = rows[np.argsort(angles, kind='stable')]
+        
+        fields = [(key, packed[name]) for name, key in PACKED_FIELDS if name in packed]
+        return [dict({'position': positions[i].copy()}, **{key: values[i] for key, values in fields})
+                for i in rows]
+    
     def _generate_control_points(self, sorted_brackets: List[Dict], 
                                center: np.ndarray) -> List[Dict]:
         """